@@ -0,0 +1,23 @@
+# gunicorn 설정 - start.sh에서 사용
+# GUNICORN_PRELOAD=True (start.sh --preload)면 마스터가 앱을 한 번 로드하고
+# minimumPriceApp.warmup으로 무거운 모듈/정규식/매처를 만든 뒤 fork → 워커는 copy-on-write로 공유
+import gc
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('GUNICORN_WORKERS', '3'))
+timeout = 1200
+graceful_timeout = 1200
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'False') == 'True'
+
+
+def when_ready(server):
+    """워커 fork 직전 (preload 모드에서만 예열)"""
+    if not preload_app:
+        return
+    
+    from minimumPriceApp.warmup import warm_up
+    
+    warm_up()
+    # 예열로 만든 객체를 GC 추적 대상에서 빼서 워커에서 GC가 페이지를 건드려 복사되지 않게 함
+    gc.freeze()
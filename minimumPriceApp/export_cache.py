@@ -0,0 +1,95 @@
+"""
+Generated export cache
+download_excel outputs are keyed by a hash of (input file bytes, modifications,
+export options) so repeat downloads skip the load/copy/save, and the same hash
+is sent as the ETag so clients can revalidate with If-None-Match
+"""
+
+import hashlib
+import logging
+
+from django.conf import settings
+from django.core.cache import caches
+
+from . import fastjson
+
+# 출력 형식(열 구성/색상 등)이 바뀌면 올려서 이전 캐시를 무효화
+EXPORT_FORMAT_VERSION = 1
+
+
+class ExportCache:
+    """내보내기 결과 캐시 (settings.CACHES['exports'], 용량은 MAX_ENTRIES × EXPORT_CACHE_MAX_BYTES 이내)"""
+    
+    KEY_PREFIX = "export:"
+    
+    @staticmethod
+    def _cache():
+        return caches['exports']
+    
+    @staticmethod
+    def make_key(uploaded_file, modifications, export_format, changed_only):
+        """입력 파일 바이트 + 정렬된 modifications + 옵션의 sha256"""
+        digest = hashlib.sha256()
+        for chunk in uploaded_file.chunks():
+            digest.update(chunk)
+        uploaded_file.seek(0)
+        digest.update(b"\0")
+        digest.update(fastjson.dumps(modifications, sort_keys=True))
+        digest.update(f"\0{export_format}\0{int(changed_only)}\0{EXPORT_FORMAT_VERSION}".encode('utf-8'))
+        return digest.hexdigest()
+    
+    @staticmethod
+    def etag(key):
+        return f'"{key}"'
+    
+    @staticmethod
+    def matches(request, key):
+        """If-None-Match에 같은 ETag가 있으면 True (304 응답 대상)
+        
+        '*'는 매칭하지 않음 - POST 다운로드에 본문 없는 304를 돌려주지 않도록 실제 ETag만 비교
+        """
+        header = request.META.get('HTTP_IF_NONE_MATCH', '')
+        if not header:
+            return False
+        tags = [tag.strip().removeprefix('W/') for tag in header.split(',')]
+        return ExportCache.etag(key) in tags
+    
+    @staticmethod
+    def get(key):
+        """캐시된 (content, content_type) 반환, 없으면 None"""
+        if not settings.EXPORT_CACHE_ENABLED:
+            return None
+        try:
+            return ExportCache._cache().get(ExportCache.KEY_PREFIX + key)
+        except Exception as e:
+            logging.warning(f"내보내기 캐시 조회 실패: {e}")
+            return None
+    
+    @staticmethod
+    def set(key, content, content_type):
+        """결과 저장 - EXPORT_CACHE_MAX_BYTES보다 큰 파일은 저장하지 않음"""
+        if not settings.EXPORT_CACHE_ENABLED or len(content) > settings.EXPORT_CACHE_MAX_BYTES:
+            return
+        try:
+            ExportCache._cache().set(
+                ExportCache.KEY_PREFIX + key, (content, content_type), settings.EXPORT_CACHE_TTL
+            )
+        except Exception as e:
+            logging.warning(f"내보내기 캐시 저장 실패: {e}")
+    
+    @staticmethod
+    def tee(key, chunks, content_type):
+        """스트리밍 응답 조각을 그대로 내보내면서 모아 두었다가 끝까지 전송되면 저장"""
+        collected = []
+        size = 0
+        for chunk in chunks:
+            yield chunk
+            if collected is not None:
+                data = chunk.encode('utf-8') if isinstance(chunk, str) else chunk
+                size += len(data)
+                if size > settings.EXPORT_CACHE_MAX_BYTES:
+                    collected = None
+                else:
+                    collected.append(data)
+        if collected is not None:
+            ExportCache.set(key, b"".join(collected), content_type)
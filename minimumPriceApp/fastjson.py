@@ -0,0 +1,40 @@
+"""
+JSON codec - uses orjson when installed, falls back to the standard json module
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson 미설치 환경
+    orjson = None
+
+# 필터/가격 계산에 쓰는 네이버 쇼핑 item 필드
+NAVER_ITEM_FIELDS = ('title', 'lprice', 'mallName')
+
+
+def loads(data):
+    """bytes/str → 객체"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj, default=None, sort_keys=False):
+    """객체 → UTF-8 bytes (sort_keys=True면 키 정렬 - 해시용 정규 형태)"""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=default, option=option)
+    return json.dumps(obj, default=default, ensure_ascii=False, separators=(',', ':'),
+                      sort_keys=sort_keys).encode('utf-8')
+
+
+def parse_naver_items(body):
+    """네이버 쇼핑 응답에서 필터에 필요한 필드만 남긴 items"""
+    result = loads(body)
+    return [
+        {field: item[field] for field in NAVER_ITEM_FIELDS if field in item}
+        for item in result.get('items', [])
+    ]
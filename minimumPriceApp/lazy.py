@@ -0,0 +1,33 @@
+"""
+Lazy loading for heavy libraries (pandas/numpy/openpyxl)
+The real module is imported on first attribute access and its namespace is
+copied in, so later lookups are plain attribute reads with no proxy overhead
+"""
+
+import importlib
+import types
+
+
+class LazyModule(types.ModuleType):
+    """처음 속성에 접근할 때 import하는 모듈 대리 객체 (pd = LazyModule('pandas'))"""
+    
+    def __getattr__(self, name):
+        # __dict__에 없는 속성만 여기로 옴 - 로드 후에는 대부분 __dict__에서 바로 찾음
+        module = importlib.import_module(self.__name__)
+        self.__dict__.update(module.__dict__)
+        return getattr(module, name)
+
+
+class LazyDict(dict):
+    """처음 키를 조회할 때 factory()로 채워지는 dict"""
+    
+    def __init__(self, factory):
+        super().__init__()
+        self._factory = factory
+    
+    def __missing__(self, key):
+        if self._factory is None:
+            raise KeyError(key)
+        factory, self._factory = self._factory, None
+        self.update(factory())
+        return self[key]
@@ -0,0 +1,62 @@
+"""
+URLconf import time budget check
+python manage.py check_import_time [--budget 초] [--repeat N]
+새 프로세스에서 django.setup() 후 ROOT_URLCONF import 시간을 재고, 예산을 넘으면 실패(종료 코드 1)
+배포 전 / CI에서 실행해 워커 부팅 시간이 다시 늘어나는 것을 막음
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from minimumPriceApp.warmup import HEAVY_MODULES
+
+MEASURE_SCRIPT = """
+import json, sys, time
+import django
+django.setup()
+from django.conf import settings
+started = time.perf_counter()
+__import__(settings.ROOT_URLCONF)
+elapsed = time.perf_counter() - started
+print(json.dumps({"seconds": elapsed, "heavy": [m for m in %r if m in sys.modules]}))
+"""
+
+
+class Command(BaseCommand):
+    help = "ROOT_URLCONF import 시간이 예산(URLCONF_IMPORT_BUDGET)을 넘으면 실패"
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--budget', type=float, default=None,
+                            help="허용 시간(초), 기본 settings.URLCONF_IMPORT_BUDGET")
+        parser.add_argument('--repeat', type=int, default=3,
+                            help="측정 횟수 (최솟값으로 판정)")
+    
+    def measure(self):
+        env = dict(os.environ)
+        env.setdefault('DJANGO_SETTINGS_MODULE', settings.SETTINGS_MODULE)
+        completed = subprocess.run(
+            [sys.executable, '-c', MEASURE_SCRIPT % (HEAVY_MODULES,)],
+            capture_output=True, text=True, env=env
+        )
+        if completed.returncode != 0:
+            raise CommandError(f"URLconf import 실패:\n{completed.stderr}")
+        return json.loads(completed.stdout.strip().splitlines()[-1])
+    
+    def handle(self, *args, **options):
+        budget = options['budget'] or settings.URLCONF_IMPORT_BUDGET
+        samples = [self.measure() for _ in range(max(1, options['repeat']))]
+        best = min(sample['seconds'] for sample in samples)
+        heavy = samples[-1]['heavy']
+        
+        self.stdout.write(f"{settings.ROOT_URLCONF} import: {best:.3f}초 (예산 {budget:.3f}초)")
+        if heavy:
+            self.stdout.write(self.style.WARNING(f"URLconf import 시 로드된 무거운 모듈: {', '.join(heavy)}"))
+        
+        if best > budget:
+            raise CommandError(f"URLconf import 시간 {best:.3f}초가 예산 {budget:.3f}초를 초과")
+        self.stdout.write(self.style.SUCCESS("import 시간 예산 통과"))
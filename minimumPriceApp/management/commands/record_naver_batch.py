@@ -0,0 +1,34 @@
+"""
+Naver response recording
+python manage.py record_naver_batch <입력 파일(xlsx/csv/parquet)> <녹화 파일.json.gz>
+입력 파일의 고유 검색어를 한 번씩 조회(검색 캐시 우선)해 replay_naver_batch용 녹화 파일 작성
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from minimumPriceApp.rate_limit import QuotaExceeded
+from minimumPriceApp.replay import NaverRecording
+from minimumPriceApp.views import UploadReader
+
+
+class Command(BaseCommand):
+    help = "배치 입력 파일의 네이버 검색 응답을 녹화 (replay_naver_batch에서 재사용)"
+    
+    def add_arguments(self, parser):
+        parser.add_argument('input', help="업로드와 같은 형식의 xlsx/csv/parquet 파일")
+        parser.add_argument('output', help="녹화 파일 경로 (.json.gz)")
+    
+    def handle(self, *args, **options):
+        with open(options['input'], 'rb') as source:
+            data_rows, _ = UploadReader.read(source, options['input'])
+        rows = [row for row in data_rows if row['productName']]
+        
+        try:
+            recording = NaverRecording.record(rows)
+        except QuotaExceeded as e:
+            raise CommandError(f"네이버 API 할당량 초과로 중단: {e}")
+        
+        recording.save(options['output'])
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(rows)}개 행, 검색어 {len(recording.responses)}개 녹화 → {options['output']}"
+        ))
@@ -0,0 +1,77 @@
+"""
+Offline replay of a recorded batch
+python manage.py replay_naver_batch <녹화 파일> [--filter 경로] [--against 경로|결과 파일] [--save 결과 파일] [--diff-csv 경로]
+네트워크 없이 녹화된 네이버 응답으로 가격을 다시 계산하고 두 필터 버전의 결과를 비교
+  --filter / --against : ItemFilter를 대체할 클래스 경로 (예: minimumPriceApp.experimental.StrictItemFilter)
+  --against 에 --save로 저장한 결과 파일(.json)을 주면 그 결과와 비교 (git 브랜치 간 비교용)
+"""
+
+import csv
+import os
+import time
+
+from django.core.management.base import BaseCommand
+
+from minimumPriceApp import fastjson
+from minimumPriceApp.replay import NaverRecording, diff_results, load_filter, replay
+
+
+class Command(BaseCommand):
+    help = "녹화된 네이버 응답으로 배치 가격을 재계산하고 필터 버전 간 차이 출력"
+    
+    def add_arguments(self, parser):
+        parser.add_argument('recording', help="record_naver_batch로 만든 녹화 파일")
+        parser.add_argument('--filter', default=None, help="사용할 필터 클래스 경로 (기본 현재 ItemFilter)")
+        parser.add_argument('--against', default=None, help="비교할 필터 클래스 경로 또는 저장된 결과 파일(.json)")
+        parser.add_argument('--save', default=None, help="replay 결과를 JSON으로 저장")
+        parser.add_argument('--diff-csv', default=None, help="차이 나는 행을 CSV로 저장")
+        parser.add_argument('--limit', type=int, default=20, help="화면에 출력할 차이 행 수")
+    
+    def run(self, recording, filter_path):
+        filter_class = load_filter(filter_path) if filter_path else None
+        started = time.perf_counter()
+        results = replay(recording, filter_class)
+        label = filter_path or "현재 ItemFilter"
+        self.stdout.write(f"replay [{label}]: {len(results)}개 행, {time.perf_counter() - started:.2f}초")
+        return results
+    
+    def handle(self, *args, **options):
+        recording = NaverRecording.load(options['recording'])
+        results = self.run(recording, options['filter'])
+        
+        if options['save']:
+            with open(options['save'], 'wb') as output:
+                output.write(fastjson.dumps(results))
+            self.stdout.write(f"결과 저장 → {options['save']}")
+        
+        against = options['against']
+        if not against:
+            return
+        
+        if os.path.isfile(against):
+            with open(against, 'rb') as source:
+                baseline = fastjson.loads(source.read())
+        else:
+            baseline = self.run(recording, against)
+        
+        differences = diff_results(baseline, results)
+        raised = sum(1 for _, base, other in differences if other['newPrice'] > base['newPrice'])
+        lowered = sum(1 for _, base, other in differences if other['newPrice'] < base['newPrice'])
+        self.stdout.write(self.style.WARNING(
+            f"차이 {len(differences)}개 행 (가격 상승 {raised}, 하락 {lowered}, "
+            f"필터 정보만 변경 {len(differences) - raised - lowered})"
+        ))
+        for index, base, other in differences[:options['limit']]:
+            self.stdout.write(
+                f"  {index + 1}. {base['productName']}: {base['newPrice']} → {other['newPrice']} "
+                f"({base['filterInfo']} → {other['filterInfo']})"
+            )
+        
+        if options['diff_csv']:
+            with open(options['diff_csv'], 'w', encoding='utf-8-sig', newline='') as output:
+                writer = csv.writer(output)
+                writer.writerow(['행', '상품명', '기존가격', '기준 새가격', '비교 새가격', '기준 필터', '비교 필터'])
+                for index, base, other in differences:
+                    writer.writerow([index + 1, base['productName'], base['currentPrice'],
+                                     base['newPrice'], other['newPrice'], base['filterInfo'], other['filterInfo']])
+            self.stdout.write(f"차이 CSV 저장 → {options['diff_csv']}")
@@ -0,0 +1,120 @@
+"""
+API response middleware
+- ServerTimingMiddleware: per-stage Server-Timing header (minimumPriceApp.timing)
+- ResponseCompressionMiddleware: large JSON bodies (upload_excel rows,
+  search_prices results) are compressed with Brotli when the client accepts it
+  and brotli is installed, otherwise gzip
+"""
+
+import gzip
+import re
+import time
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+from .timing import StageTimer, activate, deactivate, stage
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli 미설치 환경은 gzip만 사용
+    brotli = None
+
+ACCEPT_ENCODING_TOKEN = re.compile(r'\s*([\w*-]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?')
+
+
+def accepted_encodings(header):
+    """Accept-Encoding → q>0인 인코딩 이름 집합"""
+    encodings = set()
+    for part in header.split(','):
+        match = ACCEPT_ENCODING_TOKEN.match(part)
+        if not match:
+            continue
+        name, quality = match.group(1).lower(), match.group(2)
+        try:
+            if quality is not None and float(quality) <= 0:
+                continue
+        except ValueError:
+            continue
+        encodings.add(name)
+    return encodings
+
+
+class ResponseCompressionMiddleware:
+    """RESPONSE_COMPRESSION_MIN_BYTES 이상인 /api/ JSON·텍스트 응답 압축
+    
+    레벨은 처리량 기준 (gzip RESPONSE_GZIP_LEVEL, brotli RESPONSE_BROTLI_QUALITY)
+    xlsx/zip 등 이미 압축된 형식과 스트리밍 응답은 그대로 전송
+    """
+    
+    COMPRESSIBLE_TYPES = ('application/json', 'text/')
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+    
+    def __call__(self, request):
+        response = self.get_response(request)
+        
+        if not settings.RESPONSE_COMPRESSION_ENABLED or not request.path.startswith('/api/'):
+            return response
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+        if not response.get('Content-Type', '').startswith(self.COMPRESSIBLE_TYPES):
+            return response
+        
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if len(response.content) < settings.RESPONSE_COMPRESSION_MIN_BYTES:
+            return response
+        
+        encodings = accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        with stage('compress'):
+            if brotli is not None and 'br' in encodings:
+                encoding = 'br'
+                compressed = brotli.compress(response.content, quality=settings.RESPONSE_BROTLI_QUALITY)
+            elif 'gzip' in encodings:
+                encoding = 'gzip'
+                compressed = gzip.compress(response.content, compresslevel=settings.RESPONSE_GZIP_LEVEL, mtime=0)
+            else:
+                return response
+        
+        if len(compressed) >= len(response.content):
+            return response
+        
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = encoding
+        # 압축 표현은 원본과 바이트가 다르므로 강한 ETag는 약한 ETag로 변경
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
+
+
+class ServerTimingMiddleware:
+    """/api/ 응답에 Server-Timing 헤더 추가 (브라우저 개발자 도구 Timing 탭에서 확인)
+    
+    단계: parse(파일 읽기), extract(검색어 추출), throttle(호출 속도 제한 대기), naver(네이버 API 호출, 횟수 포함),
+    filter(결과 필터링), build(워크북 작성), save(워크북 저장), compress(응답 압축), total(전체)
+    스트리밍 응답(CSV 내보내기)은 본문 생성 전까지만 측정
+    """
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+    
+    def __call__(self, request):
+        if not settings.SERVER_TIMING_ENABLED or not request.path.startswith('/api/'):
+            return self.get_response(request)
+        
+        timer = StageTimer()
+        token = activate(timer)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            deactivate(token)
+        timer.add('total', time.perf_counter() - started)
+        
+        response['Server-Timing'] = timer.header_value()
+        # 다른 오리진(프론트엔드)에서도 Resource Timing API로 값을 읽을 수 있게 허용
+        response['Timing-Allow-Origin'] = settings.SERVER_TIMING_ALLOW_ORIGIN
+        return response
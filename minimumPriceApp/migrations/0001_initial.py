@@ -0,0 +1,41 @@
+# Generated by Django 5.2.4 on 2026-10-19 06:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RepricingJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job_key', models.CharField(max_length=64, unique=True)),
+                ('total_items', models.PositiveIntegerField()),
+                ('status', models.CharField(choices=[('running', '진행중'), ('completed', '완료')], default='running', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RepricingRowResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('item_index', models.PositiveIntegerField()),
+                ('result', models.JSONField()),
+                ('fetch_status', models.CharField(max_length=20)),
+                ('search_keyword', models.CharField(blank=True, max_length=255)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rows', to='minimumPriceApp.repricingjob')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('job', 'item_index'), name='unique_job_item_index')],
+            },
+        ),
+    ]
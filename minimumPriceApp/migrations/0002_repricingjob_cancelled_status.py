@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 16:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('minimumPriceApp', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='repricingjob',
+            name='status',
+            field=models.CharField(choices=[('running', '진행중'), ('completed', '완료'), ('cancelled', '취소')], default='running', max_length=20),
+        ),
+    ]
@@ -1,3 +1,134 @@
-from django.db import models
+import datetime
+import hashlib
+import json
 
-# Create your models here.
+from django.conf import settings
+from django.db import models, transaction
+from django.utils import timezone
+
+
+class RepricingJob(models.Model):
+    """search_prices 배치 작업 - 같은 상품 목록을 다시 요청하면 이어서 처리"""
+    
+    STATUS_RUNNING = 'running'
+    STATUS_COMPLETED = 'completed'
+    STATUS_CANCELLED = 'cancelled'
+    STATUS_CHOICES = [
+        (STATUS_RUNNING, '진행중'),
+        (STATUS_COMPLETED, '완료'),
+        (STATUS_CANCELLED, '취소'),
+    ]
+    
+    job_key = models.CharField(max_length=64, unique=True)
+    total_items = models.PositiveIntegerField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_RUNNING)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    # 이 상태의 행은 재요청 시 다시 조회하지 않음
+    DONE_FETCH_STATUSES = ('matched', 'no_match', 'no_pattern')
+    
+    def __str__(self):
+        return f"{self.job_key[:12]} ({self.status}, {self.total_items}개)"
+    
+    @staticmethod
+    def make_job_key(items):
+        """상품 목록(순서 포함) 해시 - 같은 업로드/목록이면 같은 키"""
+        payload = json.dumps(items, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    @classmethod
+    def start(cls, items):
+        """작업 생성 또는 중단/취소된 작업 재개 - 이미 완료된 작업은 처음부터 다시 조회"""
+        cls.purge_expired()
+        job, _ = cls.objects.get_or_create(
+            job_key=cls.make_job_key(items),
+            defaults={'total_items': len(items)}
+        )
+        if job.status != cls.STATUS_RUNNING:
+            if job.status == cls.STATUS_COMPLETED:
+                job.rows.all().delete()
+            job.status = cls.STATUS_RUNNING
+            job.save(update_fields=['status', 'updated_at'])
+        return job
+    
+    @classmethod
+    def resumable_rows(cls, items):
+        """같은 목록의 진행중/취소된 작업이 있으면 그 완료 행 {item_index: result} (작업은 만들지 않음)"""
+        job = cls.objects.filter(job_key=cls.make_job_key(items),
+                                 status__in=(cls.STATUS_RUNNING, cls.STATUS_CANCELLED)).first()
+        return job.completed_rows() if job else {}
+    
+    @classmethod
+    def purge_expired(cls):
+        """보관 기간이 지난 작업 삭제"""
+        cutoff = timezone.now() - datetime.timedelta(days=settings.REPRICING_JOB_RETENTION_DAYS)
+        cls.objects.filter(updated_at__lt=cutoff).delete()
+    
+    def completed_rows(self):
+        """체크포인트된 완료 행 {item_index: result}"""
+        rows = self.rows.filter(fetch_status__in=self.DONE_FETCH_STATUSES)
+        return {row.item_index: row.result for row in rows}
+    
+    def checkpoint_many(self, results):
+        """행 결과 {item_index: result} 일괄 저장 - 한 트랜잭션, bulk_create 한 번 (있는 행은 덮어씀)"""
+        if not results:
+            return
+        now = timezone.now()
+        rows = [
+            RepricingRowResult(
+                job=self,
+                item_index=item_index,
+                result=result,
+                fetch_status=result.get('fetchStatus', ''),
+                search_keyword=result.get('searchKeyword') or '',
+                updated_at=now,
+            )
+            for item_index, result in results.items()
+        ]
+        with transaction.atomic():
+            RepricingRowResult.objects.bulk_create(
+                rows,
+                update_conflicts=True,
+                unique_fields=['job', 'item_index'],
+                update_fields=['result', 'fetch_status', 'search_keyword', 'updated_at'],
+            )
+    
+    def mark_completed(self):
+        self.status = self.STATUS_COMPLETED
+        self.save(update_fields=['status', 'updated_at'])
+    
+    def cancel(self):
+        """진행 중인 작업 취소 요청 - 처리 중인 워커는 다음 조회 묶음 전에 멈춤 (취소했으면 True)"""
+        cancelled = type(self).objects.filter(pk=self.pk, status=self.STATUS_RUNNING) \
+            .update(status=self.STATUS_CANCELLED, updated_at=timezone.now())
+        if cancelled:
+            self.status = self.STATUS_CANCELLED
+        return bool(cancelled)
+    
+    def is_cancelled(self):
+        """다른 요청/워커에서 취소됐는지 DB에서 확인"""
+        return type(self).objects.filter(pk=self.pk, status=self.STATUS_CANCELLED).exists()
+    
+    def partial_results(self):
+        """지금까지 체크포인트된 행 결과 (item_index 순)"""
+        return [row.result for row in self.rows.order_by('item_index')]
+
+
+class RepricingRowResult(models.Model):
+    """배치 작업의 행 단위 결과 (체크포인트)"""
+    
+    job = models.ForeignKey(RepricingJob, on_delete=models.CASCADE, related_name='rows')
+    item_index = models.PositiveIntegerField()
+    result = models.JSONField()
+    fetch_status = models.CharField(max_length=20)
+    search_keyword = models.CharField(max_length=255, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['job', 'item_index'], name='unique_job_item_index'),
+        ]
+    
+    def __str__(self):
+        return f"{self.job_id}#{self.item_index} ({self.fetch_status})"
@@ -0,0 +1,89 @@
+"""
+Opt-in per-request profiling
+@profile_request runs cProfile + tracemalloc around a view when
+REQUEST_PROFILING_ENABLED is set or the request carries the
+X-Profile-Request header matching REQUEST_PROFILING_TOKEN, and writes the
+profile and top allocation sites to REQUEST_PROFILE_DIR (logs/profiles)
+"""
+
+import cProfile
+import functools
+import io
+import logging
+import os
+import pstats
+import time
+import tracemalloc
+
+from django.conf import settings
+
+
+def profiling_requested(request):
+    """설정으로 켜져 있거나 권한 있는 헤더(X-Profile-Request: 토큰)가 있으면 True"""
+    if settings.REQUEST_PROFILING_ENABLED:
+        return True
+    token = settings.REQUEST_PROFILING_TOKEN
+    return bool(token) and request.META.get('HTTP_X_PROFILE_REQUEST') == token
+
+
+def write_profile_report(name, profiler, snapshot, peak_bytes, elapsed):
+    """<이름>.prof(pstats, snakeviz 등으로 열기) + <이름>.txt(상위 함수/할당 위치) 저장"""
+    os.makedirs(settings.REQUEST_PROFILE_DIR, exist_ok=True)
+    base_path = os.path.join(settings.REQUEST_PROFILE_DIR, name)
+    profiler.dump_stats(f"{base_path}.prof")
+    
+    stats_text = io.StringIO()
+    pstats.Stats(profiler, stream=stats_text).sort_stats('cumulative').print_stats(settings.REQUEST_PROFILE_TOP_FUNCTIONS)
+    
+    top_allocations = snapshot.statistics('lineno')[:settings.REQUEST_PROFILE_TOP_ALLOCATIONS] if snapshot else []
+    with open(f"{base_path}.txt", 'w', encoding='utf-8') as report:
+        report.write(f"elapsed: {elapsed:.3f}s\n")
+        report.write(f"peak traced memory: {peak_bytes / 1024 / 1024:.1f} MiB\n\n")
+        report.write("== top allocation sites ==\n")
+        for stat in top_allocations:
+            report.write(f"{stat}\n")
+        report.write("\n== cProfile (cumulative) ==\n")
+        report.write(stats_text.getvalue())
+
+
+def profile_request(view):
+    """뷰 프로파일링 데코레이터 - 꺼져 있으면 조건 확인 한 번만 추가됨
+    
+    응답에 X-Profile-Id(저장 파일 이름) 헤더를 붙임
+    스트리밍 응답(CSV 내보내기)은 본문 생성 전까지만 측정됨
+    """
+    # DRF @api_view 함수는 래퍼 이름이 'view'라서 원래 함수 이름은 cls에서 가져옴
+    view_name = getattr(view, 'cls', view).__name__
+    
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not profiling_requested(request):
+            return view(request, *args, **kwargs)
+        
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}_{view_name}_{os.getpid()}"
+        # 이미 다른 곳에서 추적 중이면 시작/종료하지 않음
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start(settings.REQUEST_PROFILE_TRACE_FRAMES)
+        tracemalloc.reset_peak()
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        
+        try:
+            response = profiler.runcall(view, request, *args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            snapshot = tracemalloc.take_snapshot()
+            _, peak_bytes = tracemalloc.get_traced_memory()
+            if started_tracing:
+                tracemalloc.stop()
+            try:
+                write_profile_report(name, profiler, snapshot, peak_bytes, elapsed)
+                logging.info(f"요청 프로파일 저장: {name} ({elapsed:.2f}초, 최대 {peak_bytes / 1024 / 1024:.1f}MiB)")
+            except OSError as e:
+                logging.warning(f"요청 프로파일 저장 실패 ({name}): {e}")
+        
+        response['X-Profile-Id'] = name
+        return response
+    
+    return wrapper
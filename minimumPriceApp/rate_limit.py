@@ -0,0 +1,200 @@
+"""
+Cluster-wide Naver API rate limiting
+- Redis token bucket shared by every gunicorn/Celery worker
+- In-process token bucket fallback when Redis is unavailable
+- Daily quota counter (Naver quota resets at midnight KST)
+- Optional per-card-game rate share (NAVER_RATE_SHARES) inside game_scope()
+"""
+
+import contextlib
+import contextvars
+import datetime
+import threading
+import time
+
+from django.conf import settings
+from django.utils import timezone
+
+from .redis_client import get_redis, mark_redis_unavailable
+
+# KEYS[1]: bucket key / ARGV: rate(tokens per second), burst
+# 토큰이 있으면 1개 소비 후 0, 없으면 다음 토큰까지 대기해야 할 ms 반환
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+
+tokens = math.min(burst, tokens + (now - ts) * rate / 1000)
+
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = math.ceil((1 - tokens) * 1000 / rate)
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst * 1000 / rate) + 1000)
+return wait
+"""
+
+
+_current_game = contextvars.ContextVar('naver_rate_game', default=None)
+
+
+@contextlib.contextmanager
+def game_scope(card_game):
+    """with 블록 안의 네이버 호출은 card_game의 호출 속도 비율(NAVER_RATE_SHARES)까지만 사용"""
+    token = _current_game.set(card_game or None)
+    try:
+        yield
+    finally:
+        _current_game.reset(token)
+
+
+class QuotaExceeded(Exception):
+    """네이버 API 일일 할당량 소진"""
+    
+    def __init__(self, used, limit):
+        self.used = used
+        self.limit = limit
+        super().__init__(f"네이버 API 일일 할당량 소진 ({used}/{limit})")
+
+
+def seconds_until_quota_reset():
+    """다음 할당량 초기화(자정, 한국시간)까지 남은 초"""
+    now = timezone.localtime()
+    tomorrow = (now + datetime.timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return int((tomorrow - now).total_seconds()) + 1
+
+
+class LocalTokenBucket:
+    """프로세스 내 토큰 버킷 (Redis 미사용 시)"""
+    
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def try_acquire(self):
+        """토큰 1개 소비 시도 - 대기해야 할 초 반환 (0이면 획득)"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0
+            return (1 - self.tokens) / self.rate
+
+
+class NaverRateLimiter:
+    """모든 NaverShoppingAPI 호출이 거치는 호출 속도/일일 할당량 제한"""
+    
+    BUCKET_KEY = "naver:ratelimit:bucket"
+    QUOTA_KEY_PREFIX = "naver:ratelimit:quota:"
+    
+    def __init__(self):
+        self._local_buckets = {}
+        self._local_quota = {}
+        self._lock = threading.Lock()
+        self._script = None
+    
+    def _get_local_bucket(self, card_game=None, share=1.0):
+        if card_game not in self._local_buckets:
+            self._local_buckets[card_game] = LocalTokenBucket(
+                settings.NAVER_LOCAL_RATE_LIMIT_PER_SECOND * share,
+                settings.NAVER_RATE_LIMIT_BURST
+            )
+        return self._local_buckets[card_game]
+    
+    def _quota_key(self):
+        return f"{self.QUOTA_KEY_PREFIX}{timezone.localdate():%Y%m%d}"
+    
+    def _try_acquire_token(self, card_game=None, share=1.0):
+        """토큰 획득 시도 - 대기해야 할 초 반환 (card_game이 있으면 게임별 버킷)"""
+        client = get_redis()
+        if client is not None:
+            try:
+                if self._script is None:
+                    self._script = client.register_script(TOKEN_BUCKET_SCRIPT)
+                wait_ms = self._script(
+                    keys=[f"{self.BUCKET_KEY}:{card_game}" if card_game else self.BUCKET_KEY],
+                    args=[settings.NAVER_RATE_LIMIT_PER_SECOND * share, settings.NAVER_RATE_LIMIT_BURST],
+                    client=client
+                )
+                return int(wait_ms) / 1000
+            except Exception as e:
+                self._script = None
+                mark_redis_unavailable(e)
+        return self._get_local_bucket(card_game, share).try_acquire()
+    
+    def _wait_for_token(self, card_game=None, share=1.0):
+        while True:
+            wait = self._try_acquire_token(card_game, share)
+            if wait <= 0:
+                return
+            time.sleep(wait)
+    
+    def _incr_used(self):
+        """오늘 사용량 1 증가 후 반환"""
+        key = self._quota_key()
+        client = get_redis()
+        if client is not None:
+            try:
+                pipe = client.pipeline()
+                pipe.incr(key)
+                pipe.expire(key, 2 * 24 * 3600)
+                used, _ = pipe.execute()
+                return int(used)
+            except Exception as e:
+                mark_redis_unavailable(e)
+        with self._lock:
+            self._local_quota = {key: self._local_quota.get(key, 0) + 1}
+            return self._local_quota[key]
+    
+    def used_today(self):
+        """오늘 사용한 호출 수"""
+        key = self._quota_key()
+        client = get_redis()
+        if client is not None:
+            try:
+                return int(client.get(key) or 0)
+            except Exception as e:
+                mark_redis_unavailable(e)
+        return self._local_quota.get(key, 0)
+    
+    def remaining_today(self):
+        """오늘 남은 호출 수 (예약분 제외)"""
+        limit = settings.NAVER_DAILY_QUOTA - settings.NAVER_DAILY_QUOTA_RESERVE
+        return max(0, limit - self.used_today())
+    
+    def acquire(self):
+        """API 호출 1회 허가 - 속도 제한만큼 대기, 할당량 소진 시 QuotaExceeded
+        
+        game_scope() 안이면 게임별 비율 버킷을 먼저 통과한 뒤 전체 버킷에서 토큰을 받음
+        (게임 버킷에서 기다리는 동안 전체 토큰을 잡고 있지 않음)
+        """
+        limit = settings.NAVER_DAILY_QUOTA - settings.NAVER_DAILY_QUOTA_RESERVE
+        if self.used_today() >= limit:
+            raise QuotaExceeded(self.used_today(), limit)
+        
+        card_game = _current_game.get()
+        share = settings.NAVER_RATE_SHARES.get(card_game, 1.0) if card_game else 1.0
+        if share < 1.0:
+            self._wait_for_token(card_game, share)
+        self._wait_for_token()
+        
+        used = self._incr_used()
+        if used > limit:
+            raise QuotaExceeded(used, limit)
+
+
+naver_rate_limiter = NaverRateLimiter()
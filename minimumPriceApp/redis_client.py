@@ -0,0 +1,50 @@
+"""
+Shared Redis connection used to coordinate gunicorn/Celery workers
+Falls back to None when Redis is unreachable so callers can use in-process state
+"""
+
+import logging
+import threading
+import time
+
+from django.conf import settings
+
+RECONNECT_INTERVAL = 30
+
+_client = None
+_retry_at = 0.0
+_lock = threading.Lock()
+
+
+def get_redis():
+    """Redis 클라이언트 반환 - 설정이 없거나 연결 불가 시 None"""
+    global _client, _retry_at
+    
+    if _client is not None:
+        return _client
+    
+    url = getattr(settings, 'NAVER_REDIS_URL', None)
+    if not url or time.monotonic() < _retry_at:
+        return None
+    
+    with _lock:
+        if _client is not None:
+            return _client
+        try:
+            import redis
+            client = redis.Redis.from_url(url, socket_timeout=1, socket_connect_timeout=1)
+            client.ping()
+        except Exception as e:
+            logging.warning(f"Redis 연결 실패 - 로컬 모드로 동작 ({RECONNECT_INTERVAL}초 후 재시도): {e}")
+            _retry_at = time.monotonic() + RECONNECT_INTERVAL
+            return None
+        _client = client
+        return _client
+
+
+def mark_redis_unavailable(error):
+    """Redis 명령 실패 시 호출 - 일정 시간 로컬 모드로 전환"""
+    global _client, _retry_at
+    logging.warning(f"Redis 오류 - 로컬 모드로 전환: {error}")
+    _client = None
+    _retry_at = time.monotonic() + RECONNECT_INTERVAL
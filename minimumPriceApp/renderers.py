@@ -0,0 +1,14 @@
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from . import fastjson
+
+
+class FastJSONRenderer(JSONRenderer):
+    """orjson 기반 JSON 렌더러 - 대용량 results 목록 직렬화용"""
+    
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        # orjson이 모르는 타입(Decimal, lazy 문자열 등)은 DRF 인코더로 처리
+        return fastjson.dumps(data, default=JSONEncoder().default)
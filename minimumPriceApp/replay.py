@@ -0,0 +1,146 @@
+"""
+Naver response record / replay
+A recording stores the batch rows and the raw NaverShoppingAPI.search items
+per keyword in one gzip-compressed JSON file. Replaying runs the normal
+lookup + pricing path against the recording (no network, no rate limiting)
+so ItemFilter changes can be compared offline at full speed
+"""
+
+import contextlib
+import gzip
+import importlib
+import logging
+
+from django.utils import timezone
+
+from . import fastjson
+from . import views
+from .resilience import NaverAPIError
+
+
+class RecordingMiss(LookupError):
+    """녹화에 없는 검색어 (녹화 시 조회 실패 등)"""
+
+
+class NaverRecording:
+    """배치 행 + 검색어별 네이버 items"""
+    
+    VERSION = 1
+    
+    def __init__(self, rows, responses, recorded_at=None):
+        self.rows = rows
+        self.responses = responses
+        self.recorded_at = recorded_at
+    
+    @classmethod
+    def record(cls, rows, search=None):
+        """rows({'productName', 'price'})의 고유 검색어를 조회해 녹화 생성
+        
+        search 기본값은 NaverShoppingAPI.search (검색 캐시 사용) - 조회 실패한 검색어는 빠짐
+        QuotaExceeded는 그대로 발생
+        """
+        search = search or views.NaverShoppingAPI.search
+        responses = {}
+        failed = set()
+        for row in rows:
+            search_name, _, _ = views.CardGamePatternExtractor.extract_search_info(row['productName'])
+            if not search_name or search_name in responses or search_name in failed:
+                continue
+            try:
+                responses[search_name] = search(search_name)
+            except NaverAPIError as e:
+                logging.warning(f"녹화 조회 실패 ({search_name}): {e}")
+                failed.add(search_name)
+        return cls(rows, responses, timezone.now().isoformat())
+    
+    def search(self, search_name):
+        """NaverShoppingAPI.search 대신 쓰는 녹화 조회"""
+        try:
+            return self.responses[search_name]
+        except KeyError:
+            raise RecordingMiss(search_name) from None
+    
+    def save(self, path):
+        payload = {
+            'version': self.VERSION,
+            'recordedAt': self.recorded_at,
+            'rows': self.rows,
+            'responses': self.responses,
+        }
+        with gzip.open(path, 'wb') as output:
+            output.write(fastjson.dumps(payload))
+    
+    @classmethod
+    def load(cls, path):
+        with gzip.open(path, 'rb') as source:
+            payload = fastjson.loads(source.read())
+        if payload.get('version') != cls.VERSION:
+            raise ValueError(f"지원하지 않는 녹화 버전: {payload.get('version')}")
+        return cls(payload['rows'], payload['responses'], payload.get('recordedAt'))
+
+
+def load_filter(dotted_path):
+    """'package.module.ClassName' → 필터 클래스 (ItemFilter와 같은 staticmethod 구성)"""
+    module_path, _, class_name = dotted_path.rpartition('.')
+    return getattr(importlib.import_module(module_path), class_name)
+
+
+@contextlib.contextmanager
+def using_filter(filter_class):
+    """views.ItemFilter를 잠시 교체 - 내부 호출도 모듈 전역 이름으로 찾으므로 하위 클래스 재정의가 적용됨"""
+    original = views.ItemFilter
+    views.ItemFilter = filter_class or original
+    try:
+        yield
+    finally:
+        views.ItemFilter = original
+
+
+def replay(recording, filter_class=None):
+    """녹화된 배치를 현재(또는 filter_class) 필터로 가격 계산 - 행 순서대로 결과 dict 목록
+    
+    status: priced / no_pattern / missing(녹화에 검색어 없음)
+    """
+    results = [None] * len(recording.rows)
+    looked_up = []
+    
+    # 행마다 남는 가격 로그는 끔 (1만 행 기준 대부분의 시간이 로그 출력)
+    previous_disable = logging.root.manager.disable
+    logging.disable(logging.INFO)
+    try:
+        with using_filter(filter_class):
+            for index, row in enumerate(recording.rows):
+                product_name, price = row['productName'], float(row.get('price') or 0)
+                try:
+                    lookup = views.PriceProcessor.lookup_min_price(product_name, search=recording.search)
+                except RecordingMiss:
+                    results[index] = {'productName': product_name, 'currentPrice': price, 'newPrice': price,
+                                      'filterInfo': '녹화없음', 'validItemsCount': 0, 'status': 'missing'}
+                    continue
+                looked_up.append((index, (product_name, price, lookup)))
+        
+        priced = views.PriceProcessor.price_lookups([row for _, row in looked_up])
+    finally:
+        logging.disable(previous_disable)
+    
+    for (index, (product_name, price, lookup)), (new_price, _, _, filter_info, _, valid_count) in zip(looked_up, priced):
+        results[index] = {
+            'productName': product_name,
+            'currentPrice': price,
+            'newPrice': new_price,
+            'filterInfo': filter_info,
+            'validItemsCount': valid_count,
+            'status': 'priced' if lookup else 'no_pattern',
+        }
+    return results
+
+
+def diff_results(baseline, candidate):
+    """두 replay 결과에서 새 가격 또는 필터 정보가 다른 행 [(행 순번, 기준 결과, 비교 결과)]"""
+    if len(baseline) != len(candidate):
+        raise ValueError(f"행 수가 다름: {len(baseline)} vs {len(candidate)}")
+    return [
+        (index, base, other)
+        for index, (base, other) in enumerate(zip(baseline, candidate))
+        if base['newPrice'] != other['newPrice'] or base['filterInfo'] != other['filterInfo']
+    ]
@@ -0,0 +1,346 @@
+"""
+Naver API error classification, retry with exponential backoff, circuit breaker
+and adaptive (AIMD) concurrency limiting
+"""
+
+import collections
+import contextlib
+import logging
+import random
+import socket
+import threading
+import time
+import urllib.error
+
+from django.conf import settings
+
+from .timing import stage
+
+
+class NaverAPIError(Exception):
+    """네이버 API 호출 실패 (검색 결과 없음과 구분)"""
+    retryable = False
+    
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class NaverRateLimitError(NaverAPIError):
+    """429 - 호출 한도 초과"""
+    retryable = True
+
+
+class NaverServerError(NaverAPIError):
+    """5xx - 네이버 서버 오류"""
+    retryable = True
+
+
+class NaverTimeoutError(NaverAPIError):
+    """응답 시간 초과"""
+    retryable = True
+
+
+class NaverConnectionError(NaverAPIError):
+    """네트워크 연결 실패"""
+    retryable = True
+
+
+class NaverClientError(NaverAPIError):
+    """4xx - 잘못된 요청/인증 오류 (재시도 안 함)"""
+
+
+class NaverResponseError(NaverAPIError):
+    """응답 파싱 실패"""
+
+
+class CircuitOpenError(NaverAPIError):
+    """서킷 브레이커 열림 - 호출 차단 중"""
+
+
+def _parse_retry_after(value):
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def classify_error(error):
+    """urllib/socket 예외를 NaverAPIError 하위 타입으로 변환"""
+    if isinstance(error, NaverAPIError):
+        return error
+    
+    if isinstance(error, urllib.error.HTTPError):
+        retry_after = _parse_retry_after(error.headers.get('Retry-After')) if error.headers else None
+        if error.code == 429:
+            return NaverRateLimitError(f"HTTP 429 호출 한도 초과", retry_after=retry_after)
+        if error.code >= 500:
+            return NaverServerError(f"HTTP {error.code} 서버 오류", retry_after=retry_after)
+        return NaverClientError(f"HTTP {error.code} 요청 오류")
+    
+    if isinstance(error, (socket.timeout, TimeoutError)):
+        return NaverTimeoutError("응답 시간 초과")
+    
+    if isinstance(error, urllib.error.URLError):
+        if isinstance(error.reason, (socket.timeout, TimeoutError)):
+            return NaverTimeoutError("응답 시간 초과")
+        return NaverConnectionError(f"연결 실패: {error.reason}")
+    
+    if isinstance(error, (ConnectionError, OSError)):
+        return NaverConnectionError(f"연결 실패: {error}")
+    
+    return NaverAPIError(f"알 수 없는 오류: {error}")
+
+
+def retry_with_backoff(fn, max_attempts=None, base_delay=None, max_delay=None):
+    """재시도 가능한 NaverAPIError에 대해 지수 백오프(full jitter)로 재시도
+    
+    429/5xx 응답의 Retry-After가 있으면 그보다 먼저 재시도하지 않음
+    """
+    max_attempts = max_attempts or settings.NAVER_RETRY_MAX_ATTEMPTS
+    base_delay = base_delay if base_delay is not None else settings.NAVER_RETRY_BASE_DELAY
+    max_delay = max_delay if max_delay is not None else settings.NAVER_RETRY_MAX_DELAY
+    
+    for attempt in range(1, max_attempts + 1):
+        try:
+            return fn()
+        except NaverAPIError as e:
+            if not e.retryable or attempt == max_attempts:
+                raise
+            delay = random.uniform(0, min(max_delay, base_delay * (2 ** (attempt - 1))))
+            if e.retry_after is not None:
+                delay = max(delay, min(e.retry_after, max_delay))
+            logging.warning(f"네이버 API 재시도 {attempt}/{max_attempts - 1} ({delay:.1f}초 후): {e}")
+            time.sleep(delay)
+
+
+class CircuitBreaker:
+    """최근 호출의 오류율이 기준을 넘으면 일정 시간 호출 차단
+    
+    closed → (오류율 초과) → open → (cooldown 경과) → half-open: 1회 시험 호출
+    시험 호출 성공 시 closed, 실패 시 다시 open
+    """
+    
+    def __init__(self, window=None, min_calls=None, error_rate=None, cooldown=None):
+        self._window = window
+        self._min_calls = min_calls
+        self._error_rate = error_rate
+        self._cooldown = cooldown
+        self._outcomes = collections.deque()
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+    
+    @property
+    def window(self):
+        return self._window or settings.NAVER_CIRCUIT_WINDOW
+    
+    @property
+    def min_calls(self):
+        return self._min_calls or settings.NAVER_CIRCUIT_MIN_CALLS
+    
+    @property
+    def error_rate(self):
+        return self._error_rate or settings.NAVER_CIRCUIT_ERROR_RATE
+    
+    @property
+    def cooldown(self):
+        return self._cooldown or settings.NAVER_CIRCUIT_COOLDOWN
+    
+    def _prune(self, now):
+        while self._outcomes and now - self._outcomes[0][0] > self.window:
+            self._outcomes.popleft()
+    
+    def retry_after(self):
+        """열려 있으면 half-open까지 남은 초, 아니면 0"""
+        with self._lock:
+            if self._opened_at is None:
+                return 0
+            return max(0.0, self._opened_at + self.cooldown - time.monotonic())
+    
+    def _before_call(self):
+        with self._lock:
+            if self._opened_at is None:
+                return
+            remaining = self._opened_at + self.cooldown - time.monotonic()
+            if remaining > 0 or self._trial_in_flight:
+                raise CircuitOpenError("서킷 브레이커 열림 - 네이버 API 호출 일시 중단",
+                                       retry_after=max(remaining, 0))
+            self._trial_in_flight = True
+    
+    def _record(self, ok):
+        now = time.monotonic()
+        with self._lock:
+            if self._trial_in_flight:
+                self._trial_in_flight = False
+                if ok:
+                    logging.info("서킷 브레이커 닫힘 - 네이버 API 호출 재개")
+                    self._opened_at = None
+                    self._outcomes.clear()
+                else:
+                    self._opened_at = now
+                return
+            
+            self._outcomes.append((now, ok))
+            self._prune(now)
+            failures = sum(1 for _, success in self._outcomes if not success)
+            if (self._opened_at is None and len(self._outcomes) >= self.min_calls
+                    and failures / len(self._outcomes) >= self.error_rate):
+                logging.error(f"서킷 브레이커 열림 - 최근 {len(self._outcomes)}회 중 {failures}회 실패, "
+                              f"{self.cooldown}초간 호출 중단")
+                self._opened_at = now
+    
+    def call(self, fn):
+        """fn() 실행 - NaverAPIError는 실패로 집계"""
+        self._before_call()
+        try:
+            result = fn()
+        except NaverAPIError:
+            self._record(False)
+            raise
+        except Exception:
+            # API 호출 전 단계 오류(할당량 등)는 집계하지 않음
+            with self._lock:
+                self._trial_in_flight = False
+            raise
+        self._record(True)
+        return result
+    
+    def wait_if_open(self, max_wait):
+        """열려 있으면 half-open까지 최대 max_wait초 대기 - 실제 대기한 초 반환"""
+        wait = min(self.retry_after(), max(0.0, max_wait))
+        if wait > 0:
+            logging.warning(f"서킷 브레이커 열림 - 배치 {wait:.1f}초 일시 정지")
+            time.sleep(wait)
+        return wait
+
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD 방식 동시 호출 수 제한 (워커 프로세스 단위)
+    
+    지연 시간이 목표 이하인 성공 호출마다 limit += 1/limit (limit회 성공하면 +1),
+    429/시간 초과 시 limit *= backoff, limit은 [min_limit, max_limit]
+    직전 축소 전에 시작한 호출의 실패는 같은 과부하로 보고 다시 줄이지 않음
+    동시 호출이 int(limit)개면 슬롯이 빌 때까지 대기
+    """
+    
+    OVERLOAD_ERRORS = (NaverRateLimitError, NaverTimeoutError)
+    
+    def __init__(self, initial=None, min_limit=None, max_limit=None, latency_target=None, backoff=None):
+        self._initial = initial
+        self._min_limit = min_limit
+        self._max_limit = max_limit
+        self._latency_target = latency_target
+        self._backoff = backoff
+        self._limit = None
+        self._in_flight = 0
+        self._waiting = 0
+        self._latencies = collections.deque(maxlen=200)
+        self._latency_ewma = None
+        self._calls = 0
+        self._overloads = 0
+        self._decreases = 0
+        self._last_decrease = None
+        self._condition = threading.Condition()
+    
+    @property
+    def min_limit(self):
+        return self._min_limit or settings.NAVER_CONCURRENCY_MIN
+    
+    @property
+    def max_limit(self):
+        return self._max_limit or settings.NAVER_CONCURRENCY_MAX
+    
+    @property
+    def latency_target(self):
+        return self._latency_target or settings.NAVER_CONCURRENCY_LATENCY_TARGET
+    
+    @property
+    def backoff(self):
+        return self._backoff or settings.NAVER_CONCURRENCY_BACKOFF
+    
+    @property
+    def limit(self):
+        """현재 동시 호출 한도 (소수점 이하는 누적 중인 증가분)"""
+        if self._limit is None:
+            initial = self._initial or settings.NAVER_CONCURRENCY_INITIAL
+            self._limit = float(min(self.max_limit, max(self.min_limit, initial)))
+        return self._limit
+    
+    def acquire(self):
+        """슬롯 1개 획득 - 동시 호출이 한도에 차 있으면 대기"""
+        with self._condition:
+            self._waiting += 1
+            try:
+                while self._in_flight >= int(self.limit):
+                    self._condition.wait()
+            finally:
+                self._waiting -= 1
+            self._in_flight += 1
+    
+    def release(self, started, latency=None, overloaded=False):
+        """슬롯 반환 - 호출 결과로 한도 조정 (started: acquire 직후 time.monotonic())"""
+        with self._condition:
+            self._in_flight -= 1
+            self._calls += 1
+            if latency is not None:
+                self._latencies.append(latency)
+                self._latency_ewma = latency if self._latency_ewma is None \
+                    else 0.8 * self._latency_ewma + 0.2 * latency
+            
+            limit = self.limit
+            if overloaded:
+                self._overloads += 1
+                # 한 번의 과부하로 동시에 실패한 호출들이 연달아 줄이지 않도록 축소 이후 시작한 호출만 반영
+                if self._last_decrease is None or started >= self._last_decrease:
+                    self._last_decrease = time.monotonic()
+                    self._decreases += 1
+                    self._limit = max(float(self.min_limit), limit * self.backoff)
+                    logging.warning(f"네이버 API 동시 호출 한도 축소 {limit:.1f} → {self._limit:.1f}")
+            elif latency is not None and latency <= self.latency_target:
+                self._limit = min(float(self.max_limit), limit + 1 / limit)
+                if int(self._limit) > int(limit):
+                    logging.info(f"네이버 API 동시 호출 한도 증가 → {int(self._limit)}")
+            self._condition.notify_all()
+    
+    @contextlib.contextmanager
+    def slot(self):
+        """with 블록 동안 슬롯 점유 - 429/시간 초과는 과부하로 집계, 그 외 실패는 한도 유지"""
+        with stage('throttle'):
+            self.acquire()
+        started = time.monotonic()
+        try:
+            yield
+        except self.OVERLOAD_ERRORS:
+            self.release(started, overloaded=True)
+            raise
+        except BaseException:
+            self.release(started)
+            raise
+        self.release(started, time.monotonic() - started)
+    
+    def snapshot(self):
+        """현재 한도와 관측 지연 시간 (메트릭)"""
+        with self._condition:
+            latencies = sorted(self._latencies)
+            
+            def percentile(ratio):
+                if not latencies:
+                    return None
+                return round(latencies[min(len(latencies) - 1, int(len(latencies) * ratio))] * 1000, 1)
+            
+            return {
+                'limit': int(self.limit),
+                'limitExact': round(self.limit, 2),
+                'minLimit': self.min_limit,
+                'maxLimit': self.max_limit,
+                'inFlight': self._in_flight,
+                'waiting': self._waiting,
+                'latencyEwmaMs': round(self._latency_ewma * 1000, 1) if self._latency_ewma is not None else None,
+                'latencyP50Ms': percentile(0.5),
+                'latencyP95Ms': percentile(0.95),
+                'latencyTargetMs': round(self.latency_target * 1000, 1),
+                'calls': self._calls,
+                'overloads': self._overloads,
+                'decreases': self._decreases,
+            }
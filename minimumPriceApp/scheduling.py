@@ -0,0 +1,68 @@
+"""
+Value-priority ordering of search_prices batch items
+Rows are processed highest expected value first, so a run cut short by its
+time budget leaves only the cheap / recently checked rows unpriced
+"""
+
+from django.conf import settings
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import RepricingRowResult
+
+
+class BatchScheduler:
+    """가격 검색 순서 결정 - 기대 가치(현재가 × 카드게임 가중치 × 경과 시간) 내림차순"""
+    
+    @staticmethod
+    def last_checked(search_keywords):
+        """검색어별 마지막 조회 시각 {search_keyword: datetime}"""
+        keywords = {keyword for keyword in search_keywords if keyword}
+        if not keywords:
+            return {}
+        rows = (RepricingRowResult.objects
+                .filter(search_keyword__in=keywords, fetch_status__in=('matched', 'no_match'))
+                .values('search_keyword')
+                .annotate(last=Max('updated_at')))
+        return {row['search_keyword']: row['last'] for row in rows}
+    
+    @staticmethod
+    def priority(current_price, card_type, last_checked_at, now=None):
+        """기대 가치 점수 - 높을수록 먼저 처리"""
+        if not card_type:
+            # 검색 패턴이 없는 행은 API 호출이 없으므로 가장 나중에
+            return 0.0
+        
+        try:
+            price = max(float(current_price or 0), 0.0)
+        except (TypeError, ValueError):
+            price = 0.0
+        
+        weight = settings.REPRICING_GAME_WEIGHTS.get(card_type, 1.0)
+        
+        cap = settings.REPRICING_STALENESS_CAP
+        if last_checked_at is None:
+            staleness = cap
+        else:
+            hours = ((now or timezone.now()) - last_checked_at).total_seconds() / 3600
+            staleness = min(cap, 1 + hours / settings.REPRICING_STALENESS_HOURS)
+        
+        # 가격 0원 행도 순서가 정해지도록 최소값 1
+        return (price + 1) * weight * staleness
+    
+    @staticmethod
+    def order(entries, last_checked=None):
+        """entries: [(item_index, current_price, card_type, search_keyword)] → 처리할 item_index 순서
+        
+        last_checked: 미리 조회한 last_checked() 결과 (없으면 여기서 DB 조회)
+        """
+        if last_checked is None:
+            last_checked = BatchScheduler.last_checked(entry[3] for entry in entries)
+        now = timezone.now()
+        scored = [
+            (BatchScheduler.priority(price, card_type, last_checked.get(keyword), now), item_index)
+            for item_index, price, card_type, keyword in entries
+        ]
+        # 점수 동률이면 시트 순서 유지
+        scored.sort(key=lambda pair: (-pair[0], pair[1]))
+        return [item_index for _, item_index in scored]
@@ -0,0 +1,171 @@
+"""
+Naver search result cache
+Raw API items are cached per normalized query so repeated / warmed keywords
+skip the API; filtering and pricing are always re-applied to cached items.
+Empty results are cached briefly, stale entries are served while a Celery
+task refreshes them, and expirations are jittered
+"""
+
+import datetime
+import hashlib
+import logging
+import random
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import RepricingRowResult
+from .singleflight import normalize_query
+
+
+class SearchResultCache:
+    """검색어 → 네이버 items 캐시 (settings.CACHES['naver_search'])
+    
+    항목은 {'items', 'fresh_until'} 형태로 저장
+    - 결과 없음([])도 NAVER_SEARCH_NEGATIVE_TTL 동안 저장 (매 배치 재조회 방지)
+    - 결과는 있지만 쓸 수 있는 가격이 없는 검색어(TCG999 없음 등)도 mark_unusable로 같은 짧은 TTL 적용
+    - fresh_until이 지난 뒤 NAVER_SEARCH_STALE_TTL 동안은 기존 items를 바로 반환하고 백그라운드에서 갱신
+    - 만료 시각은 ±NAVER_SEARCH_CACHE_TTL_JITTER 비율로 흩어 같은 시각에 몰려 만료되지 않게 함
+    """
+    
+    KEY_PREFIX = "naver:search:"
+    REFRESH_LOCK_PREFIX = "naver:search:refreshing:"
+    
+    @staticmethod
+    def _cache():
+        return caches['naver_search']
+    
+    @staticmethod
+    def make_key(search_name):
+        digest = hashlib.sha1(normalize_query(search_name).encode('utf-8')).hexdigest()
+        return f"{SearchResultCache.KEY_PREFIX}{digest}"
+    
+    @staticmethod
+    def jittered(seconds):
+        jitter = settings.NAVER_SEARCH_CACHE_TTL_JITTER
+        return seconds * random.uniform(1 - jitter, 1 + jitter)
+    
+    @staticmethod
+    def get(search_name, revalidate=True):
+        """캐시된 items 반환, 없으면 None
+        
+        신선 기간이 지난 항목은 그대로 반환하면서 revalidate=True면 백그라운드 갱신 예약
+        """
+        try:
+            entry = SearchResultCache._cache().get(SearchResultCache.make_key(search_name))
+        except Exception as e:
+            logging.warning(f"검색 캐시 조회 실패 ({search_name}): {e}")
+            return None
+        
+        if entry is None:
+            return None
+        if isinstance(entry, list):  # 이전 형식 (items만 저장)
+            return entry
+        
+        if revalidate and time.time() >= entry['fresh_until']:
+            SearchResultCache.schedule_refresh(search_name)
+        return entry['items']
+    
+    @staticmethod
+    def get_many(search_names):
+        """여러 검색어를 한 번에 조회 → {검색어: items} (캐시에 없는 검색어는 빠짐, 갱신 예약 안 함)
+        
+        Redis 캐시면 MGET 한 번 - search_prices 미리보기(dryRun)용
+        """
+        keys = {SearchResultCache.make_key(search_name): search_name for search_name in search_names}
+        try:
+            entries = SearchResultCache._cache().get_many(list(keys))
+        except Exception as e:
+            logging.warning(f"검색 캐시 일괄 조회 실패: {e}")
+            return {}
+        return {
+            keys[key]: entry if isinstance(entry, list) else entry['items']
+            for key, entry in entries.items()
+        }
+    
+    @staticmethod
+    def uncached_count(search_names):
+        """캐시에 없는(조회가 필요한) 검색어 수 - 할당량 사전 확인용"""
+        search_names = {normalize_query(search_name) for search_name in search_names}
+        if not search_names:
+            return 0
+        return len(search_names) - len(SearchResultCache.get_many(search_names))
+    
+    @staticmethod
+    def set(search_name, items):
+        """items 저장 - 결과 없음은 짧은 TTL, 캐시 보관 기간은 신선 기간 + stale 기간"""
+        fresh_ttl = SearchResultCache.jittered(
+            settings.NAVER_SEARCH_CACHE_TTL if items else settings.NAVER_SEARCH_NEGATIVE_TTL
+        )
+        entry = {'items': items, 'fresh_until': time.time() + fresh_ttl}
+        try:
+            SearchResultCache._cache().set(
+                SearchResultCache.make_key(search_name), entry, int(fresh_ttl + settings.NAVER_SEARCH_STALE_TTL)
+            )
+        except Exception as e:
+            logging.warning(f"검색 캐시 저장 실패 ({search_name}): {e}")
+    
+    @staticmethod
+    def mark_unusable(search_name):
+        """쓸 수 있는 가격이 없는 결과 - 신선 기간을 결과 없음과 같은 NAVER_SEARCH_NEGATIVE_TTL로 줄임"""
+        key = SearchResultCache.make_key(search_name)
+        try:
+            entry = SearchResultCache._cache().get(key)
+            if entry is None:
+                return
+            if isinstance(entry, list):
+                entry = {'items': entry, 'fresh_until': float('inf')}
+            
+            # 이미 짧은 TTL이면 그대로 (같은 검색어 행마다 다시 쓰지 않음)
+            max_negative_ttl = settings.NAVER_SEARCH_NEGATIVE_TTL * (1 + settings.NAVER_SEARCH_CACHE_TTL_JITTER)
+            if entry['fresh_until'] <= time.time() + max_negative_ttl:
+                return
+            
+            fresh_ttl = SearchResultCache.jittered(settings.NAVER_SEARCH_NEGATIVE_TTL)
+            SearchResultCache._cache().set(
+                key, {'items': entry['items'], 'fresh_until': time.time() + fresh_ttl},
+                int(fresh_ttl + settings.NAVER_SEARCH_STALE_TTL)
+            )
+        except Exception as e:
+            logging.warning(f"검색 캐시 TTL 단축 실패 ({search_name}): {e}")
+    
+    @staticmethod
+    def schedule_refresh(search_name):
+        """Celery로 검색어 재조회 예약 - 같은 검색어는 NAVER_SEARCH_REFRESH_LOCK_TTL 동안 한 번만"""
+        lock_key = SearchResultCache.REFRESH_LOCK_PREFIX + SearchResultCache.make_key(search_name)
+        try:
+            if not SearchResultCache._cache().add(lock_key, 1, settings.NAVER_SEARCH_REFRESH_LOCK_TTL):
+                return
+            from .tasks import refresh_search_result
+            
+            # 브로커 장애 시 요청이 재시도로 멈추지 않도록 retry=False (갱신은 다음 조회 때 다시 시도)
+            refresh_search_result.apply_async((search_name,), retry=False)
+        except Exception as e:
+            logging.warning(f"검색 캐시 갱신 예약 실패 ({search_name}): {e}")
+    
+    @staticmethod
+    def release_refresh(search_name):
+        try:
+            SearchResultCache._cache().delete(
+                SearchResultCache.REFRESH_LOCK_PREFIX + SearchResultCache.make_key(search_name)
+            )
+        except Exception as e:
+            logging.warning(f"검색 캐시 갱신 잠금 해제 실패 ({search_name}): {e}")
+    
+    @staticmethod
+    def hot_keywords(days=None, limit=None):
+        """최근 배치에서 자주 조회된 검색어 (많은 순)"""
+        days = days or settings.NAVER_CACHE_WARMUP_LOOKBACK_DAYS
+        since = timezone.now() - datetime.timedelta(days=days)
+        rows = (RepricingRowResult.objects
+                .filter(updated_at__gte=since, fetch_status__in=('matched', 'no_match'))
+                .exclude(search_keyword='')
+                .values('search_keyword')
+                .annotate(requests=Count('id'))
+                .order_by('-requests', 'search_keyword'))
+        if limit is not None:
+            rows = rows[:limit]
+        return [row['search_keyword'] for row in rows]
@@ -0,0 +1,115 @@
+"""
+Single-flight request coalescing
+Concurrent callers asking for the same key share one in-flight call:
+- within a worker via a per-key threading.Event
+- across workers (optional) via a Redis lock + short-lived shared result
+"""
+
+import logging
+import re
+import threading
+import time
+import uuid
+
+from django.conf import settings
+
+from . import fastjson
+from .redis_client import get_redis, mark_redis_unavailable
+
+POLL_INTERVAL = 0.05
+
+
+def normalize_query(query):
+    """검색어 정규화 - 공백 정리 + 소문자"""
+    return re.sub(r'\s+', ' ', query).strip().lower()
+
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """동일 키 동시 호출을 하나로 합침"""
+    
+    def __init__(self, namespace):
+        self.namespace = namespace
+        self._calls = {}
+        self._lock = threading.Lock()
+    
+    def do(self, key, fn):
+        """key에 대해 진행 중인 호출이 있으면 그 결과를 기다려 공유, 없으면 fn() 실행"""
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = _Call()
+                self._calls[key] = call
+        
+        if not is_leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        
+        try:
+            call.result = self._do_shared(key, fn)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+    
+    def _do_shared(self, key, fn):
+        """워커 간 합치기 - Redis 락을 잡은 워커만 fn() 실행, 나머지는 공유 결과 대기"""
+        client = get_redis() if settings.NAVER_SINGLE_FLIGHT_SHARED else None
+        if client is None:
+            return fn()
+        
+        lock_key = f"{self.namespace}:lock:{key}"
+        result_key = f"{self.namespace}:result:{key}"
+        timeout = settings.NAVER_SINGLE_FLIGHT_TIMEOUT
+        token = uuid.uuid4().hex
+        
+        try:
+            acquired = client.set(lock_key, token, nx=True, px=int(timeout * 1000))
+        except Exception as e:
+            mark_redis_unavailable(e)
+            return fn()
+        
+        if acquired:
+            try:
+                result = fn()
+                try:
+                    client.set(result_key, fastjson.dumps(result), px=int(timeout * 1000))
+                except Exception as e:
+                    mark_redis_unavailable(e)
+                return result
+            finally:
+                try:
+                    if client.get(lock_key) == token.encode():
+                        client.delete(lock_key)
+                except Exception:
+                    pass
+        
+        # 다른 워커가 호출 중 - 결과가 올라오거나 락이 풀릴 때까지 대기
+        deadline = time.monotonic() + timeout
+        try:
+            while time.monotonic() < deadline:
+                shared = client.get(result_key)
+                if shared is not None:
+                    logging.info(f"다른 워커의 동일 검색 결과 공유: {key}")
+                    return fastjson.loads(shared)
+                if not client.exists(lock_key):
+                    break
+                time.sleep(POLL_INTERVAL)
+        except Exception as e:
+            mark_redis_unavailable(e)
+        
+        # 선행 호출이 실패했거나 시간 초과 - 직접 호출
+        return fn()
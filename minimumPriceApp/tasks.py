@@ -1,7 +1,110 @@
-from celery import shared_task
+import itertools
+import logging
 
-# @shared_task
-# def search_prices_task(params):
-#     # 시간이 오래 걸리는 작업
-#     result = do_search(params)
-#     return result
\ No newline at end of file
+from celery import chord, shared_task
+from django.conf import settings
+
+from .rate_limit import QuotaExceeded, naver_rate_limiter
+from .resilience import NaverAPIError
+from .search_cache import SearchResultCache
+from .views import NaverShoppingAPI, PriceProcessor
+
+
+@shared_task
+def search_prices_chunk(items, start_index=0, total=None, job_id=None, deadline=None, indices=None, card_game=None):
+    """search_prices 배치의 한 청크 처리 - 결과는 result backend에 저장"""
+    return PriceProcessor.process_items(items, start_index=start_index, total=total, job_id=job_id,
+                                        deadline=deadline, indices=indices, card_game=card_game)
+
+
+@shared_task
+def aggregate_search_chunks(chunk_results, chunk_indices=None):
+    """청크 결과를 원래 items 순서대로 합침 (chunk_indices: 청크별 원래 행 번호)"""
+    if chunk_indices is None:
+        results = []
+        for chunk in chunk_results:
+            results.extend(chunk)
+        return results
+    
+    if len(chunk_results) != len(chunk_indices):
+        raise ValueError(f"청크 결과 수 불일치: {len(chunk_results)}/{len(chunk_indices)}")
+    results_by_index = {}
+    for indices, chunk in zip(chunk_indices, chunk_results):
+        # 빠진 행이 있으면 조용히 건너뛰지 않고 실패 처리
+        if len(chunk) != len(indices):
+            raise ValueError(f"청크 결과 행 수 불일치: {len(chunk)}/{len(indices)} (행 {indices[0]}부터)")
+        results_by_index.update(zip(indices, chunk))
+    return [results_by_index[item_index] for item_index in sorted(results_by_index)]
+
+
+def game_queue(card_game):
+    """카드게임별 Celery 큐 - REPRICING_GAME_QUEUES_ENABLED가 꺼져 있으면 기본 큐"""
+    if not settings.REPRICING_GAME_QUEUES_ENABLED:
+        return settings.REPRICING_DEFAULT_QUEUE
+    return settings.REPRICING_GAME_QUEUES.get(card_game, settings.REPRICING_DEFAULT_QUEUE)
+
+
+def dispatch_search_batch(items, chunk_size=None, job_id=None, deadline=None):
+    """items를 카드게임별 청크로 나눠 group/chord로 분산 실행 - AsyncResult 반환
+    
+    청크는 게임별 큐(game_queue)로 보내고, 같은 큐를 쓸 때도 게임별 청크를 번갈아 넣어
+    포켓몬 청크가 앞을 모두 차지하지 않게 함
+    """
+    chunk_size = chunk_size or settings.SEARCH_PRICES_CHUNK_SIZE
+    lane_chunks = [
+        [(card_game, lane[start:start + chunk_size]) for start in range(0, len(lane), chunk_size)]
+        for card_game, lane in PriceProcessor.split_by_game(items).items()
+    ]
+    
+    header = []
+    chunk_indices = []
+    for round_chunks in itertools.zip_longest(*lane_chunks):
+        for card_game, chunk in filter(None, round_chunks):
+            indices = [item_index for item_index, _ in chunk]
+            header.append(
+                search_prices_chunk.s([item for _, item in chunk], 0, len(items), job_id, deadline,
+                                      indices, card_game).set(queue=game_queue(card_game))
+            )
+            chunk_indices.append(indices)
+    return chord(header)(aggregate_search_chunks.s(chunk_indices))
+
+
+@shared_task
+def warm_search_cache():
+    """자주 조회되는 검색어를 미리 조회해 캐시 갱신 (Celery beat, 새벽 시간대)
+    
+    일일 할당량 중 NAVER_CACHE_WARMUP_QUOTA_SHARE 비율까지만 사용
+    """
+    budget = min(
+        int(settings.NAVER_DAILY_QUOTA * settings.NAVER_CACHE_WARMUP_QUOTA_SHARE),
+        naver_rate_limiter.remaining_today()
+    )
+    keywords = SearchResultCache.hot_keywords(limit=budget)
+    logging.info(f"검색 캐시 예열 시작 - 인기 검색어 {len(keywords)}개 (할당량 {budget}회)")
+    
+    warmed = 0
+    failed = 0
+    for keyword in keywords:
+        try:
+            NaverShoppingAPI.search(keyword, refresh=True)
+            warmed += 1
+        except QuotaExceeded as e:
+            logging.warning(f"검색 캐시 예열 중단 - {e}")
+            break
+        except NaverAPIError as e:
+            logging.warning(f"검색 캐시 예열 실패 ({keyword}): {e}")
+            failed += 1
+    
+    logging.info(f"검색 캐시 예열 완료 - 성공 {warmed}개, 실패 {failed}개")
+    return {'warmed': warmed, 'failed': failed, 'budget': budget}
+
+
+@shared_task
+def refresh_search_result(search_name):
+    """신선 기간이 지난 검색 캐시 항목 재조회 (SearchResultCache.get이 예약)"""
+    try:
+        NaverShoppingAPI.search(search_name, refresh=True)
+    except (QuotaExceeded, NaverAPIError) as e:
+        logging.warning(f"검색 캐시 갱신 실패 ({search_name}): {e}")
+    finally:
+        SearchResultCache.release_refresh(search_name)
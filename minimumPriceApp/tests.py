@@ -1,3 +1,1580 @@
-from django.test import TestCase
+import csv
+import datetime
+import gzip
+import json
+import itertools
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import zipfile
+from email.message import Message
+from io import BytesIO, StringIO
+from unittest import mock
 
-# Create your tests here.
+import fakeredis
+import openpyxl
+from django.conf import settings
+from django.core.cache import caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.http import HttpResponse, JsonResponse
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from . import redis_client, tasks
+from .middleware import ResponseCompressionMiddleware, brotli
+from .models import RepricingJob, RepricingRowResult
+from .replay import NaverRecording
+from .resilience import (
+    AdaptiveConcurrencyLimiter, CircuitBreaker, CircuitOpenError, NaverAPIError, NaverClientError, NaverConnectionError,
+    NaverRateLimitError, NaverServerError, NaverTimeoutError, classify_error, retry_with_backoff,
+)
+from .rate_limit import LocalTokenBucket, NaverRateLimiter, QuotaExceeded, naver_rate_limiter
+from .search_cache import SearchResultCache
+from .singleflight import SingleFlight
+from .views import (
+    PLUS_PRICE, DATA_START_ROW, PRICE_COLUMN, PRODUCT_NAME_COLUMN, CardGamePatternExtractor, ExcelExporter, ItemFilter,
+    NaverShoppingAPI, PokemonNameMatcher, PriceProcessor, to_columnar,
+)
+
+
+def fake_search(search_name):
+    """검색어 끝 번호로 가격이 정해지는 네이버 응답 (OP01-007 → 7,000원, 번호 없으면 1,000원)"""
+    suffix = search_name.rsplit('-', 1)[-1]
+    number = int(suffix) if suffix.isdigit() else 1
+    return [{'title': search_name, 'lprice': str(number * 1000), 'mallName': 'shop'}]
+
+
+def make_items(count, prefix='OP01'):
+    return [{'productName': f'{prefix}-{i:03d} 카드', 'currentPrice': 100} for i in range(1, count + 1)]
+
+
+def make_csv_bytes(rows):
+    """업로드 양식(D열 상품명, F열 가격, 6행부터)의 CSV 내용 - rows: [(상품명, 가격 문자열)]"""
+    lines = [''] * (DATA_START_ROW - 1)
+    lines.extend(f',,,{product_name},,{price}' for product_name, price in rows)
+    return '\n'.join(lines).encode('utf-8')
+
+
+def make_workbook_file(product_names, name='catalog.xlsx', prices=None):
+    """업로드 양식(D열 상품명, F열 가격, 6행부터)의 xlsx"""
+    workbook = openpyxl.Workbook()
+    worksheet = workbook.active
+    for row, (product_name, price) in enumerate(zip(product_names, prices or [1000] * len(product_names)),
+                                                DATA_START_ROW):
+        worksheet.cell(row=row, column=PRODUCT_NAME_COLUMN + 1, value=product_name)
+        worksheet.cell(row=row, column=PRICE_COLUMN + 1, value=price)
+    output = BytesIO()
+    workbook.save(output)
+    return SimpleUploadedFile(name, output.getvalue())
+
+
+EXPORT_ROWS = [
+    ('OP01-001 카드', 1000, 5),
+    ('OP01-002 카드', 2000, 3),
+    ('OP01-003 카드', 3000, 1),
+]
+
+EXPORT_MODIFICATIONS = [
+    {'excelRow': 2, 'productName': 'OP01-001 카드', 'price': 1500, 'stock': 5, 'filterInfo': '', 'validCount': 2},
+    {'excelRow': 3, 'productName': 'OP01-002 카드', 'price': 2000, 'stock': 3, 'filterInfo': '', 'validCount': 1},
+    {'excelRow': 4, 'productName': 'OP01-003 카드', 'price': 3000, 'stock': 0, 'filterInfo': '', 'validCount': 1},
+]
+
+
+def make_export_workbook():
+    """download_excel 입력 시트 - 1행 헤더, F열 가격, H열 재고 (EXPORT_ROWS)"""
+    workbook = openpyxl.Workbook()
+    worksheet = workbook.active
+    worksheet.append(['A', 'B', 'C', '상품명', 'E', '가격', 'G', '재고'])
+    for product_name, price, stock in EXPORT_ROWS:
+        worksheet.append(['', '', '', product_name, '', price, '', stock])
+    output = BytesIO()
+    workbook.save(output)
+    return output.getvalue()
+
+
+@mock.patch.object(NaverShoppingAPI, 'search', staticmethod(fake_search))
+class SearchFanOutTests(TestCase):
+    """search_prices 청크 분산 처리 (Celery chord, 테스트에서는 즉시 실행)"""
+
+    def test_results_aggregated_in_input_order_across_chunks(self):
+        items = make_items(7)
+        results = tasks.dispatch_search_batch(items, chunk_size=3).get()
+
+        self.assertEqual([result['productName'] for result in results], [item['productName'] for item in items])
+        self.assertEqual([result['newPrice'] for result in results], [i * 1000 for i in range(1, 8)])
+
+    def test_mixed_games_keep_input_order(self):
+        items = make_items(3) + [{'productName': '포켓몬카드 피카츄 SAR 001', 'currentPrice': 100}] + make_items(2, 'OP02')
+        results = tasks.dispatch_search_batch(items, chunk_size=2).get()
+
+        self.assertEqual([result['productName'] for result in results], [item['productName'] for item in items])
+
+    def test_failed_chunk_raises_instead_of_dropping_rows(self):
+        original = PriceProcessor.process_items
+
+        def failing(items, **kwargs):
+            if any(item['productName'].startswith('OP01-004') for item in items):
+                raise RuntimeError("chunk failed")
+            return original(items, **kwargs)
+
+        with mock.patch.object(PriceProcessor, 'process_items', side_effect=failing):
+            with self.assertRaises(RuntimeError):
+                tasks.dispatch_search_batch(make_items(7), chunk_size=3).get()
+
+    def test_aggregate_rejects_short_chunk(self):
+        with self.assertRaises(ValueError):
+            tasks.aggregate_search_chunks([[{'productName': 'a'}], []], [[0], [1]])
+
+    @override_settings(SEARCH_PRICES_FANOUT_ENABLED=True, SEARCH_PRICES_CHUNK_SIZE=3)
+    def test_search_prices_fan_out_failure_is_an_error_response(self):
+        with mock.patch.object(tasks.search_prices_chunk, 'run', side_effect=RuntimeError("worker lost")):
+            response = APIClient().post('/api/search-prices/', {'items': make_items(7)}, format='json')
+
+        self.assertEqual(response.status_code, 500)
+        self.assertNotIn('results', response.json())
+
+
+@override_settings(NAVER_DAILY_QUOTA=3, NAVER_DAILY_QUOTA_RESERVE=0)
+@mock.patch.object(NaverShoppingAPI, 'search', staticmethod(fake_search))
+class QuotaPrecheckTests(TestCase):
+    """할당량 사전 확인 - 고유 검색어 중 캐시/체크포인트에 없는 것만 필요 호출로 계산"""
+
+    def setUp(self):
+        caches['naver_search'].clear()
+        naver_rate_limiter._local_quota = {}
+
+    def test_duplicate_and_cached_rows_do_not_count(self):
+        # 30개 행, 고유 검색어 5개 중 4개는 캐시에 있음 → 필요 호출 1회
+        items = make_items(5) * 6
+        for i in range(1, 5):
+            SearchResultCache.set(f'OP01-{i:03d}', fake_search(f'OP01-{i:03d}'))
+
+        self.assertEqual(PriceProcessor.required_api_calls(items), 1)
+        response = APIClient().post('/api/search-prices/', {'items': items}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+    def test_rejects_when_uncached_queries_exceed_quota(self):
+        response = APIClient().post('/api/search-prices/', {'items': make_items(5) * 2}, format='json')
+
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.json()['requiredQuota'], 5)
+
+    def test_checkpointed_rows_of_resumed_job_do_not_count(self):
+        items = make_items(5)
+        job = RepricingJob.start(items)
+        PriceProcessor.process_items(items[:3], job_id=job.pk)
+        job.cancel()
+        caches['naver_search'].clear()
+        naver_rate_limiter._local_quota = {}
+
+        self.assertEqual(PriceProcessor.required_api_calls(items, RepricingJob.resumable_rows(items)), 2)
+        response = APIClient().post('/api/search-prices/', {'items': items}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+    def test_batch_endpoint_skips_cached_keywords(self):
+        names = [f'OP01-{i:03d} 카드' for i in range(1, 6)]
+        for i in range(1, 4):
+            SearchResultCache.set(f'OP01-{i:03d}', fake_search(f'OP01-{i:03d}'))
+
+        response = APIClient().post('/api/search-prices-batch/', {'files': [make_workbook_file(names)]})
+        self.assertEqual(response.status_code, 200)
+
+        for i in range(6, 12):
+            names.append(f'OP01-{i:03d} 카드')
+        response = APIClient().post('/api/search-prices-batch/', {'files': [make_workbook_file(names)]})
+        self.assertEqual(response.status_code, 429)
+
+
+class FakeRedisMixin:
+    """Redis 대신 fakeredis 사용 (Lua 토큰 버킷 스크립트 포함)"""
+
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.object(redis_client, '_client', fakeredis.FakeRedis())
+        self.redis = patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+class LocalTokenBucketTests(TestCase):
+    """프로세스 내 토큰 버킷 (Redis 없을 때)"""
+
+    def test_denies_when_empty_and_refills_over_time(self):
+        now = [100.0]
+        with mock.patch('minimumPriceApp.rate_limit.time.monotonic', side_effect=lambda: now[0]):
+            bucket = LocalTokenBucket(rate=2, burst=2)
+            self.assertEqual(bucket.try_acquire(), 0)
+            self.assertEqual(bucket.try_acquire(), 0)
+            self.assertAlmostEqual(bucket.try_acquire(), 0.5)
+
+            now[0] += 0.5
+            self.assertEqual(bucket.try_acquire(), 0)
+            self.assertGreater(bucket.try_acquire(), 0)
+
+            # 오래 쉬어도 burst까지만 채워짐
+            now[0] += 60
+            self.assertEqual(bucket.try_acquire(), 0)
+            self.assertEqual(bucket.try_acquire(), 0)
+            self.assertGreater(bucket.try_acquire(), 0)
+
+
+@override_settings(NAVER_RATE_LIMIT_PER_SECOND=20, NAVER_RATE_LIMIT_BURST=2)
+class RedisTokenBucketTests(FakeRedisMixin, TestCase):
+    """Redis Lua 토큰 버킷 - 워커 간 공유"""
+
+    def test_denies_when_empty_and_refills_over_time(self):
+        limiter = NaverRateLimiter()
+        self.assertEqual(limiter._try_acquire_token(), 0)
+        self.assertEqual(limiter._try_acquire_token(), 0)
+        wait = limiter._try_acquire_token()
+        self.assertGreater(wait, 0)
+        self.assertLessEqual(wait, 0.05)
+
+        time.sleep(0.06)
+        self.assertEqual(limiter._try_acquire_token(), 0)
+
+    def test_bucket_is_shared_between_limiters(self):
+        self.assertEqual(NaverRateLimiter()._try_acquire_token(), 0)
+        self.assertEqual(NaverRateLimiter()._try_acquire_token(), 0)
+        self.assertGreater(NaverRateLimiter()._try_acquire_token(), 0)
+
+
+@override_settings(NAVER_DAILY_QUOTA=2, NAVER_DAILY_QUOTA_RESERVE=0, NAVER_LOCAL_RATE_LIMIT_PER_SECOND=1000,
+                   NAVER_RATE_LIMIT_PER_SECOND=1000, NAVER_RATE_LIMIT_BURST=100)
+class DailyQuotaTests(TestCase):
+    """일일 할당량 - 한국시간 자정에 초기화"""
+
+    def test_quota_rolls_over_at_day_boundary(self):
+        limiter = NaverRateLimiter()
+        with mock.patch('minimumPriceApp.rate_limit.timezone.localdate', return_value=datetime.date(2026, 3, 1)):
+            limiter.acquire()
+            limiter.acquire()
+            self.assertEqual(limiter.remaining_today(), 0)
+            with self.assertRaises(QuotaExceeded):
+                limiter.acquire()
+
+        with mock.patch('minimumPriceApp.rate_limit.timezone.localdate', return_value=datetime.date(2026, 3, 2)):
+            self.assertEqual(limiter.remaining_today(), 2)
+            limiter.acquire()
+            self.assertEqual(limiter.used_today(), 1)
+
+
+
+class RedisDailyQuotaTests(FakeRedisMixin, DailyQuotaTests):
+    """날짜별 Redis 키로 워커 간 공유"""
+
+    def test_quota_rolls_over_at_day_boundary(self):
+        super().test_quota_rolls_over_at_day_boundary()
+        self.assertEqual(int(self.redis.get(f"{NaverRateLimiter.QUOTA_KEY_PREFIX}20260301")), 2)
+        self.assertEqual(int(self.redis.get(f"{NaverRateLimiter.QUOTA_KEY_PREFIX}20260302")), 1)
+
+
+class SingleFlightTests(TestCase):
+    """동일 검색어 동시 호출 합치기"""
+
+    CALLERS = 8
+
+    def run_concurrently(self, flights):
+        calls = []
+        results = [None] * self.CALLERS
+        barrier = threading.Barrier(self.CALLERS)
+
+        def upstream():
+            calls.append(1)
+            time.sleep(0.2)
+            return [{'lprice': '1000'}]
+
+        def caller(position):
+            barrier.wait()
+            results[position] = flights[position % len(flights)].do('op01-001', upstream)
+
+        threads = [threading.Thread(target=caller, args=(position,)) for position in range(self.CALLERS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return calls, results
+
+    @override_settings(NAVER_SINGLE_FLIGHT_SHARED=False)
+    def test_concurrent_callers_share_one_upstream_call(self):
+        calls, results = self.run_concurrently([SingleFlight('test')])
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [[{'lprice': '1000'}]] * self.CALLERS)
+
+    @override_settings(NAVER_SINGLE_FLIGHT_SHARED=False)
+    def test_leader_error_is_raised_to_waiters(self):
+        flight = SingleFlight('test')
+        errors = []
+        barrier = threading.Barrier(3)
+
+        def upstream():
+            time.sleep(0.2)
+            raise RuntimeError("upstream failed")
+
+        def caller():
+            barrier.wait()
+            try:
+                flight.do('op01-001', upstream)
+            except RuntimeError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=caller) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(errors), 3)
+
+
+@override_settings(NAVER_SINGLE_FLIGHT_SHARED=True)
+class SharedSingleFlightTests(FakeRedisMixin, SingleFlightTests):
+    """워커 간 합치기 - 워커마다 별도 SingleFlight, Redis 락/공유 결과로 1회만 호출"""
+
+    def test_callers_in_different_workers_share_one_upstream_call(self):
+        calls, results = self.run_concurrently([SingleFlight('test'), SingleFlight('test')])
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [[{'lprice': '1000'}]] * self.CALLERS)
+
+
+def http_error(code, retry_after=None):
+    headers = Message()
+    if retry_after is not None:
+        headers['Retry-After'] = str(retry_after)
+    return urllib.error.HTTPError('https://openapi.naver.com', code, 'error', headers, None)
+
+
+class ErrorClassificationTests(TestCase):
+    """urllib/socket 예외 → 재시도 가능 여부가 정해진 NaverAPIError"""
+
+    def test_http_errors(self):
+        rate_limited = classify_error(http_error(429, retry_after=7))
+        self.assertIsInstance(rate_limited, NaverRateLimitError)
+        self.assertEqual(rate_limited.retry_after, 7)
+        self.assertTrue(rate_limited.retryable)
+
+        self.assertIsInstance(classify_error(http_error(503)), NaverServerError)
+        self.assertTrue(classify_error(http_error(503)).retryable)
+
+        self.assertIsInstance(classify_error(http_error(401)), NaverClientError)
+        self.assertFalse(classify_error(http_error(401)).retryable)
+
+    def test_network_errors(self):
+        self.assertIsInstance(classify_error(socket.timeout()), NaverTimeoutError)
+        self.assertIsInstance(classify_error(urllib.error.URLError(socket.timeout())), NaverTimeoutError)
+        self.assertIsInstance(classify_error(urllib.error.URLError('Name or service not known')), NaverConnectionError)
+        self.assertIsInstance(classify_error(ConnectionResetError()), NaverConnectionError)
+        self.assertFalse(classify_error(ValueError('bad')).retryable)
+
+
+@mock.patch('minimumPriceApp.resilience.time.sleep')
+class RetryWithBackoffTests(TestCase):
+    """재시도 가능한 오류만 지수 백오프로 재시도"""
+
+    def test_retries_retryable_errors_until_success(self, sleep):
+        fn = mock.Mock(side_effect=[NaverServerError('500'), NaverTimeoutError('timeout'), 'ok'])
+
+        self.assertEqual(retry_with_backoff(fn, max_attempts=3, base_delay=1, max_delay=10), 'ok')
+        self.assertEqual(fn.call_count, 3)
+        # full jitter - n번째 재시도 대기는 [0, base_delay * 2^(n-1)]
+        first, second = [call.args[0] for call in sleep.call_args_list]
+        self.assertLessEqual(first, 1)
+        self.assertLessEqual(second, 2)
+
+    def test_gives_up_after_max_attempts(self, sleep):
+        fn = mock.Mock(side_effect=NaverConnectionError('down'))
+
+        with self.assertRaises(NaverConnectionError):
+            retry_with_backoff(fn, max_attempts=3, base_delay=1, max_delay=10)
+        self.assertEqual(fn.call_count, 3)
+        self.assertEqual(sleep.call_count, 2)
+
+    def test_client_errors_are_not_retried(self, sleep):
+        fn = mock.Mock(side_effect=NaverClientError('401'))
+
+        with self.assertRaises(NaverClientError):
+            retry_with_backoff(fn, max_attempts=3, base_delay=1, max_delay=10)
+        self.assertEqual(fn.call_count, 1)
+        sleep.assert_not_called()
+
+    def test_waits_at_least_retry_after_capped_by_max_delay(self, sleep):
+        retry_with_backoff(mock.Mock(side_effect=[NaverRateLimitError('429', retry_after=5), 'ok']),
+                           max_attempts=2, base_delay=0.1, max_delay=10)
+        retry_with_backoff(mock.Mock(side_effect=[NaverRateLimitError('429', retry_after=60), 'ok']),
+                           max_attempts=2, base_delay=0.1, max_delay=10)
+
+        self.assertEqual([call.args[0] for call in sleep.call_args_list], [5, 10])
+
+
+class CircuitBreakerTests(TestCase):
+    """closed → open → half-open → closed"""
+
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch('minimumPriceApp.resilience.time.monotonic', side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.breaker = CircuitBreaker(window=60, min_calls=4, error_rate=0.5, cooldown=30)
+
+    def fail(self):
+        with self.assertRaises(NaverAPIError):
+            self.breaker.call(mock.Mock(side_effect=NaverServerError('500')))
+
+    def open_breaker(self):
+        self.breaker.call(lambda: 'ok')
+        self.breaker.call(lambda: 'ok')
+        self.fail()
+        self.assertEqual(self.breaker.retry_after(), 0)
+        self.fail()
+        self.assertEqual(self.breaker.retry_after(), 30)
+
+    def test_stays_closed_below_min_calls(self):
+        self.fail()
+        self.fail()
+        self.assertEqual(self.breaker.call(lambda: 'ok'), 'ok')
+        self.assertEqual(self.breaker.retry_after(), 0)
+
+    def test_open_blocks_calls_until_cooldown(self):
+        self.open_breaker()
+        upstream = mock.Mock()
+
+        self.now += 10
+        with self.assertRaises(CircuitOpenError) as raised:
+            self.breaker.call(upstream)
+        self.assertEqual(raised.exception.retry_after, 20)
+        upstream.assert_not_called()
+
+    def test_half_open_trial_success_closes(self):
+        self.open_breaker()
+        self.now += 30
+
+        self.assertEqual(self.breaker.call(lambda: 'ok'), 'ok')
+        self.assertEqual(self.breaker.retry_after(), 0)
+        # 닫히면 이전 실패 기록은 지워짐
+        self.fail()
+        self.assertEqual(self.breaker.retry_after(), 0)
+
+    def test_half_open_allows_single_trial_and_failure_reopens(self):
+        self.open_breaker()
+        self.now += 30
+        trial_started = threading.Event()
+        release_trial = threading.Event()
+        errors = []
+
+        def slow_failure():
+            trial_started.set()
+            release_trial.wait()
+            raise NaverServerError('500')
+
+        def trial():
+            try:
+                self.breaker.call(slow_failure)
+            except NaverAPIError as e:
+                errors.append(e)
+
+        thread = threading.Thread(target=trial)
+        thread.start()
+        trial_started.wait()
+        # 시험 호출 중에는 다른 호출 차단
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.call(lambda: 'ok')
+        release_trial.set()
+        thread.join()
+
+        self.assertIsInstance(errors[0], NaverServerError)
+        self.assertEqual(self.breaker.retry_after(), 30)
+
+
+@mock.patch.object(NaverShoppingAPI, 'search', staticmethod(fake_search))
+class TimeBudgetTests(TestCase):
+    """timeBudget 검증과 시간 초과로 건너뛴 행 번호"""
+
+    def setUp(self):
+        naver_rate_limiter._local_quota = {}
+
+    def test_invalid_time_budget_is_bad_request(self):
+        for time_budget in ('abc', '-1', 0, 'nan', 'inf', [], True):
+            with self.subTest(time_budget=time_budget):
+                response = APIClient().post('/api/search-prices/',
+                                            {'items': make_items(2), 'timeBudget': time_budget}, format='json')
+                self.assertEqual(response.status_code, 400)
+        self.assertFalse(RepricingJob.objects.exists())
+
+    def test_skipped_are_row_indices(self):
+        items = make_items(4)
+        items.insert(1, {'productName': '', 'currentPrice': 100})
+
+        # 조회 전에 예산이 끝남 → 상품명이 있는 행은 모두 skipped
+        response = APIClient().post('/api/search-prices/', {'items': items, 'timeBudget': '0.000001'}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['skipped'], [0, 2, 3, 4])
+        self.assertEqual(response.json()['skippedCount'], 4)
+
+
+class UploadPriceCoercionTests(TestCase):
+    """숫자가 아닌 가격이 있어도 업로드 전체가 실패하지 않고 해당 행 번호만 보고"""
+
+    NAMES = ['OP01-001 카드', 'OP01-002 카드', 'OP01-003 카드']
+    PRICES = [1000, '문의', 3000]
+
+    def upload(self, uploaded_file):
+        response = APIClient().post('/api/upload-excel/', {'file': uploaded_file})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def assert_bad_price_reported(self, body, first_row):
+        self.assertEqual(body['totalRows'], 3)
+        self.assertEqual([row['price'] for row in body['data']], [1000, None, 3000])
+        self.assertEqual(body['invalidPriceRows'], [first_row + 1])
+        self.assertEqual(body['invalidPriceCount'], 1)
+
+    def test_excel(self):
+        body = self.upload(make_workbook_file(self.NAMES, prices=self.PRICES))
+        self.assert_bad_price_reported(body, DATA_START_ROW)
+
+    def test_csv(self):
+        csv_bytes = make_csv_bytes(zip(self.NAMES, ['"1,000"', '문의', '3000']))
+        body = self.upload(SimpleUploadedFile('catalog.csv', csv_bytes))
+        self.assert_bad_price_reported(body, DATA_START_ROW)
+
+    @override_settings(PARQUET_PRODUCT_NAME_FIELD='name', PARQUET_PRICE_FIELD='price', UPLOAD_BATCH_ROWS=2)
+    def test_parquet(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        output = BytesIO()
+        pq.write_table(pa.table({'name': self.NAMES, 'price': ['1000', '문의', '3000']}), output)
+        body = self.upload(SimpleUploadedFile('catalog.parquet', output.getvalue()))
+        self.assert_bad_price_reported(body, 1)
+
+
+class ViewsImportTimeTests(TestCase):
+    """워커 부팅 - views import가 예산 안에 끝나고 numpy/pandas/openpyxl은 처음 쓸 때 로드"""
+
+    SCRIPT = """
+import json, sys, time
+import django
+django.setup()
+started = time.perf_counter()
+import minimumPriceApp.views
+elapsed = time.perf_counter() - started
+print(json.dumps({"seconds": elapsed, "heavy": [m for m in ("numpy", "pandas", "openpyxl") if m in sys.modules]}))
+"""
+
+    def measure(self):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings.SETTINGS_MODULE)
+        completed = subprocess.run([sys.executable, '-c', self.SCRIPT], capture_output=True, text=True,
+                                   env=env, cwd=settings.BASE_DIR)
+        self.assertEqual(completed.returncode, 0, completed.stderr)
+        return json.loads(completed.stdout.strip().splitlines()[-1])
+
+    def test_import_is_under_budget_without_heavy_modules(self):
+        samples = [self.measure() for _ in range(3)]
+
+        self.assertLessEqual(min(sample['seconds'] for sample in samples), settings.URLCONF_IMPORT_BUDGET)
+        for sample in samples:
+            self.assertEqual(sample['heavy'], [])
+
+
+@mock.patch.object(SearchResultCache, 'schedule_refresh')
+class UnusableResultTTLTests(TestCase):
+    """쓸 수 있는 가격이 없는 검색 결과는 결과 없음과 같은 짧은 TTL"""
+
+    def setUp(self):
+        caches['naver_search'].clear()
+        naver_rate_limiter._local_quota = {}
+
+    def fresh_ttl(self, search_name):
+        entry = caches['naver_search'].get(SearchResultCache.make_key(search_name))
+        return entry['fresh_until'] - time.time()
+
+    @override_settings(NAVER_SEARCH_CACHE_TTL=43200, NAVER_SEARCH_NEGATIVE_TTL=600, NAVER_SEARCH_CACHE_TTL_JITTER=0)
+    def test_results_without_usable_price_get_negative_ttl(self, schedule_refresh):
+        def request(search_name):
+            if search_name.startswith('포켓몬'):
+                # TCG999 판매처 없음 → 필터없음
+                return [{'title': f'{search_name} 001/100', 'lprice': '5000', 'mallName': 'other'}]
+            return fake_search(search_name)
+
+        items = [{'productName': '포켓몬카드 피카츄 SAR 001/100', 'currentPrice': 100},
+                 {'productName': 'OP01-001 카드', 'currentPrice': 100}]
+        with mock.patch.object(NaverShoppingAPI, '_request', side_effect=request):
+            results = PriceProcessor.process_items(items)
+
+        self.assertEqual(results[0]['filterInfo'], '필터없음')
+        self.assertLessEqual(self.fresh_ttl(results[0]['searchKeyword']), 600)
+        self.assertGreater(self.fresh_ttl(results[1]['searchKeyword']), 600)
+
+    @override_settings(NAVER_SEARCH_CACHE_TTL=43200, NAVER_SEARCH_NEGATIVE_TTL=600, NAVER_SEARCH_CACHE_TTL_JITTER=0)
+    def test_mark_unusable_only_shortens(self, schedule_refresh):
+        SearchResultCache.set('OP01-001', [])
+        SearchResultCache.mark_unusable('OP01-001')
+        SearchResultCache.mark_unusable('OP01-404')
+
+        self.assertLessEqual(self.fresh_ttl('OP01-001'), 600)
+        self.assertIsNone(SearchResultCache.get('OP01-404'))
+
+
+class CanonicalQueryTests(TestCase):
+    """정규 검색어 - 표기 차이만 합치고 다른 카드는 다른 검색어/캐시 키"""
+
+    def search_name(self, product_name):
+        return CardGamePatternExtractor.extract_search_info(product_name)[0]
+
+    def test_formatting_variants_share_a_key(self):
+        variants = ['포켓몬카드 리자몽 ex SAR 201/165 SV2a',
+                    '포켓몬카드  리자몽 EX sar 201 / 165 sv2a',
+                    '포켓몬카드 리자몽 ex SAR 201/165 SV2a 1장']
+
+        self.assertEqual({self.search_name(name) for name in variants}, {'포켓몬카드 리자몽 ex SAR 201/165 SV2A'})
+        self.assertEqual(len({SearchResultCache.make_key(self.search_name(name)) for name in variants}), 1)
+
+    def test_distinct_printings_map_to_distinct_keys(self):
+        printings = ['포켓몬카드 피카츄 SAR 001/100',
+                     '포켓몬카드 피카츄 SAR 002/100',
+                     '포켓몬카드 피카츄 SAR 001/100 SV4a']
+        search_names = [self.search_name(name) for name in printings]
+
+        self.assertEqual(len(set(search_names)), 3)
+        self.assertEqual(len({SearchResultCache.make_key(search_name) for search_name in search_names}), 3)
+        for search_name, number in zip(search_names, ['001/100', '002/100', '001/100']):
+            self.assertIn(number, search_name)
+
+    def test_query_stats_counts_collapsed_queries(self):
+        stats = CardGamePatternExtractor.query_stats(['포켓몬카드 피카츄 SAR 001/100', '포켓몬카드 피카츄 sar 001 / 100',
+                                                      '포켓몬카드 피카츄 SAR 002/100', 'OP01-001 루피', None])
+        self.assertEqual(stats, {'rawQueries': 4, 'distinctQueries': 3})
+
+
+class ReplayNaverBatchTests(TestCase):
+    """녹화된 네이버 응답(testdata/naver_batch_sample.json.gz)으로 replay_naver_batch 실행"""
+
+    RECORDING = os.path.join(os.path.dirname(__file__), 'testdata', 'naver_batch_sample.json.gz')
+
+    def replay(self, *args):
+        stdout = StringIO()
+        with tempfile.TemporaryDirectory() as directory:
+            saved = os.path.join(directory, 'results.json')
+            call_command('replay_naver_batch', self.RECORDING, '--save', saved, *args, stdout=stdout)
+            with open(saved, encoding='utf-8') as source:
+                return json.load(source), stdout.getvalue()
+
+    def test_prices_from_recording(self):
+        results, output = self.replay()
+
+        self.assertIn('7개 행', output)
+        self.assertEqual(
+            [(result['newPrice'], result['filterInfo'], result['status']) for result in results],
+            [
+                (1600, '일반검색', 'priced'),  # 일본판/쿠팡/다른 카드번호 제외, 100원 단위 올림
+                (27000, '일반검색', 'priced'),  # 희소 키워드 있는 상품만
+                (4200, '포켓몬명+레어도', 'priced'),  # TCG999 최저가 - 100원
+                (9000, '포켓몬명+레어도', 'priced'),  # 같은 포켓몬의 다른 카드번호/레어도는 제외
+                (80000, '필터없음', 'priced'),  # TCG999 없음 → 기존 가격 유지
+                (3000, '패턴없음', 'no_pattern'),
+                (1500, '녹화없음', 'missing'),
+            ]
+        )
+
+    def test_against_saved_results_has_no_differences(self):
+        baseline, _ = self.replay()
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False, encoding='utf-8') as output:
+            json.dump(baseline, output)
+        self.addCleanup(os.remove, output.name)
+
+        _, stdout = self.replay('--against', output.name)
+        self.assertIn('차이 0개 행', stdout)
+
+
+class AdaptiveConcurrencyLimiterTests(TestCase):
+    """AIMD - 빠른 성공마다 조금씩 늘리고 429/시간 초과면 곱으로 줄임"""
+
+    def make_limiter(self, initial=4):
+        return AdaptiveConcurrencyLimiter(initial=initial, min_limit=2, max_limit=8, latency_target=1.0, backoff=0.5)
+
+    def overload(self, limiter, error=NaverRateLimitError('429')):
+        with self.assertRaises(type(error)):
+            with limiter.slot():
+                raise error
+
+    def test_additive_increase_on_fast_success(self):
+        limiter = self.make_limiter()
+        for _ in range(4):
+            limiter.acquire()
+            limiter.release(time.monotonic(), 0.1)
+
+        # limit회 성공하면 약 +1
+        self.assertAlmostEqual(limiter.limit, 5, delta=0.1)
+        self.assertEqual(limiter.snapshot()['limit'], 4)
+
+    def test_slow_success_and_other_errors_keep_limit(self):
+        limiter = self.make_limiter()
+        limiter.acquire()
+        limiter.release(time.monotonic(), 2.0)
+        with self.assertRaises(NaverServerError):
+            with limiter.slot():
+                raise NaverServerError('500')
+
+        self.assertEqual(limiter.limit, 4)
+
+    def test_multiplicative_decrease_on_rate_limit_and_timeout(self):
+        limiter = self.make_limiter(initial=8)
+        self.overload(limiter)
+        self.assertEqual(limiter.limit, 4)
+
+        self.overload(limiter, NaverTimeoutError('timeout'))
+        self.assertEqual(limiter.limit, 2)
+        self.assertEqual(limiter.snapshot()['decreases'], 2)
+
+    def test_failures_started_before_decrease_count_once(self):
+        limiter = self.make_limiter(initial=8)
+        started = time.monotonic()
+        for _ in range(3):
+            limiter.acquire()
+        for _ in range(3):
+            limiter.release(started, overloaded=True)
+
+        self.assertEqual(limiter.limit, 4)
+        self.assertEqual(limiter.snapshot()['overloads'], 3)
+
+    def test_floor_and_ceiling(self):
+        limiter = self.make_limiter(initial=3)
+        for _ in range(5):
+            self.overload(limiter)
+        self.assertEqual(limiter.limit, 2)
+
+        for _ in range(200):
+            limiter.acquire()
+            limiter.release(time.monotonic(), 0.1)
+        self.assertEqual(limiter.limit, 8)
+
+        self.assertEqual(self.make_limiter(initial=100).limit, 8)
+        self.assertEqual(self.make_limiter(initial=1).limit, 2)
+
+    def test_acquire_waits_for_free_slot(self):
+        limiter = self.make_limiter(initial=2)
+        limiter.acquire()
+        limiter.acquire()
+        acquired = threading.Event()
+
+        def waiter():
+            limiter.acquire()
+            acquired.set()
+
+        thread = threading.Thread(target=waiter)
+        thread.start()
+        self.assertFalse(acquired.wait(0.1))
+        limiter.release(time.monotonic(), 0.1)
+        self.assertTrue(acquired.wait(1))
+        thread.join()
+
+
+@mock.patch.object(NaverShoppingAPI, 'search', staticmethod(fake_search))
+class GameLaneCheckpointTests(TestCase):
+    """카드게임별 동시 처리 - 레인 스레드는 DB에 접근하지 않고 체크포인트는 요청 스레드에서 일괄 저장"""
+
+    def setUp(self):
+        caches['naver_search'].clear()
+        naver_rate_limiter._local_quota = {}
+
+    @override_settings(PRICE_FLUSH_ROWS=2, REPRICING_LANE_POLL_INTERVAL=0.01)
+    def test_multi_game_upload_checkpoints_from_request_thread(self):
+        items = (make_items(3) + [{'productName': f'포켓몬카드 피카츄 SAR 00{i}/100', 'currentPrice': 100}
+                                  for i in range(1, 4)]
+                 + [{'productName': '디지몬카드 BT1-084 희소 오메가몬', 'currentPrice': 100}, {'productName': ''}])
+        original_process_items = PriceProcessor.process_items
+        original_checkpoint_many = RepricingJob.checkpoint_many
+        lane_threads = set()
+        checkpoint_threads = set()
+
+        def lane_without_db(*args, **kwargs):
+            def blocker(execute, sql, params, many, context):
+                raise AssertionError(f"레인 스레드에서 DB 쿼리: {sql}")
+
+            lane_threads.add(threading.current_thread())
+            with connection.execute_wrapper(blocker):
+                return original_process_items(*args, **kwargs)
+
+        def recording_checkpoint_many(job, results):
+            checkpoint_threads.add(threading.current_thread())
+            return original_checkpoint_many(job, results)
+
+        with mock.patch.object(PriceProcessor, 'process_items', side_effect=lane_without_db), \
+                mock.patch.object(RepricingJob, 'checkpoint_many', autospec=True,
+                                  side_effect=recording_checkpoint_many):
+            response = APIClient().post('/api/search-prices/', {'items': items}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual([result['productName'] for result in results],
+                         [item['productName'] for item in items if item['productName']])
+        self.assertEqual({result['fetchStatus'] for result in results}, {'matched', 'no_match'})
+
+        self.assertEqual(len(lane_threads), 3)
+        self.assertNotIn(threading.current_thread(), lane_threads)
+        self.assertEqual(checkpoint_threads, {threading.current_thread()})
+
+        job = RepricingJob.objects.get(job_key=response.json()['jobKey'])
+        self.assertEqual(job.status, RepricingJob.STATUS_COMPLETED)
+        self.assertEqual(sorted(job.rows.values_list('item_index', flat=True)), list(range(7)))
+        self.assertEqual(RepricingRowResult.objects.count(), 7)
+
+    def test_checkpoint_many_overwrites_existing_rows(self):
+        job = RepricingJob.start(make_items(2))
+        job.checkpoint_many({0: {'fetchStatus': 'fetch_failed'}, 1: {'fetchStatus': 'matched', 'searchKeyword': 'OP01-002'}})
+        job.checkpoint_many({0: {'fetchStatus': 'matched', 'searchKeyword': 'OP01-001'}})
+
+        self.assertEqual(job.completed_rows(), {0: {'fetchStatus': 'matched', 'searchKeyword': 'OP01-001'},
+                                                1: {'fetchStatus': 'matched', 'searchKeyword': 'OP01-002'}})
+        self.assertEqual(job.rows.count(), 2)
+
+
+class RecordNaverBatchTests(TestCase):
+    """record_naver_batch - 입력 파일의 고유 검색어를 한 번씩 조회해 녹화"""
+
+    def setUp(self):
+        caches['naver_search'].clear()
+        naver_rate_limiter._local_quota = {}
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def record(self, rows):
+        source = os.path.join(self.directory, 'batch.csv')
+        with open(source, 'wb') as output:
+            output.write(make_csv_bytes(rows))
+        recording_path = os.path.join(self.directory, 'batch.json.gz')
+        stdout = StringIO()
+        with mock.patch.object(NaverShoppingAPI, '_request', side_effect=fake_search) as request:
+            call_command('record_naver_batch', source, recording_path, stdout=stdout)
+        return recording_path, request, stdout.getvalue()
+
+    def test_records_unique_queries_of_named_rows(self):
+        recording_path, request, output = self.record(
+            [('OP01-001 카드', '1000'), ('OP01-001 카드', '1000'), ('OP01-002 카드', '문의'), ('', '500')])
+
+        recording = NaverRecording.load(recording_path)
+        self.assertEqual([row['productName'] for row in recording.rows],
+                         ['OP01-001 카드', 'OP01-001 카드', 'OP01-002 카드'])
+        self.assertEqual(sorted(recording.responses), ['OP01-001', 'OP01-002'])
+        self.assertEqual(request.call_count, 2)
+        self.assertIn('3개 행, 검색어 2개 녹화', output)
+
+    def test_replay_of_recording_matches_live_prices(self):
+        rows = [('OP01-003 카드', '1000'), ('OP01-012 카드', '20000'), ('포켓몬카드 피카츄 SAR 001/100', '5000'),
+                ('보관용 슬리브', '3000')]
+        recording_path, _, _ = self.record(rows)
+
+        items = [{'productName': product_name, 'currentPrice': float(price)} for product_name, price in rows]
+        with mock.patch.object(NaverShoppingAPI, '_request', side_effect=fake_search):
+            live = PriceProcessor.process_items(items)
+
+        with tempfile.NamedTemporaryFile(suffix='.json', dir=self.directory, delete=False) as saved:
+            pass
+        with mock.patch.object(NaverShoppingAPI, '_request', side_effect=AssertionError("replay는 네이버를 호출하지 않음")):
+            call_command('replay_naver_batch', recording_path, '--save', saved.name, stdout=StringIO())
+        with open(saved.name, encoding='utf-8') as source:
+            replayed = json.load(source)
+
+        self.assertEqual([result['newPrice'] for result in replayed], [result['newPrice'] for result in live])
+        self.assertEqual([result['filterInfo'] for result in replayed], [result['filterInfo'] for result in live])
+        self.assertEqual([result['newPrice'] for result in replayed][:2], [3000, 12000])
+
+
+def legacy_pokemon_filter(title, required_rarity, required_pokemon_name):
+    """PokemonNameMatcher 도입 전 check_item_filters의 포켓몬명/레어도 판정 (회귀 비교 기준)"""
+    if required_pokemon_name:
+        clean_title = re.sub(r'<[^>]+>', '', title)
+        required_name_no_space = re.sub(r'\s+', '', required_pokemon_name)
+        title_no_space = re.sub(r'\s+', '', clean_title)
+
+        if required_name_no_space.lower() not in title_no_space.lower():
+            required_words = [word for word in required_pokemon_name.split()
+                              if word.lower() not in ['ex', 'v', 'vmax', 'vstar']]
+            word_matches = sum(1 for word in required_words if word.lower() in clean_title.lower())
+
+            if word_matches != len(required_words) or len(required_words) == 0:
+                return False
+
+    if required_rarity:
+        clean_title = re.sub(r'<[^>]+>', '', title)
+        if required_rarity not in clean_title:
+            return False
+    return True
+
+
+class PokemonNameMatcherCorpusTests(TestCase):
+    """포켓몬명 매처 - 제목 × 포켓몬명 × 레어도 코퍼스에서 이전 인라인 판정과 같은 결과"""
+
+    NAMES = ['피카츄', '리자몽 ex', '뮤츠 V', '리자몽 VMAX', '아르세우스 VSTAR', '레쿠쟈 V VMAX', '릴리에의 삐삐 ex',
+             '라이츄 & 피카츄', '피카츄 (a+b)', 'ex', 'V', '마스카나 ex', 'Mew ex', '  뮤  ', '포켓몬 피카츄']
+    RARITIES = [None, 'SAR', 'AR', 'SR', 'UR', 'RR', 'C', '마스터볼', '이로치']
+    TITLE_PARTS = ['포켓몬카드', '<b>피카츄</b>', '피카 츄', '리자몽ex', '리자몽 EX', '<b>리자몽</b> <b>ex</b>', '뮤츠V',
+                   '뮤츠 v', '리자몽 vmax', '아르세우스VSTAR', '레쿠쟈', '릴리에의삐삐ex', '라이츄&피카츄',
+                   '피카츄 (a+b)', '마스카나', 'MEW EX', 'mew', 'SAR', 'AR', '<b>SAR</b>', 'S<b>AR</b>', 'UR',
+                   '마스터볼', '이로치', '201/165', '001/100', 'SV2a', '한글판', '']
+
+    def assert_same_decisions(self, titles):
+        mismatches = []
+        for title, pokemon_name, rarity in itertools.product(titles, self.NAMES, self.RARITIES):
+            passed, _ = ItemFilter.check_item_filters(
+                title, 'TCG999', '포켓몬', None, False, False, False, False, False, 1000, rarity, pokemon_name)
+            if passed != legacy_pokemon_filter(title, rarity, pokemon_name):
+                mismatches.append((title, pokemon_name, rarity, passed))
+        self.assertEqual(mismatches, [])
+
+    def test_hand_written_titles(self):
+        self.assert_same_decisions([
+            '포켓몬카드 피카츄 SAR 001/100', '포켓몬카드 <b>피카츄</b> AR', '포켓몬카드 리자몽ex SAR 201/165',
+            '포켓몬카드 리자몽 EX sar', '포켓몬카드 뮤츠V RR', '포켓몬카드 레쿠쟈 VMAX HR', '포켓몬카드 아르세우스 V',
+            '릴리에의 삐삐 ex SAR', '포켓몬카드 라이츄&피카츄 SR', 'MEW ex 마스터볼', '포켓몬카드 <b>SAR</b>', '',
+        ])
+
+    def test_generated_titles(self):
+        generator = random.Random(37)
+        titles = [' '.join(generator.sample(self.TITLE_PARTS, generator.randint(1, 5))) for _ in range(300)]
+        # 공백 없이 붙인 제목도 포함
+        titles += [title.replace(' ', '') for title in titles[:100]]
+        self.assert_same_decisions(titles)
+
+    def test_matcher_is_cached_per_name(self):
+        self.assertIs(PokemonNameMatcher.for_name('리자몽 ex'), PokemonNameMatcher.for_name('리자몽 ex'))
+
+
+def legacy_new_price(original_price, min_price, tcg999_not_found):
+    """이전 process_price_update의 새 가격/변동액 계산 (행 단위)"""
+    if tcg999_not_found:
+        return original_price, 0
+    if min_price is not None:
+        new_price = min_price + PLUS_PRICE
+        if new_price < 200:
+            new_price = 200
+        remainder = int(new_price) % 100
+        if remainder > 0:
+            new_price = int(new_price) + (100 - remainder)
+    else:
+        new_price = original_price
+    return new_price, int(new_price - original_price)
+
+
+def legacy_color_key(original_price, new_price, tcg999_not_found):
+    """이전 get_fill_color 구간 (TCG999 없음은 보라색)"""
+    if tcg999_not_found:
+        return 'purple'
+    if abs(original_price - new_price) < 0.01:
+        return 'none'
+    price_diff = abs(new_price - original_price)
+    if price_diff <= 1000:
+        return 'green'
+    elif price_diff <= 2000:
+        return 'blue'
+    elif price_diff <= 3000:
+        return 'yellow'
+    return 'red'
+
+
+class BatchPriceComputationTests(TestCase):
+    """NumPy 일괄 가격/색상 계산 - 이전 행 단위 계산과 같은 결과"""
+
+    def assert_matches_legacy(self, rows):
+        original_prices = [original for original, _, _ in rows]
+        min_prices = [minimum for _, minimum, _ in rows]
+        not_found = [flag for _, _, flag in rows]
+        new_prices, price_diffs, color_keys = PriceProcessor.compute_batch_prices(original_prices, min_prices, not_found)
+
+        for index, (original, minimum, flag) in enumerate(rows):
+            expected_price, expected_diff = legacy_new_price(original, minimum, flag)
+            with self.subTest(original=original, minimum=minimum, tcg999_not_found=flag):
+                self.assertEqual(float(new_prices[index]), float(expected_price))
+                self.assertEqual(int(price_diffs[index]), expected_diff)
+                self.assertEqual(str(color_keys[index]), legacy_color_key(original, expected_price, flag))
+
+    def test_floor_rounding_and_fractional_minimums(self):
+        self.assert_matches_legacy([
+            (1000, 0, False), (1000, 150, False), (1000, 199.5, False), (1000, 200, False),  # 최소 200원
+            (1000, 1201, False), (1000, 1250, False), (1000, 1299, False), (1000, 1300, False),  # 100원 단위 올림
+            (1000, 1234.5, False), (1000, 1200.5, False), (1000, 99.99, False), (5000, 4999.9, False),  # 소수 최저가
+            (1000, None, False), (1234.5, None, False),  # 최저가 없음 → 기존 가격
+            (1000, 500, True), (1000, None, True), (0, 800, True),  # TCG999 없음 → 기존 가격 + 보라색
+        ])
+
+    def test_color_bucket_boundaries(self):
+        base = 10000
+        rows = []
+        for difference in (0, 0.005, 100, 1000, 1100, 2000, 2100, 3000, 3100, 50000):
+            rows.append((base, base + difference, False))
+            rows.append((base + difference, base, False))
+        self.assert_matches_legacy(rows)
+
+        keys = PriceProcessor.compute_color_keys([1000] * 6, [1000.005, 2000, 3000, 4000, 4100, 1000], [False] * 5 + [True])
+        self.assertEqual(list(keys), ['none', 'green', 'blue', 'yellow', 'red', 'purple'])
+
+    def test_random_rows(self):
+        generator = random.Random(38)
+        rows = [
+            (generator.choice([0, 100, 990, 1000, 15000, generator.uniform(0, 100000)]),
+             generator.choice([None, generator.uniform(0, 300), generator.uniform(0, 100000),
+                               float(generator.randrange(0, 100000, 100))]),
+             generator.random() < 0.1)
+            for _ in range(2000)
+        ]
+        self.assert_matches_legacy(rows)
+
+
+class DryRunPreviewTests(TestCase):
+    """search_prices dryRun - 캐시된 검색 결과만 사용, 네이버 호출/작업/할당량 없음"""
+
+    def setUp(self):
+        caches['naver_search'].clear()
+        naver_rate_limiter._local_quota = {}
+        self.items = make_items(4)
+        for i in range(1, 4):
+            SearchResultCache.set(f'OP01-{i:03d}', fake_search(f'OP01-{i:03d}'))
+
+    def post(self, dry_run, fmt='json'):
+        """네이버 API 실제 요청(_request)을 가짜 응답으로 바꾸고 호출 mock 반환"""
+        with mock.patch.object(NaverShoppingAPI, '_request', side_effect=fake_search) as request:
+            response = APIClient().post('/api/search-prices/', {'items': self.items, 'dryRun': dry_run}, format=fmt)
+        return response, request
+
+    def test_uses_cached_results_only(self):
+        remaining = naver_rate_limiter.remaining_today()
+        response, search = self.post(True)
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertTrue(data['dryRun'])
+        self.assertEqual([result['fetchStatus'] for result in data['results']],
+                         ['matched', 'matched', 'matched', 'not_cached'])
+        self.assertEqual([result['newPrice'] for result in data['results'][:3]], [1000, 2000, 3000])
+        self.assertEqual(data['results'][3]['newPrice'], 100)
+        self.assertEqual(data['notCached'], ['OP01-004 카드'])
+        self.assertEqual(data['notCachedCount'], 1)
+        self.assertEqual(data['coverage'], 0.75)
+
+        search.assert_not_called()
+        self.assertFalse(RepricingJob.objects.exists())
+        self.assertEqual(naver_rate_limiter.remaining_today(), remaining)
+
+    def test_string_flag_parsed_strictly(self):
+        response, search = self.post('true')
+        self.assertTrue(response.json()['dryRun'])
+        search.assert_not_called()
+
+        for value in ('false', '0', False):
+            with self.subTest(dry_run=value):
+                RepricingJob.objects.all().delete()
+                self.setUp()
+                response, search = self.post(value)
+                self.assertEqual(response.status_code, 200)
+                self.assertNotIn('dryRun', response.json())
+                search.assert_called_once_with('OP01-004')
+
+
+@override_settings(NAVER_CONCURRENCY_MAX=1, PRICE_FLUSH_ROWS=1)
+class CancelSearchPricesTests(TestCase):
+    """cancel_search_prices - 진행 중 작업 취소, 없는 작업 404, 끝난 작업 409"""
+
+    def setUp(self):
+        caches['naver_search'].clear()
+        naver_rate_limiter._local_quota = {}
+        self.items = make_items(5)
+
+    def cancel(self, **data):
+        return APIClient().post('/api/search-prices/cancel/', data, format='json')
+
+    def search(self, side_effect=fake_search):
+        with mock.patch.object(NaverShoppingAPI, '_request', side_effect=side_effect) as request:
+            response = APIClient().post('/api/search-prices/', {'items': self.items}, format='json')
+        return response, request
+
+    def test_cancel_running_job_stops_prefetching(self):
+        cancel_responses = []
+
+        def cancel_during_second_lookup(search_name):
+            # 1개씩 조회(동시 조회 1) 중 두 번째 검색어를 조회할 때 다른 요청으로 취소
+            if search_name == 'OP01-002':
+                cancel_responses.append(self.cancel(items=self.items))
+            return fake_search(search_name)
+
+        response, request = self.search(cancel_during_second_lookup)
+
+        cancel_response = cancel_responses[0]
+        self.assertEqual(cancel_response.status_code, 200)
+        self.assertEqual(cancel_response.json()['status'], RepricingJob.STATUS_CANCELLED)
+        self.assertEqual(cancel_response.json()['completedRows'], 1)
+        self.assertEqual(cancel_response.json()['remainingRows'], 4)
+
+        data = response.json()
+        self.assertTrue(data['cancelled'])
+        self.assertEqual(data['cancelledCount'], 3)
+        self.assertEqual([result['fetchStatus'] for result in data['results']],
+                         ['matched', 'matched', 'cancelled', 'cancelled', 'cancelled'])
+        self.assertEqual([call.args[0] for call in request.call_args_list], ['OP01-001', 'OP01-002'])
+
+    def test_unknown_job_returns_404(self):
+        self.assertEqual(self.cancel(jobKey='unknown').status_code, 404)
+        self.assertEqual(self.cancel(items=self.items).status_code, 404)
+
+    def test_completed_or_cancelled_job_returns_409(self):
+        response, _ = self.search()
+        job_key = response.json()['jobKey']
+        self.assertEqual(RepricingJob.objects.get(job_key=job_key).status, RepricingJob.STATUS_COMPLETED)
+
+        response = self.cancel(jobKey=job_key)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['status'], RepricingJob.STATUS_COMPLETED)
+
+        job = RepricingJob.start(make_items(2, 'OP02'))
+        self.assertEqual(self.cancel(jobKey=job.job_key).status_code, 200)
+        response = self.cancel(jobKey=job.job_key)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['status'], RepricingJob.STATUS_CANCELLED)
+
+
+class ExportCacheTests(TestCase):
+    """download_excel ETag 재검증(304)과 반복 다운로드 캐시"""
+
+    def setUp(self):
+        caches['exports'].clear()
+        self.content = make_export_workbook()
+
+    def download(self, **headers):
+        return Client().post('/api/download-excel/', {
+            'excel_file': SimpleUploadedFile('catalog.xlsx', self.content),
+            'modifications': json.dumps(EXPORT_MODIFICATIONS),
+        }, **headers)
+
+    def test_matching_etag_returns_304(self):
+        response = self.download()
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        response = self.download(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+        response = self.download(HTTP_IF_NONE_MATCH=f'"other", W/{etag}')
+        self.assertEqual(response.status_code, 304)
+
+        response = self.download(HTTP_IF_NONE_MATCH='"other"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_wildcard_does_not_return_empty_304(self):
+        first = self.download()
+        response = self.download(HTTP_IF_NONE_MATCH='*')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, first.content)
+
+    def test_repeat_download_served_from_cache(self):
+        build = ExcelExporter.build_modified_worksheet
+        with mock.patch.object(ExcelExporter, 'build_modified_worksheet', side_effect=build) as built:
+            first = self.download()
+            second = self.download()
+
+        self.assertEqual(built.call_count, 1)
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['ETag'], first['ETag'])
+        self.assertEqual(int(second['Content-Length']), len(first.content))
+
+
+class ChangedOnlyExportTests(TestCase):
+    """download_excel changedOnly/CSV 출력 - 변경 행만, 원본행 열, 가격 열 색상, CSV와 xlsx 행 일치"""
+
+    # 2행 가격 변경(+500, 초록), 3행 변경 없음, 4행 재고만 변경
+    CHANGED_ROWS = [2, 4]
+
+    def setUp(self):
+        caches['exports'].clear()
+
+    def download(self, export_format, changed_only):
+        return Client().post('/api/download-excel/', {
+            'excel_file': SimpleUploadedFile('catalog.xlsx', make_export_workbook()),
+            'modifications': json.dumps(EXPORT_MODIFICATIONS),
+            'format': export_format,
+            'changedOnly': 'true' if changed_only else 'false',
+        })
+
+    def xlsx_rows(self, response):
+        worksheet = openpyxl.load_workbook(BytesIO(response.content)).worksheets[0]
+        return worksheet, [['' if value is None else str(value) for value in row]
+                           for row in worksheet.iter_rows(values_only=True)]
+
+    @staticmethod
+    def normalized(rows):
+        """숫자는 float로 비교 (xlsx는 1500.0을 1500으로 다시 읽음)"""
+        def value(text):
+            try:
+                return float(text)
+            except ValueError:
+                return text
+        return [[value(text) for text in row] for row in rows]
+
+    def csv_rows(self, response):
+        text = b''.join(response.streaming_content).decode('utf-8').removeprefix('\ufeff')
+        return list(csv.reader(StringIO(text)))
+
+    def test_changed_only_writes_changed_rows_with_source_row(self):
+        worksheet, rows = self.xlsx_rows(self.download('xlsx', True))
+
+        self.assertEqual(rows[0][:2], ['원본행', '변동액'])
+        self.assertEqual([int(row[0]) for row in rows[1:]], self.CHANGED_ROWS)
+        self.assertEqual([row[10] for row in rows[1:]], ['OP01-001 카드', 'OP01-003 카드'])
+        self.assertEqual([float(row[12]) for row in rows[1:]], [1500, 3000])
+        self.assertEqual([row[14] for row in rows[1:]], ['5', '0'])
+
+        # 원본행 열이 앞에 붙어 가격은 M열
+        price_fills = [worksheet.cell(row=row, column=13).fill for row in (2, 3)]
+        self.assertEqual(price_fills[0].fgColor.rgb, '0000FF00')
+        self.assertIsNone(price_fills[1].fill_type)
+
+    def test_full_export_fills_price_column(self):
+        worksheet, rows = self.xlsx_rows(self.download('xlsx', False))
+
+        self.assertEqual(rows[0][0], '변동액')
+        self.assertEqual(worksheet.cell(row=2, column=12).fill.fgColor.rgb, '0000FF00')
+        self.assertEqual([float(row[11]) for row in rows[1:4]], [1500, 2000, 3000])
+        self.assertEqual([row[4] for row in rows[1:4]], ['2', '1', '1'])
+
+    def test_csv_matches_xlsx_rows(self):
+        for changed_only in (True, False):
+            with self.subTest(changed_only=changed_only):
+                _, xlsx_rows = self.xlsx_rows(self.download('xlsx', changed_only))
+                csv_rows = self.csv_rows(self.download('csv', changed_only))
+
+                if not changed_only:
+                    # 전체 출력 xlsx는 A~D열 2~7행에 색상 범례가 추가됨
+                    xlsx_rows = [row[4:] for row in xlsx_rows]
+                    csv_rows = [row[4:] for row in csv_rows]
+                expected_rows = self.CHANGED_ROWS if changed_only else EXPORT_ROWS
+                self.assertEqual(len(csv_rows), len(expected_rows) + 1)
+                self.assertEqual(self.normalized(csv_rows), self.normalized(xlsx_rows[:len(csv_rows)]))
+
+
+@override_settings(RESPONSE_COMPRESSION_ENABLED=True, RESPONSE_COMPRESSION_MIN_BYTES=1024)
+class ResponseCompressionTests(TestCase):
+    """ResponseCompressionMiddleware - 크기 기준, br/gzip 선택, 약한 ETag / columnar 응답 형식"""
+
+    def respond(self, response, accept_encoding='gzip, br', path='/api/search-prices/'):
+        request = RequestFactory().post(path, HTTP_ACCEPT_ENCODING=accept_encoding)
+        return ResponseCompressionMiddleware(lambda request: response)(request)
+
+    def json_response(self, size):
+        return JsonResponse({'results': 'x' * size})
+
+    def test_small_responses_not_compressed(self):
+        response = self.respond(self.json_response(100))
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+
+        response = self.respond(self.json_response(2000))
+        self.assertIn(response['Content-Encoding'], ('br', 'gzip'))
+
+    def test_encoding_follows_accept_encoding(self):
+        body = self.json_response(5000).content
+
+        response = self.respond(self.json_response(5000), accept_encoding='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), body)
+        self.assertEqual(response['Content-Length'], str(len(response.content)))
+
+        response = self.respond(self.json_response(5000), accept_encoding='br;q=0, gzip;q=0.5')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+
+        response = self.respond(self.json_response(5000), accept_encoding='identity')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response.content, body)
+
+        if brotli is not None:
+            response = self.respond(self.json_response(5000), accept_encoding='gzip, br')
+            self.assertEqual(response['Content-Encoding'], 'br')
+            self.assertEqual(brotli.decompress(response.content), body)
+
+    def test_compressed_response_etag_weakened(self):
+        response = self.json_response(5000)
+        response['ETag'] = '"abc"'
+        self.assertEqual(self.respond(response, accept_encoding='gzip')['ETag'], 'W/"abc"')
+
+        response = self.json_response(100)
+        response['ETag'] = '"abc"'
+        self.assertEqual(self.respond(response, accept_encoding='gzip')['ETag'], '"abc"')
+
+    def test_binary_and_non_api_responses_untouched(self):
+        response = self.respond(HttpResponse(b'x' * 5000, content_type='application/zip'))
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+        response = self.respond(self.json_response(5000), path='/admin/')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_columnar_format(self):
+        rows = [{'productName': 'a', 'newPrice': 1000}, {'productName': 'b', 'newPrice': 2000, 'error': 'x'}]
+        self.assertEqual(to_columnar(rows), {
+            'fields': ['productName', 'newPrice', 'error'],
+            'columns': {'productName': ['a', 'b'], 'newPrice': [1000, 2000], 'error': [None, 'x']},
+        })
+
+        caches['naver_search'].clear()
+        naver_rate_limiter._local_quota = {}
+        items = make_items(3)
+        with mock.patch.object(NaverShoppingAPI, 'search', staticmethod(fake_search)):
+            rows = APIClient().post('/api/search-prices/', {'items': items}, format='json').json()['results']
+            RepricingJob.objects.all().delete()
+            columnar = APIClient().post('/api/search-prices/?responseFormat=columnar', {'items': items},
+                                        format='json').json()['results']
+        self.assertEqual(columnar, to_columnar(rows))
+        self.assertEqual(columnar['columns']['newPrice'], [1000, 2000, 3000])
+
+
+@override_settings(SERVER_TIMING_ENABLED=True)
+class ServerTimingTests(TestCase):
+    """ServerTimingMiddleware - 업로드/검색/다운로드 응답의 단계별 Server-Timing"""
+
+    def setUp(self):
+        caches['naver_search'].clear()
+        caches['exports'].clear()
+        naver_rate_limiter._local_quota = {}
+
+    def stages(self, response):
+        self.assertEqual(response['Timing-Allow-Origin'], settings.SERVER_TIMING_ALLOW_ORIGIN)
+        return set(re.findall(r'(\w+);dur=[0-9.]+', response['Server-Timing']))
+
+    def naver_response(self, request, timeout=None):
+        search_name = urllib.parse.parse_qs(urllib.parse.urlsplit(request.full_url).query)['query'][0]
+        response = mock.Mock()
+        response.read.return_value = json.dumps({'items': fake_search(search_name)}).encode('utf-8')
+        response.getcode.return_value = 200
+        return response
+
+    def test_upload_reports_parse(self):
+        response = APIClient().post('/api/upload-excel/', {'file': make_workbook_file(['OP01-001 카드'])})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue({'parse', 'total'} <= self.stages(response))
+
+    def test_search_reports_lookup_stages(self):
+        with mock.patch('urllib.request.urlopen', side_effect=self.naver_response) as urlopen:
+            response = APIClient().post('/api/search-prices/', {'items': make_items(3)}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(urlopen.call_count, 3)
+        self.assertTrue({'extract', 'throttle', 'naver', 'filter', 'total'} <= self.stages(response))
+        self.assertRegex(response['Server-Timing'], r'naver;dur=[0-9.]+;desc="3 calls"')
+
+    def test_download_reports_build_and_save(self):
+        response = Client().post('/api/download-excel/', {
+            'excel_file': SimpleUploadedFile('catalog.xlsx', make_export_workbook()),
+            'modifications': json.dumps(EXPORT_MODIFICATIONS),
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue({'parse', 'build', 'save', 'total'} <= self.stages(response))
+
+    @override_settings(SERVER_TIMING_ENABLED=False)
+    def test_disabled(self):
+        response = APIClient().post('/api/upload-excel/', {'file': make_workbook_file(['OP01-001 카드'])})
+        self.assertFalse(response.has_header('Server-Timing'))
+
+
+class RequestProfilingTests(TestCase):
+    """@profile_request - 켜져 있으면 .prof/.txt 저장, 꺼져 있으면 응답 그대로"""
+
+    def setUp(self):
+        caches['exports'].clear()
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.profile_dir = temp_dir.name
+
+    def download(self, **headers):
+        return Client().post('/api/download-excel/', {
+            'excel_file': SimpleUploadedFile('catalog.xlsx', make_export_workbook()),
+            'modifications': json.dumps(EXPORT_MODIFICATIONS),
+        }, **headers)
+
+    def test_enabled_writes_profile_and_allocations(self):
+        with self.settings(REQUEST_PROFILING_ENABLED=True, REQUEST_PROFILE_DIR=self.profile_dir):
+            response = self.download()
+
+        self.assertEqual(response.status_code, 200)
+        name = response['X-Profile-Id']
+        self.assertIn('download_excel', name)
+        self.assertEqual(sorted(os.listdir(self.profile_dir)), [f'{name}.prof', f'{name}.txt'])
+        with open(os.path.join(self.profile_dir, f'{name}.txt'), encoding='utf-8') as report:
+            text = report.read()
+        self.assertIn('peak traced memory', text)
+        self.assertIn('== top allocation sites ==', text)
+        self.assertIn('== cProfile (cumulative) ==', text)
+
+    def test_token_header_enables_single_request(self):
+        with self.settings(REQUEST_PROFILING_ENABLED=False, REQUEST_PROFILING_TOKEN='secret',
+                           REQUEST_PROFILE_DIR=self.profile_dir):
+            self.assertFalse(self.download(HTTP_X_PROFILE_REQUEST='wrong').has_header('X-Profile-Id'))
+            self.assertEqual(os.listdir(self.profile_dir), [])
+
+            response = self.download(HTTP_X_PROFILE_REQUEST='secret')
+        self.assertEqual(len(os.listdir(self.profile_dir)), 2)
+        self.assertTrue(response.has_header('X-Profile-Id'))
+
+    def test_disabled_leaves_response_unchanged(self):
+        with self.settings(REQUEST_PROFILING_ENABLED=True, REQUEST_PROFILE_DIR=self.profile_dir):
+            profiled = self.download()
+        files = sorted(os.listdir(self.profile_dir))
+
+        caches['exports'].clear()
+        with self.settings(REQUEST_PROFILING_ENABLED=False, REQUEST_PROFILING_TOKEN='',
+                           REQUEST_PROFILE_DIR=self.profile_dir):
+            response = self.download(HTTP_X_PROFILE_REQUEST='')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('X-Profile-Id'))
+        self.assertEqual(sorted(os.listdir(self.profile_dir)), files)
+        # xlsx 메타데이터(작성 시각)는 다를 수 있어 셀 값으로 비교
+        self.assertEqual(
+            *[list(openpyxl.load_workbook(BytesIO(result.content)).worksheets[0].iter_rows(values_only=True))
+              for result in (response, profiled)])
+
+
+class SearchPricesBatchTests(TestCase):
+    """search_prices_batch - 파일별 결과 zip, 여러 파일의 같은 검색어는 한 번만 조회, 가격 오류 행 보고"""
+
+    def setUp(self):
+        caches['naver_search'].clear()
+        naver_rate_limiter._local_quota = {}
+
+    def post(self, files):
+        with mock.patch.object(NaverShoppingAPI, '_request', side_effect=fake_search) as request:
+            response = Client().post('/api/search-prices-batch/', {'files': files})
+        return response, request
+
+    def output_prices(self, content):
+        """결과 워크북 첫 시트의 (상품명, 새 가격) - 변동 정보 6열이 앞에 붙음"""
+        worksheet = openpyxl.load_workbook(BytesIO(content)).worksheets[0]
+        return [(worksheet.cell(row=row, column=PRODUCT_NAME_COLUMN + 7).value,
+                 worksheet.cell(row=row, column=PRICE_COLUMN + 7).value)
+                for row in range(DATA_START_ROW, worksheet.max_row + 1)]
+
+    def test_zip_contains_repriced_workbook_per_file(self):
+        response, request = self.post([
+            make_workbook_file(['OP01-001 카드', 'OP01-002 카드'], name='a.xlsx'),
+            make_workbook_file(['OP01-002 카드', 'OP01-003 카드'], name='b.XLSX'),
+            make_workbook_file(['OP01-001 카드'], name='a.xlsx'),
+        ])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        self.assertEqual(response['X-Total-Rows'], '5')
+        self.assertEqual(response['X-Unique-Searches'], '3')
+        self.assertEqual(response['X-Invalid-Price-Count'], '0')
+
+        with zipfile.ZipFile(BytesIO(response.content)) as archive:
+            self.assertEqual(archive.namelist(), ['a_TCG999특가.xlsx', 'b_TCG999특가.xlsx', 'a_TCG999특가_2.xlsx'])
+            self.assertEqual(self.output_prices(archive.read('a_TCG999특가.xlsx')),
+                             [('OP01-001 카드', 1000), ('OP01-002 카드', 2000)])
+            self.assertEqual(self.output_prices(archive.read('b_TCG999특가.xlsx')),
+                             [('OP01-002 카드', 2000), ('OP01-003 카드', 3000)])
+            self.assertEqual(self.output_prices(archive.read('a_TCG999특가_2.xlsx')), [('OP01-001 카드', 1000)])
+
+    def test_shared_keyword_fetched_once(self):
+        _, request = self.post([
+            make_workbook_file(['OP01-001 카드', 'OP01-002 카드', 'OP01-001 카드'], name='a.xlsx'),
+            make_workbook_file(['OP01-001 카드', 'OP01-002 카드'], name='b.xlsx'),
+        ])
+
+        self.assertEqual(sorted(call.args[0] for call in request.call_args_list), ['OP01-001', 'OP01-002'])
+
+    def test_non_numeric_prices_reported(self):
+        response, _ = self.post([
+            make_workbook_file(['OP01-001 카드', 'OP01-002 카드', 'OP01-003 카드'], name='a.xlsx',
+                               prices=[500, '가격문의', None]),
+        ])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Invalid-Price-Count'], '1')
+        with zipfile.ZipFile(BytesIO(response.content)) as archive:
+            report = list(csv.reader(StringIO(archive.read('가격오류행.csv').decode('utf-8-sig'))))
+            self.assertEqual(report, [['파일', '시트', '행', '가격'], ['a.xlsx', 'Sheet', str(DATA_START_ROW + 1), '가격문의']])
+            # 가격 오류 행은 그대로 두고 나머지 행만 새 가격
+            self.assertEqual(self.output_prices(archive.read('a_TCG999특가.xlsx')),
+                             [('OP01-001 카드', 1000), ('OP01-002 카드', '가격문의'), ('OP01-003 카드', 3000)])
+
+    def test_rejects_non_xlsx(self):
+        response, _ = self.post([SimpleUploadedFile('a.csv', b'x')])
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(NAVER_DAILY_QUOTA=10, NAVER_DAILY_QUOTA_RESERVE=0, NAVER_CACHE_WARMUP_QUOTA_SHARE=0.3,
+                   NAVER_CACHE_WARMUP_LOOKBACK_DAYS=7)
+class SearchCacheWarmupTests(TestCase):
+    """hot_keywords 순서와 warm_search_cache 할당량 예산/중단"""
+
+    def setUp(self):
+        caches['naver_search'].clear()
+        naver_rate_limiter._local_quota = {}
+        job = RepricingJob.start(make_items(1))
+        # 조회 횟수: OP01-005 4회, OP01-001 3회, OP01-003/OP01-004 2회 (동률은 이름순), OP01-002 1회
+        counts = [('OP01-005', 4), ('OP01-001', 3), ('OP01-004', 2), ('OP01-003', 2), ('OP01-002', 1)]
+        rows = [(keyword, 'matched') for keyword, count in counts for _ in range(count)]
+        rows += [('OP01-002', 'fetch_failed')] * 5 + [('', 'matched')] * 5
+        RepricingRowResult.objects.bulk_create(
+            RepricingRowResult(job=job, item_index=item_index, result={}, fetch_status=fetch_status,
+                               search_keyword=keyword)
+            for item_index, (keyword, fetch_status) in enumerate(rows))
+        # 조회 기간이 지난 행은 집계하지 않음
+        old = RepricingRowResult.objects.bulk_create(
+            RepricingRowResult(job=job, item_index=100 + item_index, result={}, fetch_status='matched',
+                               search_keyword='OP01-009') for item_index in range(10))
+        RepricingRowResult.objects.filter(pk__in=[row.pk for row in old]) \
+            .update(updated_at=timezone.now() - datetime.timedelta(days=8))
+
+    def test_hot_keywords_ordered_by_request_count(self):
+        self.assertEqual(SearchResultCache.hot_keywords(),
+                         ['OP01-005', 'OP01-001', 'OP01-003', 'OP01-004', 'OP01-002'])
+        self.assertEqual(SearchResultCache.hot_keywords(limit=2), ['OP01-005', 'OP01-001'])
+        self.assertIn('OP01-009', SearchResultCache.hot_keywords(days=30))
+
+    def test_warmup_stays_within_quota_share(self):
+        # 할당량 10회 × 0.3 = 3회
+        with mock.patch.object(NaverShoppingAPI, '_request', side_effect=fake_search) as request:
+            result = tasks.warm_search_cache()
+
+        self.assertEqual(result, {'warmed': 3, 'failed': 0, 'budget': 3})
+        self.assertEqual([call.args[0] for call in request.call_args_list], ['OP01-005', 'OP01-001', 'OP01-003'])
+        self.assertEqual(SearchResultCache.get('OP01-005', revalidate=False), fake_search('OP01-005'))
+
+    def test_warmup_budget_limited_by_remaining_quota(self):
+        with mock.patch.object(naver_rate_limiter, 'remaining_today', return_value=1), \
+                mock.patch.object(NaverShoppingAPI, '_request', side_effect=fake_search) as request:
+            result = tasks.warm_search_cache()
+
+        self.assertEqual(result['budget'], 1)
+        self.assertEqual(request.call_count, 1)
+
+    def test_warmup_stops_on_quota_exceeded(self):
+        responses = [fake_search('OP01-005'), QuotaExceeded(10, 10), fake_search('OP01-003')]
+        with mock.patch.object(NaverShoppingAPI, '_request', side_effect=responses) as request:
+            result = tasks.warm_search_cache()
+
+        self.assertEqual(result, {'warmed': 1, 'failed': 0, 'budget': 3})
+        self.assertEqual(request.call_count, 2)
+
+    def test_warmup_counts_api_errors_and_continues(self):
+        responses = [NaverServerError("HTTP 500"), fake_search('OP01-001'), fake_search('OP01-003')]
+        with mock.patch.object(NaverShoppingAPI, '_request', side_effect=responses) as request:
+            result = tasks.warm_search_cache()
+
+        self.assertEqual(result, {'warmed': 2, 'failed': 1, 'budget': 3})
+        self.assertEqual(request.call_count, 3)
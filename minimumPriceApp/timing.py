@@ -0,0 +1,61 @@
+"""
+Per-request stage timers for the Server-Timing header
+ServerTimingMiddleware activates a StageTimer for each /api/ request and
+code on the request path wraps its work in `with stage('name'):`; outside a
+request (Celery workers, management commands) stage() is a no-op
+"""
+
+import contextlib
+import contextvars
+import threading
+import time
+
+_current_timer = contextvars.ContextVar('stage_timer', default=None)
+
+
+class StageTimer:
+    """단계별 누적 시간(초)과 호출 횟수"""
+    
+    def __init__(self):
+        self.durations = {}
+        self.counts = {}
+        self._lock = threading.Lock()
+    
+    def add(self, name, seconds):
+        # NaverShoppingAPI.prefetch 스레드들이 같은 타이머에 동시에 누적
+        with self._lock:
+            self.durations[name] = self.durations.get(name, 0.0) + seconds
+            self.counts[name] = self.counts.get(name, 0) + 1
+    
+    def header_value(self):
+        """Server-Timing 헤더 값 - 여러 번 실행된 단계는 desc에 횟수 표시"""
+        entries = []
+        for name, seconds in self.durations.items():
+            entry = f"{name};dur={seconds * 1000:.1f}"
+            if self.counts[name] > 1:
+                entry += f';desc="{self.counts[name]} calls"'
+            entries.append(entry)
+        return ", ".join(entries)
+
+
+def activate(timer):
+    """현재 요청의 타이머 지정 - 반환한 토큰으로 deactivate"""
+    return _current_timer.set(timer)
+
+
+def deactivate(token):
+    _current_timer.reset(token)
+
+
+@contextlib.contextmanager
+def stage(name):
+    """현재 요청 타이머에 name 단계 시간 누적 (타이머가 없으면 측정하지 않음)"""
+    timer = _current_timer.get()
+    if timer is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer.add(name, time.perf_counter() - started)
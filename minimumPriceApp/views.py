@@ -8,29 +8,58 @@ from rest_framework.permissions import AllowAny
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.response import Response
 from rest_framework import status, serializers
-import pandas as pd
-import numpy as np
-from django.http import HttpResponse, JsonResponse
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified, JsonResponse, StreamingHttpResponse
 from io import BytesIO
 import os
 import urllib.request
 import urllib.parse
-import json
 import time
 import re
-import openpyxl
-from openpyxl.styles import PatternFill
+import functools
+import collections
+import math
+import contextvars
 import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 import tempfile
-from openpyxl.utils import get_column_letter
+import zipfile
+import codecs
+import csv
+import io
+from django.utils.functional import SimpleLazyObject
+
+from . import fastjson
+from .export_cache import ExportCache
+from .lazy import LazyDict, LazyModule
+from .models import RepricingJob
+from .profiling import profile_request
+from .rate_limit import QuotaExceeded, game_scope, naver_rate_limiter, seconds_until_quota_reset
+from .resilience import (
+    AdaptiveConcurrencyLimiter, CircuitBreaker, NaverAPIError, NaverResponseError, NaverServerError,
+    classify_error, retry_with_backoff,
+)
+from .scheduling import BatchScheduler
+from .search_cache import SearchResultCache
+from .singleflight import SingleFlight, normalize_query
+from .timing import stage
+
+
+# pandas/numpy/openpyxl은 처음 사용할 때 import (URLconf 로드·워커 부팅 시간 단축)
+# gunicorn preload 모드에서는 minimumPriceApp.warmup이 마스터에서 미리 로드
+pd = LazyModule('pandas')
+np = LazyModule('numpy')
+openpyxl = LazyModule('openpyxl')
+
 
 # API Configuration
 NAVER_CLIENT_ID = "S_iul25XJKSybg_fiSAc"
 NAVER_CLIENT_SECRET = "_73PsEM4om"
 PLUS_PRICE = 0
-API_DELAY = 0.3
 
 # Excel Processing Configuration
 PRODUCT_NAME_COLUMN = 3
@@ -38,21 +67,26 @@ PRICE_COLUMN = 5
 DATA_START_ROW = 6
 
 # Color definitions
-COLOR_FILLS = {
-    'none': PatternFill(fill_type=None),
-    'green': PatternFill(start_color="00FF00", end_color="00FF00", fill_type="solid"),
-    'blue': PatternFill(start_color="0000FF", end_color="0000FF", fill_type="solid"),
-    'yellow': PatternFill(start_color="FFFF00", end_color="FFFF00", fill_type="solid"),
-    'red': PatternFill(start_color="FF0000", end_color="FF0000", fill_type="solid"),
-    'purple': PatternFill(start_color="800080", end_color="800080", fill_type="solid")
-}
-
-COLOR_LEGEND_MAIN = [
+def _build_color_fills():
+    from openpyxl.styles import PatternFill
+    return {
+        'none': PatternFill(fill_type=None),
+        'green': PatternFill(start_color="00FF00", end_color="00FF00", fill_type="solid"),
+        'blue': PatternFill(start_color="0000FF", end_color="0000FF", fill_type="solid"),
+        'yellow': PatternFill(start_color="FFFF00", end_color="FFFF00", fill_type="solid"),
+        'red': PatternFill(start_color="FF0000", end_color="FF0000", fill_type="solid"),
+        'purple': PatternFill(start_color="800080", end_color="800080", fill_type="solid")
+    }
+
+
+COLOR_FILLS = LazyDict(_build_color_fills)
+
+COLOR_LEGEND_MAIN = SimpleLazyObject(lambda: [
     ("초록색", "1000원 이하", COLOR_FILLS['green']),
     ("파랑색", "2000원 이하", COLOR_FILLS['blue']),
     ("노랑색", "3000원 이하", COLOR_FILLS['yellow']),
     ("빨강색", "3000원 초과", COLOR_FILLS['red'])
-]
+])
 
 
 class ExcelDataSerializer(serializers.Serializer):
@@ -219,9 +253,63 @@ class CardGamePatternExtractor:
         
         return product_name, rarity, pokemon_name
     
+    # 포켓몬 형태 토큰 표기 통일 (ex는 소문자, 나머지는 대문자)
+    POKEMON_FORM_TOKENS = {'ex': 'ex', 'v': 'V', 'vmax': 'VMAX', 'vstar': 'VSTAR', 'gx': 'GX'}
+    # 카드를 구분하지 않는 수량/판매 표기 (상품명 끝에 붙는 경우가 많음)
+    POKEMON_NOISE_TOKENS = {'1장', '낱장', '싱글', '싱글카드'}
+    
+    @staticmethod
+    def canonical_query(search_name, card_type):
+        """게임별 정규 검색어 - 네이버 조회와 캐시 키로 사용 (표기 차이만 없앰, 카드 구분 정보는 유지)
+        
+        공통: 공백 정리
+        포켓몬: 괄호 기호 제거(내용은 유지), 카드번호의 "/" 주변 공백 제거, ex/V/VMAX/VSTAR/GX 표기 통일,
+        영문 토큰(레어도/세트 코드) 대문자, 수량 표기(1장 등) 제거 - 카드번호/세트 코드는 그대로 둠
+        """
+        if card_type != "포켓몬":
+            return " ".join(search_name.split())
+        
+        form_tokens = CardGamePatternExtractor.POKEMON_FORM_TOKENS
+        text = re.sub(r'[\[\](){}]', ' ', search_name)
+        text = re.sub(r'\s*/\s*', '/', text)
+        tokens = []
+        for token in text.split():
+            if token in CardGamePatternExtractor.POKEMON_NOISE_TOKENS:
+                continue
+            if token.lower() in form_tokens:
+                token = form_tokens[token.lower()]
+            elif re.fullmatch(r'[A-Za-z0-9/-]+', token):
+                token = token.upper()
+            tokens.append(token)
+        return " ".join(tokens)
+    
     @staticmethod
     def extract_search_info(product_name):
-        """Extract search information from product name"""
+        """Extract search information from product name - 검색어는 canonical_query 형태"""
+        search_name, card_type, pokemon_info = CardGamePatternExtractor.extract_raw_search_info(product_name)
+        if search_name:
+            search_name = CardGamePatternExtractor.canonical_query(search_name, card_type)
+        return search_name, card_type, pokemon_info
+    
+    @staticmethod
+    def query_stats(product_names):
+        """상품명 목록 → 원래 검색어 수와 정규 검색어(실제 조회 수) 비교"""
+        raw_queries = set()
+        canonical_queries = set()
+        for product_name in product_names:
+            if not product_name:
+                continue
+            search_name, card_type, _ = CardGamePatternExtractor.extract_raw_search_info(product_name)
+            if not search_name:
+                continue
+            raw_queries.add(search_name)
+            canonical_queries.add(
+                CardGamePatternExtractor.canonical_query(search_name, card_type))
+        return {'rawQueries': len(raw_queries), 'distinctQueries': len(canonical_queries)}
+    
+    @staticmethod
+    def extract_raw_search_info(product_name):
+        """Extract search information from product name (정규화 전 검색어)"""
         digimon_result = CardGamePatternExtractor.extract_digimon_info(product_name)
         if digimon_result:
             return digimon_result, "디지몬", None
@@ -237,28 +325,139 @@ class CardGamePatternExtractor:
         return None, None, None
 
 
+naver_single_flight = SingleFlight("naver:singleflight")
+naver_circuit_breaker = CircuitBreaker()
+naver_concurrency_limiter = AdaptiveConcurrencyLimiter()
+
+
 class NaverShoppingAPI:
     """Naver Shopping API client"""
     
     @staticmethod
-    def search(search_name):
-        """Search Naver Shopping API"""
+    def search(search_name, refresh=False):
+        """Search Naver Shopping API - 캐시 우선, 동일 검색어 동시 요청은 한 번만 호출
+        
+        refresh=True면 캐시를 무시하고 새로 조회한 뒤 캐시 갱신
+        """
+        if not refresh:
+            cached = SearchResultCache.get(search_name)
+            if cached is not None:
+                return cached
+        
+        items = naver_single_flight.do(
+            normalize_query(search_name),
+            lambda: NaverShoppingAPI._request(search_name)
+        )
+        SearchResultCache.set(search_name, items)
+        return items
+    
+    @staticmethod
+    def prefetch(search_names, search=None, max_workers=None):
+        """검색어 여러 개 동시 조회 → {검색어: items 또는 조회 중 발생한 예외}
+        
+        스레드는 최대 max_workers(기본 NAVER_CONCURRENCY_MAX)개, 실제 동시 호출 수는 naver_concurrency_limiter가 조절
+        """
+        search = search or NaverShoppingAPI.search
+        names = list(dict.fromkeys(search_names))
+        
+        def fetch(search_name):
+            try:
+                return search(search_name)
+            except Exception as e:
+                return e
+        
+        if len(names) <= 1:
+            return {search_name: fetch(search_name) for search_name in names}
+        
+        # 스레드에서도 요청의 Server-Timing 단계 타이머가 보이도록 컨텍스트 복사
+        max_workers = min(len(names), max_workers or settings.NAVER_CONCURRENCY_MAX)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {search_name: executor.submit(contextvars.copy_context().run, fetch, search_name)
+                       for search_name in names}
+        return {search_name: future.result() for search_name, future in futures.items()}
+    
+    @staticmethod
+    def prefetched(fetched):
+        """prefetch 결과를 쓰는 search 함수 - 실패한 검색어는 저장된 예외를 다시 발생"""
+        def search(search_name):
+            result = fetched[search_name] if search_name in fetched else NaverShoppingAPI.search(search_name)
+            if isinstance(result, Exception):
+                raise result
+            return result
+        return search
+    
+    @staticmethod
+    def _request(search_name):
+        """Naver Shopping API 호출 - 일시적 오류는 백오프 재시도, 서킷 브레이커 적용"""
+        return retry_with_backoff(
+            lambda: naver_circuit_breaker.call(lambda: NaverShoppingAPI._request_once(search_name))
+        )
+    
+    @staticmethod
+    def _request_once(search_name):
+        """Naver Shopping API 1회 호출 - 실패 시 NaverAPIError 하위 타입 발생"""
+        # 모든 워커 공유 호출 속도 제한 (할당량 소진 시 QuotaExceeded)
+        with stage('throttle'):
+            naver_rate_limiter.acquire()
+        
+        enc_text = urllib.parse.quote(search_name)
+        url = f"https://openapi.naver.com/v1/search/shop?query={enc_text}&sort=sim&exclude=used:rental:cbshop&display=20"
+        
+        request = urllib.request.Request(url)
+        request.add_header("X-Naver-Client-Id", NAVER_CLIENT_ID)
+        request.add_header("X-Naver-Client-Secret", NAVER_CLIENT_SECRET)
+        
+        # 동시 호출 수는 응답 지연/429에 맞춰 자동 조정 (NAVER_CONCURRENCY_MAX 이하)
+        with naver_concurrency_limiter.slot(), stage('naver'):
+            try:
+                response = urllib.request.urlopen(request, timeout=settings.NAVER_API_TIMEOUT)
+                body = response.read()
+            except Exception as e:
+                error = classify_error(e)
+                logging.error(f"API exception ({search_name}): {error}")
+                raise error from e
+        
+        if response.getcode() != 200:
+            raise NaverServerError(f"HTTP {response.getcode()} 응답")
+        
         try:
-            enc_text = urllib.parse.quote(search_name)
-            url = f"https://openapi.naver.com/v1/search/shop?query={enc_text}&sort=sim&exclude=used:rental:cbshop&display=20"
-            
-            request = urllib.request.Request(url)
-            request.add_header("X-Naver-Client-Id", NAVER_CLIENT_ID)
-            request.add_header("X-Naver-Client-Secret", NAVER_CLIENT_SECRET)
-            
-            response = urllib.request.urlopen(request)
-            if response.getcode() == 200:
-                result = json.loads(response.read())
-                return result.get('items', [])
-            return []
-        except Exception as e:
-            logging.error(f"API exception: {e}")
-            return []
+            return fastjson.parse_naver_items(body)
+        except ValueError as e:
+            raise NaverResponseError(f"응답 파싱 실패: {e}") from e
+
+
+HTML_TAG_PATTERN = re.compile(r'<[^>]+>')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+class PokemonNameMatcher:
+    """포켓몬명 매칭 - 검색어(포켓몬명)마다 한 번만 전처리
+    
+    1) 공백 제거 + 소문자 포켓몬명이 공백 제거 제목에 포함되면 통과
+    2) 아니면 ex/v/vmax/vstar를 제외한 모든 단어가 제목에 포함되어야 통과
+    """
+    
+    FORM_WORDS = frozenset(['ex', 'v', 'vmax', 'vstar'])
+    
+    def __init__(self, pokemon_name):
+        self.compact_name = WHITESPACE_PATTERN.sub('', pokemon_name).lower()
+        words = [word.lower() for word in pokemon_name.split() if word.lower() not in self.FORM_WORDS]
+        # 모든 단어 포함 여부를 정규식 한 번으로 확인 (단어가 없으면 항상 실패)
+        self.words_pattern = re.compile(
+            ''.join(f'(?=.*?{re.escape(word)})' for word in words), re.DOTALL
+        ) if words else None
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def for_name(pokemon_name):
+        """포켓몬명별 매처 (캐시)"""
+        return PokemonNameMatcher(pokemon_name)
+    
+    def matches(self, clean_title):
+        """태그가 제거된 상품 제목과 매칭"""
+        if self.compact_name in WHITESPACE_PATTERN.sub('', clean_title).lower():
+            return True
+        return self.words_pattern is not None and self.words_pattern.match(clean_title.lower()) is not None
 
 
 class ItemFilter:
@@ -313,21 +512,14 @@ class ItemFilter:
             if is_special_day and "특일" not in title:
                 return False, "제외: 특일 키워드 없음"
             
+            if required_pokemon_name or required_rarity:
+                clean_title = HTML_TAG_PATTERN.sub('', title)
+            
             if required_pokemon_name:
-                clean_title = re.sub(r'<[^>]+>', '', title)
-                required_name_no_space = re.sub(r'\s+', '', required_pokemon_name)
-                title_no_space = re.sub(r'\s+', '', clean_title)
-                
-                if required_name_no_space.lower() not in title_no_space.lower():
-                    required_words = [word for word in required_pokemon_name.split() 
-                                    if word.lower() not in ['ex', 'v', 'vmax', 'vstar']]
-                    word_matches = sum(1 for word in required_words if word.lower() in clean_title.lower())
-                    
-                    if word_matches != len(required_words) or len(required_words) == 0:
-                        return False, "제외: 포켓몬명 매칭 실패"
+                if not PokemonNameMatcher.for_name(required_pokemon_name).matches(clean_title):
+                    return False, "제외: 포켓몬명 매칭 실패"
             
             if required_rarity:
-                clean_title = re.sub(r'<[^>]+>', '', title)
                 if required_rarity not in clean_title:
                     return False, "제외: 레어도 미포함"
         
@@ -418,42 +610,94 @@ class ItemFilter:
         return min_price, valid_items_count, filter_match_info
 
 
+PriceLookup = collections.namedtuple(
+    'PriceLookup', 'search_name card_type pokemon_info min_price valid_count filter_info'
+)
+
+
 class PriceProcessor:
     """Process price updates - TCG999 Mode"""
     
+    COLOR_KEYS = ('none', 'green', 'blue', 'yellow', 'red', 'purple')
+    
     @staticmethod
-    def process_price_update(product_name, original_price):
-        """가격 업데이트 처리 - TCG999 모드"""
-        search_name, card_type, pokemon_info = CardGamePatternExtractor.extract_search_info(product_name)
+    def lookup_min_price(product_name, search=None):
+        """검색어 추출 → 네이버 조회 → 필터 적용 최저가 (검색 패턴이 없으면 None)
+        
+        search: 검색어 → 네이버 items 함수 (기본 NaverShoppingAPI.search)
+        """
+        with stage('extract'):
+            search_name, card_type, pokemon_info = CardGamePatternExtractor.extract_search_info(product_name)
         
         if not search_name:
-            logging.info(f"{product_name} : {int(original_price)} (검색 패턴 없음)")
-            return original_price, 0, "미확인", "패턴없음", "패턴없음", 0
+            return None
         
-        items = NaverShoppingAPI.search(search_name)
-        min_price, valid_items_count, filter_match_info = ItemFilter.filter_api_results_tcg999(
-            items, search_name, card_type, pokemon_info
+        items = (search or NaverShoppingAPI.search)(search_name)
+        with stage('filter'):
+            min_price, valid_items_count, filter_match_info = ItemFilter.filter_api_results_tcg999(
+                items, search_name, card_type, pokemon_info
+            )
+        return PriceLookup(search_name, card_type, pokemon_info, min_price, valid_items_count, filter_match_info)
+    
+    @staticmethod
+    def is_tcg999_not_found(lookup):
+        """filter_info가 "필터없음"이면 TCG999가 없는 것"""
+        return lookup.card_type == "포켓몬" and lookup.filter_info == "필터없음"
+    
+    @staticmethod
+    def expire_unusable(lookups):
+        """필터 통과 최저가가 없거나 TCG999가 없는 검색어는 검색 캐시를 짧은 TTL로 (다음 배치에서 다시 조회)"""
+        search_names = {
+            lookup.search_name for lookup in lookups
+            if lookup is not None and (lookup.min_price is None or PriceProcessor.is_tcg999_not_found(lookup))
+        }
+        for search_name in search_names:
+            SearchResultCache.mark_unusable(search_name)
+    
+    @staticmethod
+    def compute_batch_prices(original_prices, min_prices, tcg999_not_found=None):
+        """새 가격/변동액/색상 일괄 계산 (NumPy)
+        
+        original_prices: 기존 가격, min_prices: 필터 통과 최저가 (없으면 None)
+        tcg999_not_found: True인 행은 기존 가격 유지 + 보라색
+        최저가 + PLUS_PRICE, 최소 200원, 10원 단위가 있으면 100원 단위로 올림
+        반환: (새 가격 float 배열, 변동액 int 배열, 색상 키 배열)
+        """
+        original = np.asarray(original_prices, dtype=float)
+        minimum = np.array([np.nan if price is None else price for price in min_prices], dtype=float)
+        keep_original = np.isnan(minimum)
+        if tcg999_not_found is not None:
+            keep_original |= np.asarray(tcg999_not_found, dtype=bool)
+        
+        with np.errstate(invalid='ignore'):
+            new_prices = np.maximum(minimum + PLUS_PRICE, 200)
+            whole = np.trunc(new_prices)
+            remainder = np.mod(whole, 100)
+            new_prices = np.where(remainder > 0, whole + (100 - remainder), new_prices)
+        new_prices = np.where(keep_original, original, new_prices)
+        
+        price_diffs = np.trunc(new_prices - original).astype(np.int64)
+        color_keys = PriceProcessor.compute_color_keys(original, new_prices, tcg999_not_found)
+        return new_prices, price_diffs, color_keys
+    
+    @staticmethod
+    def compute_color_keys(original_prices, new_prices, tcg999_not_found=None):
+        """가격 차이별 COLOR_FILLS 키 일괄 계산 (0.01 미만 none, 1000/2000/3000 이하 green/blue/yellow, 초과 red)"""
+        difference = np.abs(np.asarray(new_prices, dtype=float) - np.asarray(original_prices, dtype=float))
+        buckets = np.select(
+            [difference < 0.01, difference <= 1000, difference <= 2000, difference <= 3000],
+            [0, 1, 2, 3],
+            default=4
         )
-        
-        # filter_info가 "필터없음"이면 TCG999가 없는 것
-        tcg999_not_found = (card_type == "포켓몬" and filter_match_info == "필터없음")
-        
-        if tcg999_not_found:
-            new_price = original_price
-            price_diff = 0
-        else:
-            if min_price is not None:
-                new_price = min_price + PLUS_PRICE
-                if new_price < 200:
-                    new_price = 200
-                
-                # 10원 단위가 있으면 100원 단위로 올림
-                remainder = int(new_price) % 100
-                if remainder > 0:
-                    new_price = int(new_price) + (100 - remainder)
-            else:
-                new_price = original_price
-            price_diff = int(new_price - original_price)
+        if tcg999_not_found is not None:
+            buckets = np.where(np.asarray(tcg999_not_found, dtype=bool), 5, buckets)
+        return np.array(PriceProcessor.COLOR_KEYS)[buckets]
+    
+    @staticmethod
+    def log_price_update(product_name, original_price, new_price, price_diff, lookup):
+        """가격 업데이트 결과 로그"""
+        search_name, card_type, pokemon_info, _, valid_items_count, filter_match_info = lookup
+        tcg999_not_found = PriceProcessor.is_tcg999_not_found(lookup)
         
         tcg_indicator = " [TCG999 -100원 적용✓]" if (card_type == "포켓몬" and not tcg999_not_found and filter_match_info != "필터없음") else ""
         not_found_indicator = " [⚠️ TCG999 없음]" if tcg999_not_found else ""
@@ -481,26 +725,673 @@ class PriceProcessor:
                 logging.info(f"{product_name} : {int(original_price)} (변경없음) [{card_type}카드 검색어: {search_name}]")
         
         logging.info("-" * 60)
+    
+    @staticmethod
+    def price_lookups(rows):
+        """[(product_name, original_price, lookup)] → 행별 (new_price, price_diff, card_type, filter_info, search_name, valid_count)
+        
+        가격 계산은 compute_batch_prices 한 번으로 처리, lookup이 None(검색 패턴 없음)이면 기존 가격 유지
+        """
+        if not rows:
+            return []
         
-        time.sleep(API_DELAY)
-        return new_price, price_diff, card_type, filter_match_info, search_name, valid_items_count
+        original_prices = [original_price for _, original_price, _ in rows]
+        min_prices = [lookup.min_price if lookup else None for _, _, lookup in rows]
+        not_found = [bool(lookup) and PriceProcessor.is_tcg999_not_found(lookup) for _, _, lookup in rows]
+        new_prices, price_diffs, _ = PriceProcessor.compute_batch_prices(original_prices, min_prices, not_found)
+        
+        priced = []
+        for (product_name, original_price, lookup), new_price, price_diff in zip(rows, new_prices.tolist(), price_diffs.tolist()):
+            if lookup is None:
+                logging.info(f"{product_name} : {int(original_price)} (검색 패턴 없음)")
+                priced.append((original_price, 0, "미확인", "패턴없음", "패턴없음", 0))
+                continue
+            if lookup.min_price is not None and not PriceProcessor.is_tcg999_not_found(lookup) and new_price.is_integer():
+                new_price = int(new_price)
+            PriceProcessor.log_price_update(product_name, original_price, new_price, price_diff, lookup)
+            priced.append((new_price, price_diff, lookup.card_type, lookup.filter_info,
+                           lookup.search_name, lookup.valid_count))
+        return priced
     
     @staticmethod
-    def get_fill_color(original_price, new_price):
-        """가격 차이에 따른 색상 결정"""
-        if abs(original_price - new_price) < 0.01:
-            return COLOR_FILLS['none']
+    def process_items(items, start_index=0, total=None, job_id=None, deadline=None, indices=None, card_game=None,
+                      done=None, checkpoint=None, is_cancelled=None, last_checked=None):
+        """상품 목록 가격 검색 - search_prices 및 청크 태스크 공용
+        
+        각 결과의 fetchStatus:
+        matched(최저가 찾음) / no_match(조회 성공, 조건 맞는 상품 없음) / no_pattern(검색 패턴 없음)
+        fetch_failed(API 호출 실패 - 재시도 대상) / quota_exceeded / error / skipped(시간 초과로 미처리)
+        cancelled(작업 취소로 미처리)
+        
+        job_id가 있으면 결과를 체크포인트하고, 이미 완료된 행은 저장된 결과를 사용
+        작업이 취소되면(cancel_search_prices) 다음 조회 묶음부터 네이버를 호출하지 않고 남은 행은 cancelled
+        처리 순서는 BatchScheduler의 기대 가치 순, deadline(epoch 초)이 지나면 남은 행은 skipped
+        조회가 끝난 행은 PRICE_FLUSH_ROWS개씩 모아 가격을 일괄 계산한 뒤 저장
+        indices: items 각각의 원래 행 번호 (없으면 start_index부터 연속)
+        card_game: 카드게임별 처리(process_items_by_game)일 때 동시 조회 수/호출 속도 비율 적용
+        done/checkpoint/is_cancelled/last_checked: job_id 대신 호출한 쪽이 DB 작업을 맡을 때
+        (완료 행, flush마다 {item_index: result}를 받는 함수, 취소 확인 함수, BatchScheduler.last_checked 결과)
+        - 이 경우 DB에 접근하지 않음
+        결과는 항상 items 순서로 반환
+        """
+        total = total or len(items)
+        if indices is None:
+            indices = range(start_index, start_index + len(items))
+        items_by_index = dict(zip(indices, items))
+        paused = 0
+        processed = 0
+        cancelled = False
+        
+        job = RepricingJob.objects.get(pk=job_id) if job_id else None
+        if job:
+            done = job.completed_rows()
+            checkpoint = job.checkpoint_many
+            is_cancelled = job.is_cancelled
+        done = done or {}
+        if done:
+            logging.info(f"체크포인트에서 재개 - 완료된 {len(done)}개 행은 건너뜀")
+        
+        results_by_index = {}
+        card_types = {}
+        search_keywords = {}
+        entries = []
+        with stage('extract'):
+            for item_index, item in items_by_index.items():
+                if not item.get('productName'):
+                    continue
+                if item_index in done:
+                    results_by_index[item_index] = done[item_index]
+                    continue
+                search_keyword, card_type, _ = CardGamePatternExtractor.extract_search_info(item['productName'])
+                card_types[item_index] = card_type
+                search_keywords[item_index] = search_keyword
+                entries.append((item_index, item.get('currentPrice', 0), card_type, search_keyword))
+        
+        unsaved = {}
+        
+        def save(item_index, result):
+            results_by_index[item_index] = result
+            if checkpoint:
+                unsaved[item_index] = result
+        
+        pending = []
+        
+        def flush():
+            """조회 완료 행 가격 일괄 계산 후 결과 저장 (체크포인트는 flush마다 한 번에)"""
+            rows = [(item['productName'], original_price, lookup) for _, item, original_price, lookup in pending]
+            PriceProcessor.expire_unusable(lookup for _, _, lookup in rows)
+            for (item_index, item, _, _), priced in zip(pending, PriceProcessor.price_lookups(rows)):
+                new_price, price_diff, card_type, filter_info, search_keyword, valid_count = priced
+                
+                if card_type == "미확인":
+                    fetch_status = 'no_pattern'
+                elif valid_count > 0:
+                    fetch_status = 'matched'
+                else:
+                    fetch_status = 'no_match'
+                
+                save(item_index, {
+                    'productName': item['productName'],
+                    'currentPrice': item.get('currentPrice', 0),
+                    'newPrice': new_price,
+                    'priceDiff': price_diff,
+                    'cardType': card_type,
+                    'filterInfo': filter_info,
+                    'searchKeyword': search_keyword,
+                    'validItemsCount': valid_count,
+                    'fetchStatus': fetch_status
+                })
+            pending.clear()
+            if unsaved:
+                checkpoint(dict(unsaved))
+                unsaved.clear()
+        
+        # 게임별 동시 조회 수(기본 NAVER_CONCURRENCY_MAX)개 행 단위로 검색어를 동시 조회한 뒤 행 순서대로 가격 계산
+        ordered = BatchScheduler.order(entries, last_checked)
+        window_size = PriceProcessor.game_concurrency(card_game)
+        for window_start in range(0, len(ordered), window_size):
+            window = ordered[window_start:window_start + window_size]
+            
+            # 오류율 급증으로 서킷이 열려 있으면 배치를 잠시 멈춤 (배치당 최대 NAVER_CIRCUIT_MAX_PAUSE초)
+            paused += naver_circuit_breaker.wait_if_open(settings.NAVER_CIRCUIT_MAX_PAUSE - paused)
+            
+            if is_cancelled and not cancelled and is_cancelled():
+                logging.warning(f"작업 취소됨 - 남은 {len(ordered) - window_start}개 행은 조회하지 않음")
+                cancelled = True
+            
+            expired = deadline is not None and time.time() >= deadline
+            search = None
+            if not (expired or cancelled):
+                with game_scope(card_game):
+                    fetched = NaverShoppingAPI.prefetch(
+                        (search_keywords[item_index] for item_index in window if card_types[item_index]),
+                        max_workers=window_size)
+                search = NaverShoppingAPI.prefetched(fetched)
+            
+            for item_index in window:
+                item = items_by_index[item_index]
+                product_name = item.get('productName')
+                current_price = item.get('currentPrice', 0)
+                
+                # 검색 패턴이 없는 행은 API 호출이 없으므로 시간 예산/취소와 무관하게 처리
+                if cancelled and card_types[item_index]:
+                    results_by_index[item_index] = PriceProcessor._failed_result(
+                        product_name, current_price, '취소', 'cancelled', '작업 취소로 처리하지 않음')
+                    continue
+                if expired and card_types[item_index]:
+                    results_by_index[item_index] = PriceProcessor._failed_result(
+                        product_name, current_price, '시간초과', 'skipped', '시간 예산 초과로 처리하지 않음')
+                    continue
+                
+                processed += 1
+                logging.info(f"[{processed}/{len(entries)}] 처리 중... (행 {item_index + 1}/{total})")
+                PriceProcessor._lookup_row(item_index, item, search, pending, save)
+                
+                if len(pending) >= settings.PRICE_FLUSH_ROWS:
+                    flush()
         
-        price_diff = abs(new_price - original_price)
+        flush()
         
-        if price_diff <= 1000:
-            return COLOR_FILLS['green']
-        elif price_diff <= 2000:
-            return COLOR_FILLS['blue']
-        elif price_diff <= 3000:
-            return COLOR_FILLS['yellow']
-        else:
-            return COLOR_FILLS['red']
+        return [results_by_index[item_index] for item_index in sorted(results_by_index)]
+    
+    @staticmethod
+    def game_concurrency(card_game):
+        """카드게임별 동시 조회 검색어 수 - NAVER_CONCURRENCY_MAX 이하"""
+        limit = settings.NAVER_CONCURRENCY_MAX
+        return max(1, min(limit, settings.REPRICING_GAME_CONCURRENCY.get(card_game, limit)))
+    
+    @staticmethod
+    def split_by_game(items, start_index=0):
+        """상품명이 있는 행을 카드게임별로 나눔 → {card_game: [(item_index, item)]} (검색 패턴 없음은 '')"""
+        lanes = {}
+        for item_index, item in enumerate(items, start_index):
+            if not item.get('productName'):
+                continue
+            _, card_type, _ = CardGamePatternExtractor.extract_search_info(item['productName'])
+            lanes.setdefault(card_type or '', []).append((item_index, item))
+        return lanes
+    
+    @staticmethod
+    def process_items_by_game(items, job_id=None, deadline=None):
+        """카드게임별로 나눠 동시에 처리 - 포켓몬 대량 배치가 원피스/디지몬 행을 기다리게 하지 않음
+        
+        게임마다 REPRICING_GAME_CONCURRENCY개씩 동시 조회, 호출 속도는 NAVER_RATE_SHARES 비율까지
+        결과는 items 순서로 합쳐 반환 (process_items와 같음)
+        """
+        lanes = PriceProcessor.split_by_game(items)
+        if len(lanes) <= 1:
+            card_game = next(iter(lanes), None)
+            return PriceProcessor.process_items(items, job_id=job_id, deadline=deadline, card_game=card_game)
+        
+        logging.info("카드게임별 처리 - " + ", ".join(
+            f"{card_game or '패턴없음'} {len(lane)}개" for card_game, lane in lanes.items()))
+        
+        # DB 작업(재개 행 조회, 처리 순서용 조회 시각, 체크포인트, 취소 확인)은 이 스레드에서만 -
+        # 레인 스레드는 네이버 조회/가격 계산만 하고 체크포인트 행은 큐로 넘김 (SQLite 동시 쓰기 잠금 방지)
+        job = RepricingJob.objects.get(pk=job_id) if job_id else None
+        done = job.completed_rows() if job else {}
+        last_checked = BatchScheduler.last_checked(
+            CardGamePatternExtractor.extract_search_info(item['productName'])[0]
+            for lane in lanes.values() for item_index, item in lane if item_index not in done)
+        checkpoints = queue.SimpleQueue()
+        cancel_requested = threading.Event()
+        
+        def save_checkpoints():
+            rows = {}
+            while True:
+                try:
+                    rows.update(checkpoints.get_nowait())
+                except queue.Empty:
+                    break
+            if job and rows:
+                job.checkpoint_many(rows)
+        
+        def run_lane(card_game, lane):
+            return PriceProcessor.process_items(
+                [item for _, item in lane], total=len(items), deadline=deadline,
+                indices=[item_index for item_index, _ in lane], card_game=card_game,
+                done=done, checkpoint=checkpoints.put if job else None,
+                is_cancelled=cancel_requested.is_set, last_checked=last_checked)
+        
+        with ThreadPoolExecutor(max_workers=len(lanes)) as executor:
+            futures = [
+                (lane, executor.submit(contextvars.copy_context().run, run_lane, card_game, lane))
+                for card_game, lane in lanes.items()
+            ]
+            running = {future for _, future in futures}
+            while running:
+                _, running = wait(running, timeout=settings.REPRICING_LANE_POLL_INTERVAL)
+                save_checkpoints()
+                if job and running and not cancel_requested.is_set() and job.is_cancelled():
+                    cancel_requested.set()
+        
+        results_by_index = {}
+        for lane, future in futures:
+            results_by_index.update(zip((item_index for item_index, _ in lane), future.result()))
+        return [results_by_index[item_index] for item_index in sorted(results_by_index)]
+    
+    @staticmethod
+    def _lookup_row(item_index, item, search, pending, save):
+        """행 1개 조회 - 성공하면 pending에 추가, 실패하면 실패 결과 저장"""
+        product_name = item.get('productName')
+        current_price = item.get('currentPrice', 0)
+        try:
+            original_price = float(current_price)
+            pending.append((item_index, item, original_price,
+                            PriceProcessor.lookup_min_price(product_name, search=search)))
+        except QuotaExceeded as e:
+            logging.error(f"할당량 초과로 건너뜀 ({product_name}): {str(e)}")
+            save(item_index, PriceProcessor._failed_result(
+                product_name, current_price, '할당량초과', 'quota_exceeded', e))
+        except NaverAPIError as e:
+            logging.error(f"API 조회 실패 ({product_name}): {str(e)}")
+            save(item_index, PriceProcessor._failed_result(
+                product_name, current_price, '조회실패', 'fetch_failed', e))
+        except Exception as e:
+            logging.error(f"상품 처리 중 오류 ({product_name}): {str(e)}")
+            save(item_index, PriceProcessor._failed_result(
+                product_name, current_price, '처리실패', 'error', e))
+    
+    @staticmethod
+    def preview_items(items):
+        """네이버를 호출하지 않는 가격 미리보기 - 캐시된 검색 결과에만 현재 필터/가격 규칙 적용
+        
+        fetchStatus: matched / no_match / no_pattern / not_cached(캐시 없음 - 기존 가격 유지)
+        체크포인트·할당량·처리 순서와 무관, 행별 로그 없이 가격은 한 번에 계산
+        """
+        lookups = {}
+        with stage('extract'):
+            for item in items:
+                product_name = item.get('productName')
+                if product_name and product_name not in lookups:
+                    lookups[product_name] = CardGamePatternExtractor.extract_search_info(product_name)
+        
+        with stage('cache'):
+            cached = SearchResultCache.get_many({info[0] for info in lookups.values() if info[0]})
+        
+        filtered = {}
+        with stage('filter'):
+            for product_name, (search_name, card_type, pokemon_info) in lookups.items():
+                if search_name in cached:
+                    filtered[product_name] = ItemFilter.filter_api_results_tcg999(
+                        cached[search_name], search_name, card_type, pokemon_info)
+        
+        results = []
+        priced = []
+        for item in items:
+            product_name = item.get('productName')
+            if not product_name:
+                continue
+            current_price = item.get('currentPrice', 0)
+            search_name, card_type, _ = lookups[product_name]
+            
+            try:
+                original_price = float(current_price)
+            except (TypeError, ValueError) as e:
+                results.append(PriceProcessor._failed_result(product_name, current_price, '처리실패', 'error', e))
+                continue
+            
+            result = {
+                'productName': product_name,
+                'currentPrice': current_price,
+                'newPrice': current_price,
+                'priceDiff': 0,
+                'cardType': card_type,
+                'filterInfo': '캐시없음',
+                'searchKeyword': search_name,
+                'validItemsCount': 0,
+                'fetchStatus': 'not_cached'
+            }
+            if not search_name:
+                result.update(cardType="미확인", filterInfo="패턴없음", searchKeyword="패턴없음", fetchStatus='no_pattern')
+            elif product_name in filtered:
+                min_price, valid_count, filter_info = filtered[product_name]
+                tcg999_not_found = card_type == "포켓몬" and filter_info == "필터없음"
+                result.update(filterInfo=filter_info, validItemsCount=valid_count,
+                              fetchStatus='matched' if valid_count > 0 else 'no_match')
+                priced.append((result, original_price, min_price, tcg999_not_found))
+            results.append(result)
+        
+        if priced:
+            new_prices, price_diffs, _ = PriceProcessor.compute_batch_prices(
+                [row[1] for row in priced], [row[2] for row in priced], [row[3] for row in priced])
+            for (result, _, min_price, tcg999_not_found), new_price, price_diff in zip(
+                    priced, new_prices.tolist(), price_diffs.tolist()):
+                if min_price is not None and not tcg999_not_found and new_price.is_integer():
+                    new_price = int(new_price)
+                result.update(newPrice=new_price, priceDiff=price_diff)
+        return results
+    
+    @staticmethod
+    def _failed_result(product_name, current_price, label, fetch_status, error):
+        """처리 실패 행 - 기존 가격 유지"""
+        return {
+            'productName': product_name,
+            'currentPrice': current_price,
+            'newPrice': current_price,
+            'priceDiff': 0,
+            'cardType': '오류',
+            'filterInfo': label,
+            'searchKeyword': label,
+            'validItemsCount': 0,
+            'fetchStatus': fetch_status,
+            'error': str(error)
+        }
+    
+    @staticmethod
+    def required_api_calls(items, done=None):
+        """배치에 필요한 예상 네이버 호출 수 - 고유 정규 검색어 중 캐시에 없는 것
+        
+        done: 체크포인트된 완료 행 {item_index: result} - 이어서 처리할 때 다시 조회하지 않는 행
+        """
+        done = done or {}
+        search_names = set()
+        for item_index, item in enumerate(items):
+            if not item.get('productName') or item_index in done:
+                continue
+            search_name, _, _ = CardGamePatternExtractor.extract_search_info(item['productName'])
+            if search_name:
+                search_names.add(search_name)
+        return SearchResultCache.uncached_count(search_names)
+    
+    @staticmethod
+    def should_fan_out(items):
+        """Celery 청크 분산 처리 대상 여부"""
+        return (settings.SEARCH_PRICES_FANOUT_ENABLED
+                and len(items) > settings.SEARCH_PRICES_CHUNK_SIZE)
+
+
+class UploadReader:
+    """Extract (excelRow, productName, price) rows from uploaded catalogs"""
+    
+    @staticmethod
+    def build_rows(row_numbers, product_names, prices):
+        """행 번호/상품명/가격 열 → (행 목록, 가격이 숫자가 아닌 행 번호 목록)
+        
+        가격은 pd.to_numeric(errors='coerce')로 변환 - 숫자가 아니면 가격 없음으로 두고 행 번호만 기록
+        상품명/가격이 모두 비어 있는 행은 제외
+        """
+        numeric_prices = pd.to_numeric(pd.Series(prices, dtype=object), errors='coerce')
+        
+        data_rows = []
+        invalid_price_rows = []
+        for row_number, product_name, raw_price, price in zip(row_numbers, product_names, prices, numeric_prices):
+            if pd.isna(product_name) and pd.isna(raw_price):
+                continue
+            if pd.isna(price) and not pd.isna(raw_price):
+                invalid_price_rows.append(row_number)
+            data_rows.append({
+                'excelRow': row_number,
+                'productName': None if pd.isna(product_name) else str(product_name),
+                'price': None if pd.isna(price) else float(price)
+            })
+        return data_rows, invalid_price_rows
+    
+    @staticmethod
+    def read(uploaded_file, filename):
+        """확장자별 읽기 - .csv / .parquet / 그 외는 엑셀 → (행 목록, 가격이 숫자가 아닌 행 번호 목록)"""
+        filename = filename.lower()
+        if filename.endswith('.csv'):
+            return UploadReader.read_csv(uploaded_file)
+        if filename.endswith('.parquet'):
+            return UploadReader.read_parquet(uploaded_file)
+        return UploadReader.read_excel(uploaded_file)
+    
+    @staticmethod
+    def read_excel(excel_file):
+        """xlsx/xls - 첫 번째 시트의 DATA_START_ROW행부터"""
+        df = pd.read_excel(excel_file, header=None)
+        if len(df) < DATA_START_ROW:
+            return [], []
+        
+        data = df.iloc[DATA_START_ROW - 1:]
+        return UploadReader.build_rows(
+            range(DATA_START_ROW, len(df) + 1),
+            data.iloc[:, PRODUCT_NAME_COLUMN].tolist(),
+            data.iloc[:, PRICE_COLUMN].tolist()
+        )
+    
+    @staticmethod
+    def _detect_encoding(uploaded_file):
+        """UTF-8(BOM 포함)이 아니면 엑셀 기본 저장 형식인 CP949로 간주"""
+        head = uploaded_file.read(64 * 1024)
+        uploaded_file.seek(0)
+        try:
+            codecs.getincrementaldecoder('utf-8')().decode(head, final=False)
+            return 'utf-8-sig'
+        except UnicodeDecodeError:
+            return 'cp949'
+    
+    @staticmethod
+    def read_csv(csv_file):
+        """CSV - 시트와 같은 열 배치, 줄 단위 스트리밍 파싱 (전체를 메모리에 올리지 않음)"""
+        encoding = UploadReader._detect_encoding(csv_file)
+        text = io.TextIOWrapper(csv_file, encoding=encoding, newline='')
+        
+        row_numbers = []
+        product_names = []
+        prices = []
+        try:
+            for line_number, values in enumerate(csv.reader(text), 1):
+                if line_number < DATA_START_ROW:
+                    continue
+                product_name = values[PRODUCT_NAME_COLUMN].strip() if len(values) > PRODUCT_NAME_COLUMN else ''
+                price = values[PRICE_COLUMN].strip().replace(',', '') if len(values) > PRICE_COLUMN else ''
+                row_numbers.append(line_number)
+                product_names.append(product_name or None)
+                prices.append(price or None)
+        finally:
+            text.detach()
+        return UploadReader.build_rows(row_numbers, product_names, prices)
+    
+    @staticmethod
+    def read_parquet(parquet_file):
+        """Parquet - 상품명/가격 두 열만 배치 단위로 읽음 (행 번호는 1부터)
+        
+        PARQUET_PRODUCT_NAME_FIELD/PARQUET_PRICE_FIELD 설정이 없으면 시트와 같은 열 위치 사용
+        """
+        import pyarrow.parquet as pq
+        
+        source = pq.ParquetFile(parquet_file)
+        names = source.schema_arrow.names
+        name_field = settings.PARQUET_PRODUCT_NAME_FIELD or names[PRODUCT_NAME_COLUMN]
+        price_field = settings.PARQUET_PRICE_FIELD or names[PRICE_COLUMN]
+        
+        data_rows = []
+        invalid_price_rows = []
+        row_number = 0
+        for batch in source.iter_batches(batch_size=settings.UPLOAD_BATCH_ROWS, columns=[name_field, price_field]):
+            columns = batch.to_pydict()
+            batch_rows, batch_invalid = UploadReader.build_rows(
+                range(row_number + 1, row_number + batch.num_rows + 1),
+                [None if product_name in (None, '') else product_name for product_name in columns[name_field]],
+                [None if price in (None, '') else price for price in columns[price_field]]
+            )
+            data_rows.extend(batch_rows)
+            invalid_price_rows.extend(batch_invalid)
+            row_number += batch.num_rows
+        return data_rows, invalid_price_rows
+
+
+class ExcelExporter:
+    """Build output workbooks - TCG999 Mode"""
+    
+    HEADER_COLUMNS = ["변동액", "기존가격", "카드타입", "필터적용", "검색개수", "검색어"]
+    
+    @staticmethod
+    def iter_output_rows(worksheet, mod_dict, changed_only=False):
+        """원본 시트 행마다 (행 번호, 출력 값 목록, price_info) 생성
+        
+        mod_dict: {엑셀 행 번호: {'productName', 'price', 'stock', 'filterInfo', 'validCount'}}
+        price_info: (기존가격, 새 가격, TCG999 없음 여부) - 수정 행만, 나머지는 None
+        changed_only=True면 헤더와 가격/재고가 바뀐 행만 생성 (맨 앞에 원본 행 번호 열 추가)
+        """
+        for row_idx, values in enumerate(worksheet.iter_rows(values_only=True), 1):
+            new_row = []
+            price_info = None
+            tcg999_not_found = False
+            
+            if row_idx == 1:
+                new_row.extend(ExcelExporter.HEADER_COLUMNS)
+                new_row.extend(values)
+                if changed_only:
+                    new_row.insert(0, "원본행")
+                yield row_idx, new_row, None
+                continue
+            
+            mod = mod_dict.get(row_idx)
+            if mod is None:
+                if not changed_only:
+                    yield row_idx, [0, 0, "", "", 0, ""] + list(values), None
+                continue
+            
+            product_name = mod.get('productName', '')
+            
+            original_price_value = values[5] if len(values) > 5 else None
+            original_price = float(original_price_value) if original_price_value else 0
+            new_price = float(mod.get('price', original_price))
+            price_diff = int(new_price - original_price)
+            
+            row_values = list(values)
+            if len(row_values) > 5:
+                row_values[5] = float(mod.get('price', row_values[5] or 0))
+            stock_changed = False
+            if len(row_values) > 7 and 'stock' in mod:
+                new_stock = int(float(mod['stock'] or 0))
+                stock_changed = new_stock != row_values[7]
+                row_values[7] = new_stock
+            
+            if changed_only and abs(new_price - original_price) < 0.01 and not stock_changed:
+                continue
+            
+            search_name, card_type, pokemon_info = CardGamePatternExtractor.extract_search_info(product_name)
+            
+            filter_info = mod.get('filterInfo', "")
+            
+            # filterInfo가 "필터없음"이면 TCG999가 없는 것으로 판단
+            if card_type == "포켓몬" and filter_info == "필터없음":
+                tcg999_not_found = True
+                logger.info(f"행 {row_idx}: 타입={card_type}, 필터={filter_info} → 보라색 표시 대상")
+            else:
+                logger.info(f"행 {row_idx}: 타입={card_type}, 필터={filter_info}")
+            
+            new_row.extend([
+                price_diff,
+                int(original_price),
+                card_type or "미확인",
+                filter_info,
+                mod.get('validCount', 0),
+                search_name or ""
+            ])
+            new_row.extend(row_values)
+            if changed_only:
+                new_row.insert(0, row_idx)
+            
+            price_info = (original_price, new_price, tcg999_not_found)
+            yield row_idx, new_row, price_info
+    
+    @staticmethod
+    def iter_with_fills(output_rows, chunk_size=1000):
+        """iter_output_rows 결과에 가격 셀 색상을 붙여 (행 번호, 출력 값, price_info, fill) 생성
+        
+        chunk_size 행씩 모아 compute_color_keys로 색상을 일괄 계산, 수정 행이 아니면 fill은 None
+        """
+        def colored(chunk):
+            infos = [price_info for _, _, price_info in chunk if price_info is not None]
+            if infos:
+                original_prices, new_prices, not_found = zip(*infos)
+                color_keys = iter(PriceProcessor.compute_color_keys(original_prices, new_prices, not_found).tolist())
+            for row_idx, new_row, price_info in chunk:
+                fill = COLOR_FILLS[next(color_keys)] if price_info is not None else None
+                yield row_idx, new_row, price_info, fill
+        
+        chunk = []
+        for output_row in output_rows:
+            chunk.append(output_row)
+            if len(chunk) >= chunk_size:
+                yield from colored(chunk)
+                chunk = []
+        yield from colored(chunk)
+    
+    @staticmethod
+    def build_modified_worksheet(worksheet, new_worksheet, mod_dict):
+        """원본 시트 + 변동 정보 A~F열 + 가격 색상/범례로 새 시트 작성"""
+        output_rows = ExcelExporter.iter_output_rows(worksheet, mod_dict)
+        for row_idx, new_row, price_info, fill in ExcelExporter.iter_with_fills(output_rows):
+            new_worksheet.append(new_row)
+            
+            if price_info is not None:
+                if price_info[2]:
+                    logger.info(f"  → 보라색 적용: 행 {row_idx}")
+                new_worksheet.cell(row=row_idx, column=12).fill = fill
+        
+        for i, (color_name, range_text, fill_color) in enumerate(COLOR_LEGEND_MAIN, 2):
+            new_worksheet.cell(row=i, column=1, value=color_name).fill = fill_color
+            new_worksheet.cell(row=i, column=2, value=range_text)
+        
+        new_worksheet.cell(row=2, column=3, value="보라색").fill = COLOR_FILLS['purple']
+        new_worksheet.cell(row=2, column=4, value="TCG999 없음")
+    
+    @staticmethod
+    def build_changed_workbook(worksheet, mod_dict):
+        """변경된 행만 담은 워크북 (write-only 스트리밍 작성, 범례 없음)"""
+        from openpyxl.cell import WriteOnlyCell
+        
+        new_workbook = openpyxl.Workbook(write_only=True)
+        new_worksheet = new_workbook.create_sheet()
+        
+        output_rows = ExcelExporter.iter_output_rows(worksheet, mod_dict, changed_only=True)
+        for row_idx, new_row, price_info, fill in ExcelExporter.iter_with_fills(output_rows):
+            if price_info is not None:
+                # 원본행 열이 앞에 붙어 가격은 13번째 열
+                price_cell = WriteOnlyCell(new_worksheet, value=new_row[12])
+                price_cell.fill = fill
+                new_row[12] = price_cell
+            new_worksheet.append(new_row)
+        
+        return new_workbook
+    
+    @staticmethod
+    def iter_csv(worksheet, mod_dict, changed_only=False):
+        """CSV 텍스트를 행 단위로 생성 (StreamingHttpResponse용, Excel 호환 BOM 포함)"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        yield '\ufeff'
+        for _, new_row, _ in ExcelExporter.iter_output_rows(worksheet, mod_dict, changed_only=changed_only):
+            writer.writerow(new_row)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+
+def wants_columnar(request):
+    """responseFormat=columnar (쿼리 또는 본문) 요청 여부"""
+    response_format = request.query_params.get('responseFormat') or request.data.get('responseFormat') or ''
+    return str(response_format).lower() == 'columnar'
+
+
+def to_columnar(rows):
+    """dict 목록 → {'fields': [...], 'columns': {필드: [값...]}} (필드 이름을 행마다 반복하지 않아 응답이 작아짐)
+    
+    일부 행에만 있는 필드(error 등)는 나머지 행에서 None
+    """
+    fields = list(dict.fromkeys(field for row in rows for field in row))
+    return {
+        'fields': fields,
+        'columns': {field: [row.get(field) for row in rows] for field in fields}
+    }
+
+
+def parse_time_budget(value):
+    """timeBudget(초) 검증 - 없으면 None, 양의 유한한 숫자가 아니면 ValueError"""
+    if value is None or value == '':
+        return None
+    if isinstance(value, bool):
+        raise ValueError(value)
+    time_budget = float(value)
+    if not math.isfinite(time_budget) or time_budget <= 0:
+        raise ValueError(value)
+    return time_budget
 
 
 # ==================== API Endpoints ====================
@@ -514,6 +1405,7 @@ formatter = logging.Formatter('%(message)s')
 console_handler.setFormatter(formatter)
 logger.addHandler(console_handler)
 
+@profile_request
 @api_view(['POST'])
 @permission_classes([AllowAny])
 @parser_classes([MultiPartParser, FormParser])
@@ -523,101 +1415,133 @@ def upload_excel(request):
         return Response({'error': 'No file provided'}, status=status.HTTP_400_BAD_REQUEST)
     
     excel_file = request.FILES['file']
+    filename = excel_file.name.lower()
     
-    if not excel_file.name.endswith(('.xlsx', '.xls')):
+    if not filename.endswith(('.xlsx', '.xls', '.csv', '.parquet')):
         return Response({'error': 'Invalid file format'}, status=status.HTTP_400_BAD_REQUEST)
     
     try:
-        df = pd.read_excel(excel_file, header=None)
-        
-        data_rows = []
-        for idx in range(DATA_START_ROW - 1, len(df)):
-            product_name = df.iloc[idx, PRODUCT_NAME_COLUMN]
-            price = df.iloc[idx, PRICE_COLUMN]
-            
-            if pd.isna(product_name) and pd.isna(price):
-                continue
-            
-            data_rows.append({
-                'excelRow': idx + 1,
-                'productName': None if pd.isna(product_name) else str(product_name),
-                'price': None if pd.isna(price) else float(price)
-            })
+        with stage('parse'):
+            data_rows, invalid_price_rows = UploadReader.read(excel_file, filename)
+        if invalid_price_rows:
+            logging.warning(f"가격이 숫자가 아닌 행 {len(invalid_price_rows)}개 - 가격 없음으로 처리: {invalid_price_rows[:20]}")
         
         serializer = ExcelDataSerializer(data_rows, many=True)
+        data = to_columnar(serializer.data) if wants_columnar(request) else serializer.data
+        
+        # 시트의 상품명이 정규 검색어 몇 개로 줄어드는지 (= 가격 검색 시 네이버 조회 수)
+        with stage('extract'):
+            query_stats = CardGamePatternExtractor.query_stats(row['productName'] for row in data_rows)
+        logging.info(f"업로드 {len(data_rows)}개 행 - 검색어 {query_stats['rawQueries']}개 → 정규 검색어 {query_stats['distinctQueries']}개")
         
         return Response({
             'message': 'File uploaded successfully',
-            'data': serializer.data,
-            'totalRows': len(data_rows)
+            'data': data,
+            'totalRows': len(data_rows),
+            'invalidPriceRows': invalid_price_rows,
+            'invalidPriceCount': len(invalid_price_rows),
+            'queryStats': query_stats
         }, status=status.HTTP_200_OK)
         
+    except ImportError as e:
+        return Response({'error': f'Parquet support requires pyarrow: {str(e)}'},
+                       status=status.HTTP_400_BAD_REQUEST)
     except Exception as e:
         return Response({'error': f'Failed to process file: {str(e)}'}, 
                        status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@profile_request
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def search_prices(request):
-    """Search prices - TCG999 Mode"""
+    """Search prices - TCG999 Mode (dryRun=true면 캐시된 검색 결과만 쓰는 미리보기)"""
     try:
         items = request.data.get('items', [])
         
         if not items:
             return Response({'error': 'No items provided'}, status=status.HTTP_400_BAD_REQUEST)
         
+        # dryRun: 네이버 호출 없이 캐시된 검색 결과로만 새 가격 예상 (할당량/체크포인트 미사용)
+        # JSON true 또는 폼 문자열 'true'/'1'만 허용 ('false'/'0'은 실제 검색)
+        if str(request.data.get('dryRun', '')).lower() in ('true', '1'):
+            return search_prices_preview(request, items)
+        
+        # 시간 예산(초) - 지나면 남은 행은 skipped로 반환 (기대 가치가 높은 행부터 처리)
+        try:
+            time_budget = parse_time_budget(request.data.get('timeBudget', settings.REPRICING_DEFAULT_TIME_BUDGET))
+        except (TypeError, ValueError):
+            return Response({'error': 'timeBudget must be a positive number of seconds'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        deadline = time.time() + time_budget if time_budget else None
+        
         logging.info("=" * 80)
         logging.info("🚀 TCG999 특별가격 모드 - 카드 최저가 검색 시작")
         logging.info("=" * 80)
         logging.info(f"처리할 상품 수: {len(items)}개\n")
         
-        results = []
-        
-        for idx, item in enumerate(items, 1):
-            product_name = item.get('productName')
-            current_price = item.get('currentPrice', 0)
+        # 일일 할당량이 배치를 처리하기에 부족하면 바로 실패
+        # 필요 호출 수 = 고유 검색어 중 캐시에 없는 것 (이어서 처리하는 작업의 완료 행은 제외)
+        remaining_quota = naver_rate_limiter.remaining_today()
+        required_quota = PriceProcessor.required_api_calls(items, RepricingJob.resumable_rows(items))
+        if remaining_quota < required_quota:
+            retry_after = seconds_until_quota_reset()
+            logging.warning(f"네이버 API 할당량 부족: 남은 {remaining_quota}회 / 필요 {required_quota}회")
+            response = Response({
+                'error': 'Naver API daily quota nearly exhausted',
+                'remainingQuota': remaining_quota,
+                'requiredQuota': required_quota,
+                'retryAfter': retry_after
+            }, status=status.HTTP_429_TOO_MANY_REQUESTS)
+            response['Retry-After'] = str(retry_after)
+            return response
+        
+        # 같은 목록을 다시 요청하면 체크포인트된 행부터 이어서 처리
+        job = RepricingJob.start(items)
+        
+        if PriceProcessor.should_fan_out(items):
+            from .tasks import dispatch_search_batch
             
-            if not product_name:
-                continue
-            
-            logging.info(f"[{idx}/{len(items)}] 처리 중...")
-            
-            try:
-                new_price, price_diff, card_type, filter_info, search_keyword, valid_count = \
-                    PriceProcessor.process_price_update(product_name, float(current_price))
-                
-                results.append({
-                    'productName': product_name,
-                    'currentPrice': current_price,
-                    'newPrice': new_price,
-                    'priceDiff': price_diff,
-                    'cardType': card_type,
-                    'filterInfo': filter_info,
-                    'searchKeyword': search_keyword,
-                    'validItemsCount': valid_count
-                })
-            except Exception as e:
-                logging.error(f"상품 처리 중 오류 ({product_name}): {str(e)}")
-                results.append({
-                    'productName': product_name,
-                    'currentPrice': current_price,
-                    'newPrice': current_price,
-                    'priceDiff': 0,
-                    'cardType': '오류',
-                    'filterInfo': '처리실패',
-                    'searchKeyword': '처리실패',
-                    'validItemsCount': 0,
-                    'error': str(e)
-                })
+            logging.info(f"대용량 배치 - {settings.SEARCH_PRICES_CHUNK_SIZE}개 단위 청크로 분산 처리")
+            results = dispatch_search_batch(items, job_id=job.pk, deadline=deadline) \
+                .get(timeout=settings.SEARCH_PRICES_FANOUT_TIMEOUT)
+        else:
+            results = PriceProcessor.process_items_by_game(items, job_id=job.pk, deadline=deadline)
+        
+        # 후속 실행용 - 같은 items로 다시 요청하면 skipped 행만 처리됨
+        # skipped는 items 기준 행 번호 (결과는 상품명이 있는 행만 순서대로 포함)
+        row_indices = [item_index for item_index, item in enumerate(items) if item.get('productName')]
+        skipped = [item_index for item_index, result in zip(row_indices, results)
+                   if result.get('fetchStatus') == 'skipped']
+        if skipped:
+            logging.info(f"시간 예산 초과로 {len(skipped)}개 행 미처리")
+        
+        # 취소된 작업은 지금까지의 결과만 반환 - 같은 items로 다시 요청하면 남은 행부터 처리
+        cancelled_count = sum(1 for result in results if result.get('fetchStatus') == 'cancelled')
+        if cancelled_count:
+            logging.info(f"작업 취소로 {cancelled_count}개 행 미처리")
+        
+        # 실패 행이 남아 있으면 진행중으로 두어 재요청 시 실패 행만 다시 조회
+        if all(result.get('fetchStatus') in RepricingJob.DONE_FETCH_STATUSES for result in results):
+            job.mark_completed()
         
         logging.info("\n" + "=" * 80)
         logging.info("✅ TCG999 특별가격 모드 - 카드 최저가 검색 완료")
         logging.info("=" * 80)
         
+        distinct_queries = len({result['searchKeyword'] for result in results
+                                if result.get('fetchStatus') in ('matched', 'no_match')})
+        logging.info(f"정규 검색어 {distinct_queries}개로 {len(results)}개 행 처리")
+        
         return Response({
-            'results': results,
-            'totalProcessed': len(results)
+            'results': to_columnar(results) if wants_columnar(request) else results,
+            'totalProcessed': len(results) - len(skipped) - cancelled_count,
+            'jobKey': job.job_key,
+            'skipped': skipped,
+            'skippedCount': len(skipped),
+            'cancelled': cancelled_count > 0,
+            'cancelledCount': cancelled_count,
+            'distinctQueries': distinct_queries
         }, status=status.HTTP_200_OK)
         
     except Exception as e:
@@ -626,6 +1550,117 @@ def search_prices(request):
                        status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+def search_prices_preview(request, items):
+    """search_prices dryRun 응답 - 예상 새 가격과 캐시 없는 행 목록"""
+    started = time.perf_counter()
+    results = PriceProcessor.preview_items(items)
+    
+    not_cached = [result['productName'] for result in results if result['fetchStatus'] == 'not_cached']
+    changed_count = sum(1 for result in results if result['priceDiff'])
+    logging.info(f"가격 미리보기 - {len(results)}개 행 중 변경 예상 {changed_count}개, "
+                 f"캐시 없음 {len(not_cached)}개 ({time.perf_counter() - started:.2f}초)")
+    
+    return Response({
+        'dryRun': True,
+        'results': to_columnar(results) if wants_columnar(request) else results,
+        'totalRows': len(results),
+        'changedCount': changed_count,
+        'notCached': not_cached,
+        'notCachedCount': len(not_cached),
+        'coverage': round(1 - len(not_cached) / len(results), 4) if results else 0
+    }, status=status.HTTP_200_OK)
+
+
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def cancel_search_prices(request):
+    """진행 중인 search_prices 작업 취소 - jobKey 또는 search_prices에 보낸 items로 작업 지정
+    
+    처리 중인 워커는 다음 조회 묶음부터 네이버를 호출하지 않음 (이미 보낸 요청은 끝까지 받음)
+    지금까지 체크포인트된 행(최대 PRICE_FLUSH_ROWS개 늦음)을 부분 결과로 반환하고,
+    진행 중이던 search_prices 요청도 조회된 행까지의 결과를 cancelled=True로 반환
+    같은 items로 다시 요청하면 남은 행부터 이어서 처리
+    """
+    job_key = request.data.get('jobKey')
+    items = request.data.get('items')
+    if not job_key and not items:
+        return Response({'error': 'jobKey or items required'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    job = RepricingJob.objects.filter(job_key=job_key or RepricingJob.make_job_key(items)).first()
+    if job is None:
+        return Response({'error': 'Job not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    if not job.cancel():
+        return Response({
+            'error': 'Job is not running',
+            'jobKey': job.job_key,
+            'status': job.status
+        }, status=status.HTTP_409_CONFLICT)
+    
+    results = job.partial_results()
+    logging.info(f"작업 취소 요청 ({job.job_key[:12]}) - 완료 {len(results)}/{job.total_items}개 행")
+    
+    return Response({
+        'jobKey': job.job_key,
+        'status': job.status,
+        'results': to_columnar(results) if wants_columnar(request) else results,
+        'completedRows': len(results),
+        'remainingRows': max(0, job.total_items - len(results)),
+        'totalItems': job.total_items
+    }, status=status.HTTP_200_OK)
+
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+CSV_CONTENT_TYPE = 'text/csv; charset=utf-8'
+
+
+def _export_filename(base_name, export_format, changed_only):
+    suffix = "_TCG999특가_변경분" if changed_only else "_TCG999특가"
+    return f"{base_name}{suffix}.{export_format}"
+
+
+def _fast_export_response(excel_file, modifications, base_name, export_format, changed_only, cache_key=None):
+    """download_excel 빠른 경로 - 읽기 전용 로드 후 CSV 스트리밍 또는 변경 행만 write-only 작성
+    
+    cache_key가 있으면 완성된 결과를 ExportCache에 저장
+    """
+    with stage('parse'):
+        workbook = openpyxl.load_workbook(BytesIO(excel_file.read()), read_only=True)
+    worksheet = workbook.worksheets[0]
+    mod_dict = {int(mod['excelRow']): mod for mod in modifications}
+    new_filename = _export_filename(base_name, export_format, changed_only)
+    
+    if export_format == 'csv':
+        def stream():
+            try:
+                yield from ExcelExporter.iter_csv(worksheet, mod_dict, changed_only=changed_only)
+            finally:
+                workbook.close()
+        
+        chunks = ExportCache.tee(cache_key, stream(), CSV_CONTENT_TYPE) if cache_key else stream()
+        response = StreamingHttpResponse(chunks, content_type=CSV_CONTENT_TYPE)
+    else:
+        try:
+            # write-only 워크북은 save 시점에 행을 기록하므로 build와 save를 함께 측정
+            with stage('build'):
+                new_workbook = ExcelExporter.build_changed_workbook(worksheet, mod_dict)
+                output = BytesIO()
+                new_workbook.save(output)
+        finally:
+            workbook.close()
+        
+        file_content = output.getvalue()
+        if cache_key:
+            ExportCache.set(cache_key, file_content, XLSX_CONTENT_TYPE)
+        response = HttpResponse(file_content, content_type=XLSX_CONTENT_TYPE)
+        response['Content-Length'] = len(file_content)
+    
+    response['Content-Disposition'] = f'attachment; filename="{new_filename}"'
+    logger.info(f"빠른 내보내기 완료 ({export_format}, 변경분만={changed_only}): {new_filename}")
+    return response
+
+
+@profile_request
 @csrf_exempt
 @require_http_methods(["POST"])
 def download_excel(request):
@@ -650,12 +1685,46 @@ def download_excel(request):
             if not modifications_json:
                 return JsonResponse({'error': 'modifications 데이터가 없습니다'}, status=400)
             
-            modifications = json.loads(modifications_json)
+            modifications = fastjson.loads(modifications_json)
             logger.info(f"수정 항목 개수: {len(modifications)}")
-        except json.JSONDecodeError as e:
+        except ValueError as e:
             logger.error(f"JSON 파싱 오류: {str(e)}")
             return JsonResponse({'error': 'modifications JSON 파싱 실패'}, status=400)
         
+        # 출력 옵션 - format: xlsx(기본)/csv, changedOnly: 가격/재고가 바뀐 행만 (원본 행 번호 포함)
+        export_format = request.POST.get('format', 'xlsx').lower()
+        changed_only = request.POST.get('changedOnly', '').lower() in ('true', '1')
+        if export_format not in ('xlsx', 'csv'):
+            return JsonResponse({'error': f'지원하지 않는 형식입니다: {export_format}'}, status=400)
+        
+        base_name = original_filename.rsplit('.', 1)[0] if '.' in original_filename else original_filename
+        
+        # 같은 파일 + 수정 내용 + 옵션이면 결과도 같으므로 ETag 재검증(304) 또는 캐시에서 응답
+        cache_key = ExportCache.make_key(excel_file, modifications, export_format, changed_only)
+        etag = ExportCache.etag(cache_key)
+        if ExportCache.matches(request, cache_key):
+            logger.info("내보내기 결과 변경 없음 (304)")
+            response = HttpResponseNotModified()
+            response['ETag'] = etag
+            return response
+        
+        cached = ExportCache.get(cache_key)
+        if cached is not None:
+            file_content, content_type = cached
+            new_filename = _export_filename(base_name, export_format, changed_only)
+            response = HttpResponse(file_content, content_type=content_type)
+            response['Content-Disposition'] = f'attachment; filename="{new_filename}"'
+            response['Content-Length'] = len(file_content)
+            response['ETag'] = etag
+            logger.info(f"내보내기 캐시 사용: {new_filename}")
+            return response
+        
+        if export_format == 'csv' or changed_only:
+            response = _fast_export_response(
+                excel_file, modifications, base_name, export_format, changed_only, cache_key=cache_key)
+            response['ETag'] = etag
+            return response
+        
         with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as temp_file:
             temp_file_path = temp_file.name
             for chunk in excel_file.chunks():
@@ -664,7 +1733,8 @@ def download_excel(request):
         logger.info(f"임시 파일 생성: {temp_file_path}")
         
         try:
-            workbook = openpyxl.load_workbook(temp_file_path)
+            with stage('parse'):
+                workbook = openpyxl.load_workbook(temp_file_path)
             worksheet = workbook.worksheets[0]
             logger.info(f"워크북 로드 성공")
         except Exception as e:
@@ -677,78 +1747,8 @@ def download_excel(request):
         logger.info("새 워크시트 생성 - A~F열 추가")
         
         mod_dict = {int(mod['excelRow']): mod for mod in modifications}
-        
-        for row_idx, row in enumerate(worksheet.iter_rows(), 1):
-            new_row = []
-            price_info = None
-            tcg999_not_found = False
-            
-            if row_idx == 1:
-                new_row.extend(["변동액", "기존가격", "카드타입", "필터적용", "검색개수", "검색어"])
-                for cell in row:
-                    new_row.append(cell.value)
-            else:
-                new_row.extend([0, 0, "", "", 0, ""])
-                
-                if row_idx in mod_dict:
-                    mod = mod_dict[row_idx]
-                    product_name = mod.get('productName', '')
-                    
-                    original_price_cell = worksheet.cell(row=row_idx, column=6)
-                    original_price = float(original_price_cell.value) if original_price_cell.value else 0
-                    new_price = float(mod.get('price', original_price))
-                    price_diff = int(new_price - original_price)
-                    
-                    search_name, card_type, pokemon_info = CardGamePatternExtractor.extract_search_info(product_name)
-                    
-                    filter_info = mod.get('filterInfo', "")
-                    
-                    # filterInfo가 "필터없음"이면 TCG999가 없는 것으로 판단
-                    if card_type == "포켓몬" and filter_info == "필터없음":
-                        tcg999_not_found = True
-                        logger.info(f"행 {row_idx}: 타입={card_type}, 필터={filter_info} → 보라색 표시 대상")
-                    else:
-                        logger.info(f"행 {row_idx}: 타입={card_type}, 필터={filter_info}")
-                    
-                    new_row[0] = price_diff
-                    new_row[1] = int(original_price)
-                    new_row[2] = card_type or "미확인"
-                    new_row[3] = filter_info
-                    new_row[4] = mod.get('validCount', 0)
-                    new_row[5] = search_name or ""
-                    
-                    price_info = (original_price, new_price, tcg999_not_found)
-                
-                for cell in row:
-                    if row_idx in mod_dict:
-                        mod = mod_dict[row_idx]
-                        if cell.column == 6:
-                            new_row.append(float(mod.get('price', cell.value or 0)))
-                        elif cell.column == 8:
-                            new_row.append(int(float(mod.get('stock', cell.value or 0))))
-                        else:
-                            new_row.append(cell.value)
-                    else:
-                        new_row.append(cell.value)
-            
-            new_worksheet.append(new_row)
-            
-            if price_info is not None and row_idx > 1:
-                price_cell = new_worksheet.cell(row=row_idx, column=12)
-                
-                if price_info[2]:  # tcg999_not_found
-                    logger.info(f"  → 보라색 적용: 행 {row_idx}")
-                    price_cell.fill = COLOR_FILLS['purple']
-                else:
-                    fill_color = PriceProcessor.get_fill_color(price_info[0], price_info[1])
-                    price_cell.fill = fill_color
-        
-        for i, (color_name, range_text, fill_color) in enumerate(COLOR_LEGEND_MAIN, 2):
-            new_worksheet.cell(row=i, column=1, value=color_name).fill = fill_color
-            new_worksheet.cell(row=i, column=2, value=range_text)
-        
-        new_worksheet.cell(row=2, column=3, value="보라색").fill = COLOR_FILLS['purple']
-        new_worksheet.cell(row=2, column=4, value="TCG999 없음")
+        with stage('build'):
+            ExcelExporter.build_modified_worksheet(worksheet, new_worksheet, mod_dict)
         
         logger.info("색상 범례 추가 완료")
         
@@ -756,7 +1756,8 @@ def download_excel(request):
             output_temp_path = output_temp.name
         
         try:
-            new_workbook.save(output_temp_path)
+            with stage('save'):
+                new_workbook.save(output_temp_path)
             logger.info("새 워크북 저장 완료")
         except Exception as e:
             logger.error(f"워크북 저장 실패: {str(e)}")
@@ -774,15 +1775,13 @@ def download_excel(request):
         with open(output_temp_path, 'rb') as f:
             file_content = f.read()
         
-        base_name = original_filename.rsplit('.', 1)[0] if '.' in original_filename else original_filename
-        new_filename = f"{base_name}_TCG999특가.xlsx"
+        new_filename = _export_filename(base_name, export_format, changed_only)
+        ExportCache.set(cache_key, file_content, XLSX_CONTENT_TYPE)
         
-        response = HttpResponse(
-            file_content,
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
+        response = HttpResponse(file_content, content_type=XLSX_CONTENT_TYPE)
         response['Content-Disposition'] = f'attachment; filename="{new_filename}"'
         response['Content-Length'] = len(file_content)
+        response['ETag'] = etag
         
         logger.info("=" * 50)
         logger.info("Excel 파일 처리 완료 (TCG999 모드)")
@@ -807,4 +1806,184 @@ def download_excel(request):
                     os.unlink(file_path)
                     logger.info(f"{desc} 임시 파일 삭제: {file_path}")
                 except Exception as e:
-                    logger.warning(f"{desc} 임시 파일 삭제 실패: {e}")
\ No newline at end of file
+                    logger.warning(f"{desc} 임시 파일 삭제 실패: {e}")
+
+
+# search_prices_batch zip에 함께 넣는 가격 오류 행 목록 (가격이 숫자가 아닌 행이 있을 때만)
+INVALID_PRICE_REPORT = "가격오류행.csv"
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def search_prices_batch(request):
+    """Reprice several workbooks (all sheets) at once - TCG999 Mode
+    
+    여러 파일/시트의 검색어를 모아 중복 제거 후 한 번씩만 조회하고,
+    입력 파일마다 결과 워크북을 만들어 zip으로 반환
+    """
+    excel_files = request.FILES.getlist('files')
+    if not excel_files:
+        return JsonResponse({'error': '파일이 제공되지 않았습니다'}, status=400)
+    
+    invalid = [f.name for f in excel_files if not f.name.lower().endswith('.xlsx')]
+    if invalid:
+        return JsonResponse({'error': f'xlsx 파일만 지원합니다: {", ".join(invalid)}'}, status=400)
+    
+    try:
+        logger.info("=" * 50)
+        logger.info(f"다중 파일 가격 검색 시작 (TCG999 모드) - {len(excel_files)}개 파일")
+        logger.info("=" * 50)
+        
+        # 1) 모든 파일/시트의 상품 행 수집 - 가격 변환은 upload_excel과 같은 UploadReader.build_rows
+        #    가격이 숫자가 아닌 행은 가격을 바꾸지 않고 (파일, 시트, 행, 값)을 zip의 INVALID_PRICE_REPORT에 기록
+        workbooks = []
+        sheet_rows = {}
+        invalid_prices = []
+        for file_idx, excel_file in enumerate(excel_files):
+            with stage('parse'):
+                workbook = openpyxl.load_workbook(excel_file)
+            workbooks.append((excel_file.name, workbook))
+            for sheet_idx, worksheet in enumerate(workbook.worksheets):
+                row_numbers = range(DATA_START_ROW, worksheet.max_row + 1)
+                product_names = [worksheet.cell(row=row_idx, column=PRODUCT_NAME_COLUMN + 1).value
+                                 for row_idx in row_numbers]
+                prices = [worksheet.cell(row=row_idx, column=PRICE_COLUMN + 1).value for row_idx in row_numbers]
+                data_rows, invalid_price_rows = UploadReader.build_rows(row_numbers, product_names, prices)
+                
+                invalid_set = set(invalid_price_rows)
+                for row_idx in invalid_price_rows:
+                    raw_price = prices[row_idx - DATA_START_ROW]
+                    logger.warning(f"가격이 숫자가 아님 - {excel_file.name} [{worksheet.title}] {row_idx}행: {raw_price!r}")
+                    invalid_prices.append((excel_file.name, worksheet.title, row_idx, raw_price))
+                sheet_rows[(file_idx, sheet_idx)] = [
+                    (row['excelRow'], row['productName'], row['price'] if row['price'] is not None else 0.0)
+                    for row in data_rows
+                    if row['productName'] is not None and row['excelRow'] not in invalid_set
+                ]
+        
+        # 2) 검색어 중복 제거 - 여러 파일에 같은 카드가 있어도 한 번만 조회
+        keywords = set()
+        total_rows = 0
+        for rows in sheet_rows.values():
+            total_rows += len(rows)
+            with stage('extract'):
+                for _, product_name, _ in rows:
+                    search_name, _, _ = CardGamePatternExtractor.extract_search_info(product_name)
+                    if search_name:
+                        keywords.add(search_name)
+        
+        logger.info(f"전체 {total_rows}개 행 → 고유 검색어 {len(keywords)}개")
+        
+        # 캐시에 있는 검색어는 호출하지 않으므로 할당량 계산에서 제외
+        remaining_quota = naver_rate_limiter.remaining_today()
+        required_quota = SearchResultCache.uncached_count(keywords)
+        if remaining_quota < required_quota:
+            retry_after = seconds_until_quota_reset()
+            response = JsonResponse({
+                'error': 'Naver API daily quota nearly exhausted',
+                'remainingQuota': remaining_quota,
+                'requiredQuota': required_quota,
+                'retryAfter': retry_after
+            }, status=429)
+            response['Retry-After'] = str(retry_after)
+            return response
+        
+        # 검색어별 1회씩 동시 조회 (실패도 기억해서 재호출하지 않음)
+        fetched = NaverShoppingAPI.prefetch(sorted(keywords))
+        search_once = NaverShoppingAPI.prefetched(fetched)
+        
+        # 3) 행별 가격 계산 후 입력 파일마다 결과 워크북 작성
+        zip_buffer = BytesIO()
+        used_names = set()
+        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+            for file_idx, (filename, workbook) in enumerate(workbooks):
+                new_workbook = openpyxl.Workbook()
+                new_workbook.remove(new_workbook.active)
+                
+                for sheet_idx, worksheet in enumerate(workbook.worksheets):
+                    # 시트 전체를 먼저 조회한 뒤 가격은 한 번에 계산
+                    mod_dict = {}
+                    looked_up = []
+                    for row_idx, product_name, price in sheet_rows[(file_idx, sheet_idx)]:
+                        try:
+                            lookup = PriceProcessor.lookup_min_price(product_name, search=search_once)
+                        except (NaverAPIError, QuotaExceeded) as e:
+                            logger.error(f"API 조회 실패 ({product_name}): {str(e)}")
+                            mod_dict[row_idx] = {
+                                'productName': product_name,
+                                'price': price,
+                                'filterInfo': '조회실패',
+                                'validCount': 0
+                            }
+                            continue
+                        looked_up.append((row_idx, (product_name, price, lookup)))
+                    
+                    PriceProcessor.expire_unusable(lookup for _, (_, _, lookup) in looked_up)
+                    priced = PriceProcessor.price_lookups([row for _, row in looked_up])
+                    for (row_idx, (product_name, _, _)), (new_price, _, _, filter_info, _, valid_count) in zip(looked_up, priced):
+                        mod_dict[row_idx] = {
+                            'productName': product_name,
+                            'price': new_price,
+                            'filterInfo': filter_info,
+                            'validCount': valid_count
+                        }
+                    
+                    new_worksheet = new_workbook.create_sheet(title=worksheet.title)
+                    with stage('build'):
+                        ExcelExporter.build_modified_worksheet(worksheet, new_worksheet, mod_dict)
+                
+                base_name = filename.rsplit('.', 1)[0] if '.' in filename else filename
+                output_name = f"{base_name}_TCG999특가.xlsx"
+                suffix = 2
+                while output_name in used_names:
+                    output_name = f"{base_name}_TCG999특가_{suffix}.xlsx"
+                    suffix += 1
+                used_names.add(output_name)
+                
+                output = BytesIO()
+                with stage('save'):
+                    new_workbook.save(output)
+                new_workbook.close()
+                workbook.close()
+                zip_file.writestr(output_name, output.getvalue())
+                logger.info(f"결과 파일 작성: {output_name}")
+            
+            if invalid_prices:
+                report = io.StringIO()
+                writer = csv.writer(report)
+                writer.writerow(["파일", "시트", "행", "가격"])
+                writer.writerows(invalid_prices)
+                zip_file.writestr(INVALID_PRICE_REPORT, '\ufeff' + report.getvalue())
+        
+        file_content = zip_buffer.getvalue()
+        response = HttpResponse(file_content, content_type='application/zip')
+        response['Content-Disposition'] = 'attachment; filename="TCG999특가.zip"'
+        response['Content-Length'] = len(file_content)
+        response['X-Total-Rows'] = str(total_rows)
+        response['X-Unique-Searches'] = str(len(keywords))
+        response['X-Invalid-Price-Count'] = str(len(invalid_prices))
+        
+        logger.info("=" * 50)
+        logger.info(f"다중 파일 처리 완료 - 파일 {len(workbooks)}개, 행 {total_rows}개, 조회 {len(fetched)}회")
+        logger.info("=" * 50)
+        
+        return response
+    
+    except Exception as e:
+        logger.error(f"다중 파일 처리 중 오류: {str(e)}")
+        import traceback
+        logger.error(f"스택 트레이스:\n{traceback.format_exc()}")
+        return JsonResponse({'error': f'처리 중 오류가 발생했습니다: {str(e)}'}, status=500)
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def naver_metrics(request):
+    """네이버 API 호출 상태 - 동시 호출 한도/관측 지연 시간(이 워커 프로세스 기준), 서킷 브레이커, 일일 할당량"""
+    return Response({
+        'concurrency': naver_concurrency_limiter.snapshot(),
+        'circuitRetryAfter': round(naver_circuit_breaker.retry_after(), 1),
+        'usedToday': naver_rate_limiter.used_today(),
+        'remainingQuota': naver_rate_limiter.remaining_today(),
+        'pid': os.getpid()
+    }, status=status.HTTP_200_OK)
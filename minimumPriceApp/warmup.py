@@ -0,0 +1,82 @@
+"""
+Worker warm-up for gunicorn preload mode (gunicorn.conf.py)
+Loads the lazily imported heavy modules and builds the regex / Pokemon name
+matcher caches once in the master so forked workers share them copy-on-write
+"""
+
+import importlib
+import logging
+import time
+
+from django.conf import settings
+from django.db import connections
+
+HEAVY_MODULES = ('numpy', 'pandas', 'openpyxl', 'openpyxl.cell', 'openpyxl.styles')
+
+# extract_search_info / ItemFilter의 분기를 모두 거쳐 re 모듈 패턴 캐시를 채우는 상품명
+SAMPLE_PRODUCT_NAMES = (
+    "원피스 OP01-001 SR",
+    "원피스 망가 OP05-119",
+    "원피스 SP-SR OP02-013",
+    "원피스 P-SR OP03-070",
+    "원피스 P-001",
+    "원피스 SR ST01-012",
+    "디지몬카드 BT15-102 희소",
+    "디지몬카드 ST17-01 패러렐",
+    "디지몬카드 P-001",
+    "포켓몬카드 피카츄 ex SAR 001",
+    "포켓몬카드 리자몽 VMAX HR 002",
+    "포켓몬카드 아르세우스 VSTAR UR 003",
+    "포켓몬카드 뮤츠 V SR 004",
+    "포켓몬카드 이브이 특일 005",
+    "포켓몬 P-001",
+)
+
+SAMPLE_ITEMS = [
+    {'title': '<b>포켓몬카드</b> 피카츄 ex SAR 슈퍼 패러렐 스페셜 희소 특일', 'lprice': '1000', 'mallName': 'TCG999'},
+    {'title': 'OP01-001 BT15-102 ST17-01 패러렐', 'lprice': '2000', 'mallName': '카드샵'},
+]
+
+
+def warm_pokemon_matchers(limit):
+    """최근 배치에서 자주 조회된 포켓몬 검색어의 포켓몬명 매처 미리 생성"""
+    from .search_cache import SearchResultCache
+    from .views import CardGamePatternExtractor, PokemonNameMatcher
+    
+    built = 0
+    for keyword in SearchResultCache.hot_keywords(limit=limit):
+        _, _, pokemon_name = CardGamePatternExtractor.extract_pokemon_info(keyword)
+        if pokemon_name:
+            PokemonNameMatcher.for_name(pokemon_name)
+            built += 1
+    return built
+
+
+def warm_up():
+    """무거운 모듈 로드 + 패턴/매처 캐시 생성 (fork 전 마스터에서 1회)"""
+    started = time.perf_counter()
+    
+    for module_name in HEAVY_MODULES:
+        importlib.import_module(module_name)
+    
+    from .views import COLOR_FILLS, COLOR_LEGEND_MAIN, CardGamePatternExtractor, ItemFilter
+    
+    # SimpleLazyObject 평가 (색상 PatternFill 생성)
+    COLOR_FILLS['none']
+    len(COLOR_LEGEND_MAIN)
+    
+    for product_name in SAMPLE_PRODUCT_NAMES:
+        search_name, card_type, pokemon_info = CardGamePatternExtractor.extract_search_info(product_name)
+        if search_name:
+            ItemFilter.filter_api_results_tcg999(SAMPLE_ITEMS, search_name, card_type, pokemon_info)
+    
+    try:
+        matchers = warm_pokemon_matchers(settings.PRELOAD_POKEMON_MATCHERS)
+    except Exception as e:
+        logging.warning(f"포켓몬 매처 예열 실패 (무시): {e}")
+        matchers = 0
+    finally:
+        # 마스터의 DB 연결을 워커가 물려받지 않도록 닫음
+        connections.close_all()
+    
+    logging.info(f"워커 예열 완료 - 포켓몬 매처 {matchers}개, {time.perf_counter() - started:.2f}초")
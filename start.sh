@@ -1,3 +1,27 @@
 cd /home/ubuntu/storemanagement_back
 source venv/bin/activate
-gunicorn --bind 0.0.0.0:8000 --workers 3 --timeout 1200 --graceful-timeout 1200 storeManagement.wsgi:application
+# ./start.sh --preload : 마스터에서 앱/무거운 모듈을 미리 로드하고 워커와 공유 (gunicorn.conf.py)
+# ./start.sh --no-celery : Celery 워커/beat 없이 gunicorn만 실행
+#   이 경우 검색 캐시의 stale 항목은 백그라운드 갱신이 되지 않아 NAVER_SEARCH_STALE_TTL만큼 긴 TTL과 같고,
+#   새벽 캐시 예열과 청크 분산(SEARCH_PRICES_FANOUT_ENABLED)도 동작하지 않음
+START_CELERY=True
+for arg in "$@"; do
+    case "$arg" in
+        --preload) export GUNICORN_PRELOAD=True ;;
+        --no-celery) START_CELERY=False ;;
+    esac
+done
+
+if [ "$START_CELERY" = "True" ]; then
+    mkdir -p logs
+    # 기본 큐 + 게임별 큐(REPRICING_GAME_QUEUES_ENABLED)를 모두 처리하는 워커 1개, 스케줄러(beat) 1개
+    celery -A storeManagement worker -Q celery,repricing_pokemon,repricing_onepiece,repricing_digimon \
+        --loglevel=info --logfile=logs/celery_worker.log &
+    CELERY_WORKER_PID=$!
+    celery -A storeManagement beat --loglevel=info --logfile=logs/celery_beat.log \
+        --schedule=logs/celerybeat-schedule &
+    CELERY_BEAT_PID=$!
+    trap 'kill $CELERY_WORKER_PID $CELERY_BEAT_PID 2>/dev/null' EXIT
+fi
+
+gunicorn -c gunicorn.conf.py storeManagement.wsgi:application
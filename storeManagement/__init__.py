@@ -1,4 +1,4 @@
 # Celery 앱이 Django 시작 시 로드되도록
-# from .celery import app as celery_app
+from .celery import app as celery_app
 
-# __all__ = ('celery_app',)
\ No newline at end of file
+__all__ = ('celery_app',)
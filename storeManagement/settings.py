@@ -10,7 +10,9 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 import os
+import sys
 from pathlib import Path
+from celery.schedules import crontab
 from . import local_setting
 from dotenv import load_dotenv
 
@@ -57,7 +59,9 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
+    'minimumPriceApp.middleware.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'minimumPriceApp.middleware.ResponseCompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -141,7 +145,12 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.DjangoModelPermissionsOrAnonReadOnly'
     ],
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'minimumPriceApp.renderers.FastJSONRenderer',  # orjson 사용 (미설치 시 표준 json)
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'minimumPriceApp.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
@@ -190,12 +199,21 @@ CORS_ALLOW_HEADERS = [
     'authorization',
     'content-type',
     'dnt',
+    'if-none-match',
     'origin',
     'user-agent',
     'x-csrftoken',
+    'x-profile-request',
     'x-requested-with',
 ]
 
+# 브라우저에서 읽을 수 있는 응답 헤더 (내보내기 재검증용 ETag, 단계별 처리 시간, 요청 프로파일 파일 이름)
+CORS_EXPOSE_HEADERS = [
+    'etag',
+    'server-timing',
+    'x-profile-id',
+]
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 # 콘솔창에서 SQL 쿼리 보기
@@ -259,12 +277,200 @@ if not os.path.exists(LOGS_DIR):
 
 # celery 설정
 # Celery 설정
-CELERY_BROKER_URL = 'redis://localhost:6379/0'
-CELERY_RESULT_BACKEND = 'redis://localhost:6379/0'
+CELERY_BROKER_URL = os.environ.get('CELERY_BROKER_URL', 'redis://localhost:6379/0')
+CELERY_RESULT_BACKEND = os.environ.get('CELERY_RESULT_BACKEND', 'redis://localhost:6379/0')
 CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'Asia/Seoul' 
 
 # 선택사항: 작업 결과 만료 시간 (초)
-CELERY_RESULT_EXPIRES = 7200
\ No newline at end of file
+CELERY_RESULT_EXPIRES = 7200
+
+# 워커 프로세스 수 (celery -A storeManagement worker 실행 시 적용)
+CELERY_WORKER_CONCURRENCY = int(os.environ.get('CELERY_WORKER_CONCURRENCY', '4'))
+
+# 테스트용: 브로커 없이 즉시 실행 (CELERY_BROKER_URL='memory://', CELERY_RESULT_BACKEND='cache+memory://'와 함께 사용)
+CELERY_TASK_ALWAYS_EAGER = os.environ.get('CELERY_TASK_ALWAYS_EAGER', 'False') == 'True'
+CELERY_TASK_EAGER_PROPAGATES = True
+
+# python manage.py test - Redis/브로커 없이 실행
+TESTING = len(sys.argv) > 1 and sys.argv[1] == 'test'
+if TESTING:
+    CELERY_BROKER_URL = 'memory://'
+    CELERY_RESULT_BACKEND = 'cache+memory://'
+    CELERY_TASK_ALWAYS_EAGER = True
+
+# search_prices 청크 분산 처리 (Celery group/chord)
+# 활성화 시 SEARCH_PRICES_CHUNK_SIZE개를 넘는 배치는 청크 단위 태스크로 나눠 여러 워커에서 처리
+SEARCH_PRICES_FANOUT_ENABLED = os.environ.get('SEARCH_PRICES_FANOUT_ENABLED', 'False') == 'True'
+SEARCH_PRICES_CHUNK_SIZE = int(os.environ.get('SEARCH_PRICES_CHUNK_SIZE', '500'))
+SEARCH_PRICES_FANOUT_TIMEOUT = 1200
+
+# 네이버 API 호출 제한 - 모든 gunicorn/Celery 워커가 Redis로 공유
+# Redis 연결 불가 시 워커별 로컬 제한(NAVER_LOCAL_RATE_LIMIT_PER_SECOND)으로 동작
+NAVER_REDIS_URL = os.environ.get('NAVER_REDIS_URL', '' if TESTING else 'redis://localhost:6379/1')
+NAVER_RATE_LIMIT_PER_SECOND = float(os.environ.get('NAVER_RATE_LIMIT_PER_SECOND', '8'))
+NAVER_LOCAL_RATE_LIMIT_PER_SECOND = float(os.environ.get('NAVER_LOCAL_RATE_LIMIT_PER_SECOND', '3.3'))  # 기존 0.3초 간격
+NAVER_RATE_LIMIT_BURST = int(os.environ.get('NAVER_RATE_LIMIT_BURST', '3'))
+
+# 일일 할당량 (네이버 검색 API 기본 25,000회, 자정에 초기화)
+# 남은 호출 수가 배치 크기보다 적으면 search_prices는 429로 바로 실패
+NAVER_DAILY_QUOTA = int(os.environ.get('NAVER_DAILY_QUOTA', '25000'))
+NAVER_DAILY_QUOTA_RESERVE = int(os.environ.get('NAVER_DAILY_QUOTA_RESERVE', '500'))
+
+# 동일 검색어 동시 요청 합치기 - True면 Redis 락으로 워커 간에도 한 번만 호출
+NAVER_SINGLE_FLIGHT_SHARED = os.environ.get('NAVER_SINGLE_FLIGHT_SHARED', 'True') == 'True'
+NAVER_SINGLE_FLIGHT_TIMEOUT = 30
+
+# 네이버 API 오류 처리
+# 429/5xx/시간초과는 지수 백오프로 재시도, 최근 오류율이 기준을 넘으면 서킷 브레이커가 호출을 일시 차단
+NAVER_API_TIMEOUT = 10
+NAVER_RETRY_MAX_ATTEMPTS = int(os.environ.get('NAVER_RETRY_MAX_ATTEMPTS', '3'))
+NAVER_RETRY_BASE_DELAY = 0.5
+NAVER_RETRY_MAX_DELAY = 8
+NAVER_CIRCUIT_WINDOW = 60           # 오류율 집계 구간 (초)
+NAVER_CIRCUIT_MIN_CALLS = 10        # 최소 호출 수
+NAVER_CIRCUIT_ERROR_RATE = 0.5      # 이 비율 이상 실패 시 열림
+NAVER_CIRCUIT_COOLDOWN = 30         # 열린 뒤 시험 호출까지 대기 (초)
+NAVER_CIRCUIT_MAX_PAUSE = 120       # 배치당 최대 일시 정지 (초) - 초과 시 남은 행은 fetch_failed
+
+# 네이버 API 동시 호출 수 (워커 프로세스 단위, AIMD)
+# 응답이 NAVER_CONCURRENCY_LATENCY_TARGET초 이내면 한도를 조금씩 늘리고, 429/시간 초과 시 BACKOFF배로 줄임
+# NAVER_CONCURRENCY_MAX는 절대 넘지 않는 상한 - search_prices는 이 개수 단위로 검색어를 동시 조회
+NAVER_CONCURRENCY_INITIAL = int(os.environ.get('NAVER_CONCURRENCY_INITIAL', '2'))
+NAVER_CONCURRENCY_MIN = 1
+NAVER_CONCURRENCY_MAX = int(os.environ.get('NAVER_CONCURRENCY_MAX', '8'))
+NAVER_CONCURRENCY_LATENCY_TARGET = float(os.environ.get('NAVER_CONCURRENCY_LATENCY_TARGET', '1.5'))
+NAVER_CONCURRENCY_BACKOFF = 0.5
+
+# search_prices 작업 체크포인트 보관 기간 (일) - 같은 목록 재요청 시 완료된 행은 다시 조회하지 않음
+REPRICING_JOB_RETENTION_DAYS = 7
+
+# search_prices 처리 순서 - 기대 가치(현재가 × 카드게임 가중치 × 마지막 조회 후 경과 시간) 높은 행부터
+REPRICING_GAME_WEIGHTS = {
+    '포켓몬': 1.0,
+    '원피스': 1.0,
+    '디지몬': 1.0,
+}
+REPRICING_STALENESS_HOURS = 24  # 이 시간마다 경과 가중치 +1
+REPRICING_STALENESS_CAP = 3     # 경과 가중치 상한 (한 번도 조회 안 한 검색어)
+# 기본 시간 예산 (초) - None이면 제한 없음, 요청의 timeBudget이 우선
+REPRICING_DEFAULT_TIME_BUDGET = None
+
+# 카드게임별 작업 큐 - 포켓몬 대량 배치가 원피스/디지몬 갱신을 막지 않도록 게임별로 따로 처리
+# 청크 분산 시 REPRICING_GAME_QUEUES_ENABLED=True면 게임별 Celery 큐로 보냄 (큐마다 워커 필요)
+#   예) celery -A storeManagement worker -Q repricing_pokemon -c 2
+#       celery -A storeManagement worker -Q repricing_onepiece,repricing_digimon,celery -c 2
+# 꺼져 있으면 기본 큐에 게임별 청크를 번갈아 넣음
+REPRICING_GAME_QUEUES_ENABLED = os.environ.get('REPRICING_GAME_QUEUES_ENABLED', 'False') == 'True'
+REPRICING_GAME_QUEUES = {
+    '포켓몬': 'repricing_pokemon',
+    '원피스': 'repricing_onepiece',
+    '디지몬': 'repricing_digimon',
+}
+REPRICING_DEFAULT_QUEUE = 'celery'
+# 카드게임별 동시 처리 시 요청 스레드가 레인의 체크포인트 행을 저장하고 취소 여부를 확인하는 간격(초)
+REPRICING_LANE_POLL_INTERVAL = 0.5
+# 게임별 동시 조회 검색어 수 (NAVER_CONCURRENCY_MAX 이하로 적용)
+REPRICING_GAME_CONCURRENCY = {
+    '포켓몬': int(os.environ.get('REPRICING_POKEMON_CONCURRENCY', '4')),
+    '원피스': int(os.environ.get('REPRICING_ONEPIECE_CONCURRENCY', '4')),
+    '디지몬': int(os.environ.get('REPRICING_DIGIMON_CONCURRENCY', '2')),
+}
+# 게임별 최대 호출 속도 비율 (NAVER_RATE_LIMIT_PER_SECOND 대비) - 합이 1을 넘으면 쉬는 게임 몫을 나눠 씀
+NAVER_RATE_SHARES = {
+    '포켓몬': float(os.environ.get('NAVER_RATE_SHARE_POKEMON', '0.6')),
+    '원피스': float(os.environ.get('NAVER_RATE_SHARE_ONEPIECE', '0.6')),
+    '디지몬': float(os.environ.get('NAVER_RATE_SHARE_DIGIMON', '0.4')),
+}
+
+# 네이버 검색 결과 캐시 - 기본은 파일 캐시(같은 서버의 모든 워커 공유)
+# NAVER_SEARCH_CACHE_URL(redis://...) 설정 시 여러 서버가 Redis 캐시를 공유
+NAVER_SEARCH_CACHE_URL = os.environ.get('NAVER_SEARCH_CACHE_URL')
+NAVER_SEARCH_CACHE_TTL = int(os.environ.get('NAVER_SEARCH_CACHE_TTL', str(12 * 3600)))
+# 결과 없음(빈 items)이나 쓸 수 있는 가격이 없는 결과(TCG999 없음 등)는 짧게 저장 - 새 상품 등록을 빨리 반영
+NAVER_SEARCH_NEGATIVE_TTL = int(os.environ.get('NAVER_SEARCH_NEGATIVE_TTL', str(3600)))
+# 신선 기간이 지난 뒤에도 이 기간 동안은 기존 결과를 바로 쓰고 백그라운드(Celery)에서 갱신
+# Celery 워커가 없으면(start.sh --no-celery) 갱신되지 않으므로 TTL이 이만큼 늘어난 것과 같음
+NAVER_SEARCH_STALE_TTL = int(os.environ.get('NAVER_SEARCH_STALE_TTL', str(6 * 3600)))
+NAVER_SEARCH_REFRESH_LOCK_TTL = 60
+# 만료 시각 분산 비율 (0.1 = TTL ±10%) - 같은 배치에서 저장된 항목이 한꺼번에 만료되지 않게 함
+NAVER_SEARCH_CACHE_TTL_JITTER = float(os.environ.get('NAVER_SEARCH_CACHE_TTL_JITTER', '0.1'))
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'naver_search': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': NAVER_SEARCH_CACHE_URL,
+    } if NAVER_SEARCH_CACHE_URL else {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache', 'naver_search'),
+        'OPTIONS': {'MAX_ENTRIES': 100000},
+    },
+    'exports': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache', 'exports'),
+        'OPTIONS': {'MAX_ENTRIES': int(os.environ.get('EXPORT_CACHE_MAX_ENTRIES', '200'))},
+    },
+}
+if TESTING:
+    CACHES = {alias: {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': alias}
+              for alias in CACHES}
+
+# download_excel 결과 캐시 - (입력 파일, modifications, 형식 옵션) 해시 기준, ETag/If-None-Match 지원
+# 디스크 사용량은 MAX_ENTRIES × EXPORT_CACHE_MAX_BYTES 이내
+EXPORT_CACHE_ENABLED = os.environ.get('EXPORT_CACHE_ENABLED', 'True') == 'True'
+EXPORT_CACHE_TTL = 60 * 60 * 24
+EXPORT_CACHE_MAX_BYTES = int(os.environ.get('EXPORT_CACHE_MAX_BYTES', str(20 * 1024 * 1024)))
+
+# 인기 검색어 캐시 예열 (celery -A storeManagement beat 실행 필요)
+# 최근 NAVER_CACHE_WARMUP_LOOKBACK_DAYS일 배치에서 많이 조회된 검색어를 새벽에 미리 조회
+NAVER_CACHE_WARMUP_LOOKBACK_DAYS = 7
+NAVER_CACHE_WARMUP_QUOTA_SHARE = float(os.environ.get('NAVER_CACHE_WARMUP_QUOTA_SHARE', '0.3'))
+NAVER_CACHE_WARMUP_HOUR = int(os.environ.get('NAVER_CACHE_WARMUP_HOUR', '5'))
+
+CELERY_BEAT_SCHEDULE = {
+    'warm-search-cache': {
+        'task': 'minimumPriceApp.tasks.warm_search_cache',
+        'schedule': crontab(hour=NAVER_CACHE_WARMUP_HOUR, minute=0),
+    },
+}
+
+# upload_excel CSV/Parquet 입력
+# Parquet 상품명/가격 열 이름 - 비워두면 시트와 같은 열 위치(D열/F열) 사용
+PARQUET_PRODUCT_NAME_FIELD = os.environ.get('PARQUET_PRODUCT_NAME_FIELD')
+PARQUET_PRICE_FIELD = os.environ.get('PARQUET_PRICE_FIELD')
+UPLOAD_BATCH_ROWS = 10000
+
+# search_prices 가격 일괄 계산 단위 - 조회가 끝난 행을 이 개수만큼 모아 NumPy로 계산 후 체크포인트
+# (작업이 중단되면 최대 이 개수만큼의 조회 결과를 다시 가져옴)
+PRICE_FLUSH_ROWS = 20
+
+# API 응답 압축 (minimumPriceApp.middleware) - Brotli(설치 시) 우선, 아니면 gzip
+# 작은 응답은 압축 이득보다 CPU 비용이 커서 RESPONSE_COMPRESSION_MIN_BYTES 이상만 압축
+# 레벨은 압축률보다 처리량 우선 (gzip 1~9, brotli 0~11)
+RESPONSE_COMPRESSION_ENABLED = os.environ.get('RESPONSE_COMPRESSION_ENABLED', 'True') == 'True'
+RESPONSE_COMPRESSION_MIN_BYTES = int(os.environ.get('RESPONSE_COMPRESSION_MIN_BYTES', '1024'))
+RESPONSE_GZIP_LEVEL = int(os.environ.get('RESPONSE_GZIP_LEVEL', '5'))
+RESPONSE_BROTLI_QUALITY = int(os.environ.get('RESPONSE_BROTLI_QUALITY', '4'))
+
+# 워커 부팅 - URLconf import 시간 예산(초), python manage.py check_import_time 으로 확인
+URLCONF_IMPORT_BUDGET = float(os.environ.get('URLCONF_IMPORT_BUDGET', '0.3'))
+# gunicorn preload 모드에서 마스터가 미리 만들 포켓몬명 매처 수 (최근 인기 검색어 기준)
+PRELOAD_POKEMON_MATCHERS = int(os.environ.get('PRELOAD_POKEMON_MATCHERS', '2000'))
+
+# 요청 프로파일링 (minimumPriceApp.profiling.profile_request) - cProfile + tracemalloc 결과를 logs/profiles에 저장
+# REQUEST_PROFILING_ENABLED=True면 모든 대상 요청, 아니면 X-Profile-Request 헤더가 토큰과 같을 때만 (토큰이 비어 있으면 헤더 무시)
+REQUEST_PROFILING_ENABLED = os.environ.get('REQUEST_PROFILING_ENABLED', 'False') == 'True'
+REQUEST_PROFILING_TOKEN = os.environ.get('REQUEST_PROFILING_TOKEN', '')
+REQUEST_PROFILE_DIR = os.path.join(LOGS_DIR, 'profiles')
+REQUEST_PROFILE_TOP_FUNCTIONS = 40
+REQUEST_PROFILE_TOP_ALLOCATIONS = 25
+REQUEST_PROFILE_TRACE_FRAMES = 1
+
+# 단계별 처리 시간 Server-Timing 헤더 (minimumPriceApp.middleware.ServerTimingMiddleware)
+SERVER_TIMING_ENABLED = os.environ.get('SERVER_TIMING_ENABLED', 'True') == 'True'
+SERVER_TIMING_ALLOW_ORIGIN = os.environ.get('SERVER_TIMING_ALLOW_ORIGIN', '*')
@@ -1,23 +1,29 @@
 from django.contrib import admin
 from django.urls import include, path
 # from minimumPriceApp.views import upload_excel, search_prices, download_excel, get_job_progress
-from minimumPriceApp.views import upload_excel, search_prices, download_excel
+from minimumPriceApp.views import upload_excel, search_prices, download_excel, search_prices_batch, naver_metrics, cancel_search_prices
 from rest_framework import routers
 from rest_framework.routers import DefaultRouter
-from drf_yasg import openapi
-from drf_yasg.views import get_schema_view
+import functools
 
-schema_view = get_schema_view(
-    openapi.Info(
-        title="Book API",
-        default_version='v1',
-        description='API for managing books',
-        terms_of_service="hhtps://www.example.com/terms/",
-        contact=openapi.Contact(email="contact@example.com"),
-        license=openapi.License(name="BSD License"),
-    ),
-    public=True,
-)
+
+@functools.lru_cache(maxsize=None)
+def schema_view():
+    """Swagger/ReDoc 스키마 뷰 - 문서 경로를 켤 때만 drf_yasg를 로드"""
+    from drf_yasg import openapi
+    from drf_yasg.views import get_schema_view
+    
+    return get_schema_view(
+        openapi.Info(
+            title="Book API",
+            default_version='v1',
+            description='API for managing books',
+            terms_of_service="hhtps://www.example.com/terms/",
+            contact=openapi.Contact(email="contact@example.com"),
+            license=openapi.License(name="BSD License"),
+        ),
+        public=True,
+    )
 
 # router = DefaultRouter()
 # router.register(r'games', TCGGameViewSet)
@@ -44,8 +50,8 @@ urlpatterns = [
     # path('api/download-excel/', download_excel, name='download_excel'),
     
     # # Swagger/ReDoc 문서
-    # path('api/docs/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
-    # path('api/redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
+    # path('api/docs/', schema_view().with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
+    # path('api/redoc/', schema_view().with_ui('redoc', cache_timeout=0), name='schema-redoc'),
 
     # Excel 파일 업로드 및 데이터 추출
     path('api/upload-excel/', upload_excel, name='upload_excel'),
@@ -53,9 +59,18 @@ urlpatterns = [
     # 최저가 검색 (비동기)
     path('api/search-prices/', search_prices, name='search_prices'),
     
+    # 진행 중인 최저가 검색 취소 (부분 결과 반환)
+    path('api/search-prices/cancel/', cancel_search_prices, name='cancel_search_prices'),
+    
     # 진행 상황 조회
     # path('api/progress/<str:job_id>/', get_job_progress, name='get_job_progress'),
     
     # 수정된 파일 다운로드
     path('api/download-excel/', download_excel, name='download_excel'),
+    
+    # 여러 파일/시트 일괄 가격 검색 (결과 zip)
+    path('api/search-prices-batch/', search_prices_batch, name='search_prices_batch'),
+    
+    # 네이버 API 동시 호출 한도/지연 시간 메트릭
+    path('api/naver-metrics/', naver_metrics, name='naver_metrics'),
 ]
\ No newline at end of file